@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Incremental hole-layout build: fetch -> segment -> card, only what's stale.
+
+Chains fetch_tile.py, segment.py and holecard.py over one directory by their
+filename convention (<name>.png + <name>.json sidecar -> <name>.geojson ->
+<name>-card.png). Each stage's inputs are hashed and recorded in
+<dir>/.build-state.json; a stage re-runs only when its input hash changed or
+its output is missing. Holes build in parallel, one process per hole.
+
+  fetch    manifest entry (lat/lng/size/ppm)          -> <name>.png + .json
+  segment  tile bytes, sidecar, HSV thresholds, mins  -> <name>.geojson
+  card     GeoJSON, tile, sidecar, seed CSV           -> <name>-card.png
+
+So editing one hole's GeoJSON in geojson.io re-renders just that card.
+A GeoJSON that was hand-edited since segment.py wrote it is never overwritten
+by a re-segment (tile/threshold change) unless you pass --force.
+
+    python3 build_layouts.py --dir hole_layouts \
+        --seed scorecard_profiles/plutaluang_seed.csv [--manifest holes.json] \
+        [--workers 8] [--dry-run] [--force]
+"""
+import argparse, hashlib, json, os, time
+from concurrent.futures import ProcessPoolExecutor
+import course_seed, fetch_tile, segment, holecard
+
+STATE = ".build-state.json"
+
+def sha(path):
+    if not path or not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def digest(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+def thresholds(mins):
+    return {"TURF": segment.TURF, "WATER": segment.WATER, "SAND": segment.SAND, **mins}
+
+def holes_in(d, manifest):
+    """{name: manifest entry or None}: every tile with a sidecar, plus every manifest hole."""
+    holes = {}
+    for n in sorted(os.listdir(d)):
+        stem = n[:-5] if n.endswith(".json") else None
+        if stem and os.path.exists(os.path.join(d, stem + ".png")):
+            try:
+                if "bbox_3857" in json.load(open(os.path.join(d, n))):
+                    holes[stem] = None
+            except ValueError:
+                pass
+    for h in manifest or []:
+        holes[h["name"]] = h
+    return dict(sorted(holes.items()))
+
+def build_hole(job):
+    """Run the stale stages of one hole in order. Returns (name, new state, log)."""
+    name, d, entry, seed, mins, prev, force, dry = (
+        job[k] for k in ("name", "dir", "entry", "seed", "mins", "state", "force", "dry"))
+    p = lambda ext: os.path.join(d, name + ext)
+    tile, side, gj, card = p(".png"), p(".json"), p(".geojson"), p("-card.png")
+    st, log = dict(prev), []
+
+    def stale(stage, key, out):
+        old = prev.get(stage, {})
+        return force or not os.path.exists(out) or old.get("in") != key or old.get("out") != sha(out)
+
+    def ran(stage, key, out, t0):
+        st[stage] = {"in": key, "out": sha(out)}
+        log.append(f"{stage} (stale)" if dry else f"{stage} {time.perf_counter()-t0:.2f}s")
+
+    if entry:
+        key = digest({k: entry.get(k) for k in ("lat", "lng", "width", "height", "ppm")})
+        if stale("fetch", key, tile):
+            t0 = time.perf_counter()
+            if not dry:
+                fetch_tile.fetch_many([entry], d, workers=1)
+            ran("fetch", key, tile, t0)
+
+    if not os.path.exists(tile):
+        return name, st, log + ["no tile"]
+    key = digest(sha(tile), sha(side), thresholds(mins))
+    if stale("segment", key, gj):
+        old = prev.get("segment", {})
+        if os.path.exists(gj) and not force and (old.get("hand") or sha(gj) != old.get("out")):
+            # a geojson.io edit is the source of truth from here on; never clobber it
+            st["segment"] = {"in": key, "out": sha(gj), "hand": True}
+            log.append("segment skipped (hand-edited geojson kept)")
+        else:
+            t0 = time.perf_counter()
+            m = segment.HOLE_NAME.match(name)
+            if not dry:
+                segment.segment_tile(tile, gj, m and m.group(1).capitalize(),
+                                     m and int(m.group(2)), **mins)
+            ran("segment", key, gj, t0)
+
+    if segment.HOLE_NAME.match(name) and os.path.exists(gj):   # overviews get no card
+        key = digest(sha(gj), sha(tile), sha(side), sha(seed))
+        if stale("card", key, card):
+            t0 = time.perf_counter()
+            if not dry:
+                holecard.render(gj, tile, side, seed, card)
+            ran("card", key, card, t0)
+    return name, st, log
+
+def main():
+    a = argparse.ArgumentParser()
+    a.add_argument("--dir", default="hole_layouts")
+    a.add_argument("--manifest", help="fetch_tile.py holes manifest (enables the fetch stage)")
+    a.add_argument("--seed", default=None)
+    a.add_argument("--workers", type=int, default=None)
+    a.add_argument("--force", action="store_true", help="re-run every stage, overwrite hand edits")
+    a.add_argument("--dry-run", action="store_true", help="list stale stages, run nothing")
+    a.add_argument("--fairway-min-m2", type=float, default=400)
+    a.add_argument("--water-min-m2", type=float, default=150)
+    a.add_argument("--bunker-min-m2", type=float, default=25)
+    args = a.parse_args()
+    mins = dict(fairway_min_m2=args.fairway_min_m2, water_min_m2=args.water_min_m2,
+                bunker_min_m2=args.bunker_min_m2)
+
+    if args.seed:
+        course_seed.load(args.seed)   # bad seed data fails here, before any hole runs
+    spath = os.path.join(args.dir, STATE)
+    state = json.load(open(spath)) if os.path.exists(spath) else {}
+    manifest = json.load(open(args.manifest)) if args.manifest else None
+    jobs = [{"name": n, "dir": args.dir, "entry": e, "seed": args.seed, "mins": mins,
+             "state": state.get(n, {}), "force": args.force, "dry": args.dry_run}
+            for n, e in holes_in(args.dir, manifest).items()]
+
+    t0 = time.perf_counter()
+    if args.workers == 1 or len(jobs) <= 1:
+        res = [build_hole(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as ex:
+            res = list(ex.map(build_hole, jobs))
+    rebuilt = 0
+    for name, st, log in res:
+        rebuilt += st != state.get(name, {})
+        print(f"{'✓' if log else '·'} {name}: {', '.join(log) or 'up to date'}")
+        if not args.dry_run:
+            state[name] = st
+    if not args.dry_run:
+        tmp = spath + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp, spath)
+    print(f"✓ {len(jobs)} holes, {rebuilt} {'stale' if args.dry_run else 'rebuilt'} in {time.perf_counter()-t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+ANCHORS: named class / method / function regions of index.html
+===============================================================
+
+Patches like fix_scramble_team_handicap.py run DOTALL patterns such as
+`class LiveScorecardSystem \\{[\\s\\S]*?constructor...` over the full 3.4 MB
+document; every attempt backtracks across megabytes. Instead, locate the
+declaration once (str.find on its literal name + an anchored match at line
+start — no scanning regex over the whole file), find its closing brace with a
+small string/template/comment/regex-aware brace matcher, and run the patch
+only inside that slice.
+
+Anchor names:
+    'LiveScorecardSystem'                          class (declaration .. closing brace)
+    'LiveScorecardSystem.getGroupLeaderboard'      method inside that class
+    'detectCurrentHole'                            top-level `function` declaration
+plus friendly aliases in CATALOGUE ('leaderboard', 'gps.detect', ...).
+
+    a = Anchors(text)
+    start, end = a.region('LiveScorecardSystem.getGroupLeaderboard')
+
+With patch_engine: Regex(..., within='leaderboard') touches only that method.
+"""
+
+import re
+from functools import lru_cache
+
+# Friendly names used by the patch scripts -> anchor spec.
+CATALOGUE = {
+    'live-scorecard':          'LiveScorecardSystem',
+    'live-scorecard.ctor':     'LiveScorecardSystem.constructor',
+    'leaderboard':             'LiveScorecardSystem.getGroupLeaderboard',
+    'society-organizer':       'SocietyOrganizerManager',
+    'confirmed-players':       'SocietyOrganizerManager.renderConfirmedPlayers',
+    'society-db':              'SocietyGolfSupabase',
+    'golfer-events':           'GolferEventsManager',
+    'society-calendar':        'SocietyCalendar',
+    'organizer-scoring':       'OrganizerScoringSystem',
+    'gps.detect':              'detectCurrentHole',
+    'gps.distances':           'calculateDistances',
+}
+
+
+class AnchorError(LookupError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _decl(kind, name):
+    """Precompiled declaration matcher, applied with .match() at a line start."""
+    n = re.escape(name)
+    if kind == 'class':
+        return re.compile(r'[ \t]*(?:export\s+)?class\s+%s\b[^{\n]*\{' % n)
+    if kind == 'method':
+        return re.compile(r'[ \t]*(?:static\s+)?(?:async\s+)?(?:get\s+|set\s+)?\*?%s\s*\([^)]*\)\s*\{' % n)
+    return re.compile(r'[ \t]*(?:export\s+)?(?:async\s+)?function\s*\*?\s*%s\s*\([^)]*\)\s*\{' % n)
+
+
+_NEXT = re.compile(r'[{}"\'`/]')
+_REGEX_PREV = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def _skip_string(text, i, q):
+    """i at opening quote -> index just past the closing quote."""
+    n = len(text)
+    i += 1
+    while i < n:
+        c = text[i]
+        if c == '\\':
+            i += 2
+        elif c == q or c == '\n':
+            return i + 1
+        else:
+            i += 1
+    return n
+
+
+def _skip_regex(text, i):
+    n, in_class = len(text), False
+    i += 1
+    while i < n:
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            return i
+        if in_class:
+            in_class = c != ']'
+        elif c == '[':
+            in_class = True
+        elif c == '/':
+            return i + 1
+        i += 1
+    return n
+
+
+def _regex_allowed(text, i):
+    j = i - 1
+    while j >= 0 and text[j] in ' \t\r\n':
+        j -= 1
+    if j < 0 or text[j] in _REGEX_PREV:
+        return True
+    k = j
+    while k >= 0 and (text[k].isalnum() or text[k] in '_$'):
+        k -= 1
+    return text[k+1:j+1] in ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void')
+
+
+def block_end(text, i, limit=None):
+    """text[i] == '{' -> index just past its matching '}', skipping strings,
+    template literals (with nested ${...}), comments and regex literals."""
+    n = len(text) if limit is None else limit
+    depth, tpl = 0, []          # tpl: brace depths at which a ${ ... } opened
+    while i < n:
+        m = _NEXT.search(text, i, n)
+        if not m:
+            break
+        i, c = m.start(), m.group()
+        if c == '{':
+            depth += 1
+            i += 1
+        elif c == '}':
+            if tpl and depth == tpl[-1]:
+                tpl.pop()
+                depth -= 1
+                i = _skip_template(text, i + 1, tpl, depth)
+                continue
+            depth -= 1
+            i += 1
+            if depth == 0:
+                return i
+        elif c in '"\'':
+            i = _skip_string(text, i, c)
+        elif c == '`':
+            i = _skip_template(text, i + 1, tpl, depth)
+        elif text.startswith('//', i):
+            j = text.find('\n', i)
+            i = n if j == -1 else j
+        elif text.startswith('/*', i):
+            j = text.find('*/', i + 2)
+            i = n if j == -1 else j + 2
+        elif _regex_allowed(text, i):
+            i = _skip_regex(text, i)
+        else:
+            i += 1
+    raise AnchorError('unbalanced braces')
+
+
+def _skip_template(text, i, tpl, depth):
+    """Inside a template literal at i -> index after its closing backtick, or just
+    after a '${' (pushing the current depth so the matching '}' resumes here)."""
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            return i + 1
+        elif c == '$' and text.startswith('${', i):
+            tpl.append(depth + 1)
+            return i + 1            # the '{' is counted by block_end
+        else:
+            i += 1
+    return n
+
+
+class Anchors:
+    """Region lookups over one version of the document, cached per name.
+    Call shift() after editing inside a region so cached offsets stay valid.
+    A js_index.JsIndex of the same text pre-fills the cache, so no lookup
+    has to search at all."""
+
+    def __init__(self, text, index=None):
+        self.text = text
+        self.cache = {}
+        if index is not None:
+            for e in reversed(index.symbols):
+                self.cache[e['name']] = (e['start'], e['end'])
+
+    def _find(self, kind, name, lo, hi):
+        rx = _decl(kind, name)
+        key = 'class ' + name if kind == 'class' else name
+        i = self.text.find(key, lo, hi)
+        while i != -1:
+            ls = self.text.rfind('\n', lo, i) + 1
+            m = rx.match(self.text, max(ls, lo), hi)
+            if m:
+                return m.start(), block_end(self.text, m.end() - 1, hi)
+            i = self.text.find(key, i + 1, hi)
+        return None
+
+    def region(self, name):
+        """(start, end) of the named class / Class.method / function, start at
+        its line indent, end just past its closing brace."""
+        spec = CATALOGUE.get(name, name)
+        if spec in self.cache:
+            return self.cache[spec]
+        if '.' in spec:
+            cls, meth = spec.split('.', 1)
+            lo, hi = self.region(cls)
+            r = self._find('method', meth, lo, hi)
+        elif spec[:1].isupper():
+            r = self._find('class', spec, 0, len(self.text))
+        else:
+            r = self._find('function', spec, 0, len(self.text))
+        if r is None:
+            raise AnchorError('anchor not found: %s' % name)
+        self.cache[spec] = r
+        return r
+
+    def shift(self, start, end, delta, text):
+        """text[start:end] was replaced by something `delta` chars longer."""
+        self.text = text
+        for k, (a, b) in list(self.cache.items()):
+            if a >= end:
+                self.cache[k] = (a + delta, b + delta)
+            elif a <= start and b >= end:
+                self.cache[k] = (a, b + delta)
+            elif b > start:
+                del self.cache[k]          # overlapped the edit: re-find lazily
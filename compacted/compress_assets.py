@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+COMPRESS ASSETS: precompressed text variants + re-encoded responsive course imagery
+====================================================================================
+
+Everything the site ships is served as it sits in the tree: the 3.4 MB index.html,
+the course photos in scorecard_profiles/ and the hole_layouts cards. This build
+stage writes an output tree (--out) holding:
+
+  * text assets (.html .js .css .json .svg .yaml ...) copied as-is plus
+    <file>.br (Brotli q11, when the optional `brotli` package is installed) and
+    <file>.gz (gzip -9, mtime 0 so rebuilds are byte-identical). A variant is
+    only kept if it saves at least --min-saving of the original;
+  * every PNG/JPG/WebP re-encoded with Pillow (the same dependency holecard.py
+    uses): EXIF-rotated, metadata stripped, JPEG progressive/optimised at
+    --jpeg-quality, PNG optimised, and a WebP twin at --webp-quality. Images
+    wider than a --widths breakpoint also get <stem>-<w>w.<ext> downscales for
+    srcset. If a re-encode comes out larger than the original, the original
+    bytes are kept;
+  * compression-manifest.json: per file the original size, every variant with
+    its size, and the ready-made srcset strings, plus totals.
+
+Outputs newer than their source are not rebuilt, so re-runs only touch what
+changed. The manifest records the options it was built with: changing
+--jpeg-quality / --webp-quality / --widths rebuilds every image, changing
+--min-saving (or brotli appearing) every text variant, and outputs the previous
+manifest listed that this run no longer produces (a dropped width, a deleted
+source) are removed. Work is spread over a process pool (--workers).
+
+Usage:
+    python compress_assets.py --text ../www --images ../scorecard_profiles \\
+        '../hole_layouts/*-card.png' --out ../dist-compressed
+"""
+
+import argparse
+import glob
+import gzip
+import io
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from PIL import Image, ImageOps
+
+try:
+    import brotli
+except ImportError:                                   # optional: gzip-only without it
+    brotli = None
+
+TEXT_EXT = ('.html', '.htm', '.js', '.mjs', '.css', '.json', '.webmanifest', '.svg', '.xml',
+            '.txt', '.yaml', '.yml', '.geojson', '.map', '.csv')
+IMAGE_EXT = ('.png', '.jpg', '.jpeg', '.webp')
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__', '.vercel'}
+WIDTHS = (480, 960, 1600)
+MANIFEST = 'compression-manifest.json'
+
+
+def find(sources, extensions):
+    """(path, relative output path) for files matching `extensions` under each
+    source (a file, a directory, or a glob). Paths are relative to the source's
+    parent so the source directory name is kept in the output tree."""
+    found = []
+    for src in sources:
+        matches = glob.glob(src) if glob.has_magic(src) else [src]
+        for m in sorted(matches):
+            if os.path.isfile(m):
+                if m.lower().endswith(extensions):
+                    found.append((m, os.path.relpath(m, os.path.dirname(os.path.dirname(os.path.abspath(m))))))
+                continue
+            base = os.path.dirname(os.path.abspath(m.rstrip('/\\')))
+            for root, dirs, files in os.walk(m):
+                dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+                found.extend((os.path.join(root, f), os.path.relpath(os.path.join(root, f), base))
+                             for f in sorted(files) if f.lower().endswith(extensions))
+    return found
+
+
+def _fresh(out, src, rebuild=False):
+    return not rebuild and os.path.exists(out) and os.path.getmtime(out) >= os.path.getmtime(src)
+
+
+def _put(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Text
+# ---------------------------------------------------------------------------
+
+def gzip_bytes(data):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=9, mtime=0) as f:
+        f.write(data)
+    return buf.getvalue()
+
+
+def compress_text(src, rel, out_dir, min_saving=0.05, rebuild=False):
+    dest = os.path.join(out_dir, rel)
+    if not _fresh(dest, src):
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copyfile(src, dest)
+    size = os.path.getsize(src)
+    row = {'file': rel.replace(os.sep, '/'), 'kind': 'text', 'bytes': size, 'variants': {}}
+    encoders = [('.gz', gzip_bytes)]
+    if brotli is not None:
+        encoders.insert(0, ('.br', lambda d: brotli.compress(d, quality=11)))
+    data = None
+    for ext, encode in encoders:
+        out = dest + ext
+        if not _fresh(out, src, rebuild):
+            if data is None:
+                with open(src, 'rb') as f:
+                    data = f.read()
+            packed = encode(data)
+            if len(packed) > size * (1 - min_saving):
+                if os.path.exists(out):
+                    os.remove(out)
+                continue
+            _put(out, packed)
+        if os.path.exists(out):
+            row['variants'][row['file'] + ext] = os.path.getsize(out)
+    row['best'] = min([size] + list(row['variants'].values()))
+    return row
+
+
+# ---------------------------------------------------------------------------
+# Images
+# ---------------------------------------------------------------------------
+
+def _encode(im, fmt, quality):
+    buf = io.BytesIO()
+    if fmt == 'JPEG':
+        im.convert('RGB').save(buf, 'JPEG', quality=quality, optimize=True, progressive=True)
+    elif fmt == 'PNG':
+        im.save(buf, 'PNG', optimize=True)
+    else:
+        im.save(buf, 'WEBP', quality=quality, method=6)
+    return buf.getvalue()
+
+
+def compress_image(src, rel, out_dir, widths=WIDTHS, jpeg_quality=82, webp_quality=80, rebuild=False):
+    """Re-encode one image at full size and at each breakpoint narrower than it."""
+    stem, ext = os.path.splitext(rel)
+    fmt = {'.png': 'PNG', '.jpg': 'JPEG', '.jpeg': 'JPEG', '.webp': 'WEBP'}[ext.lower()]
+    size = os.path.getsize(src)
+    row = {'file': rel.replace(os.sep, '/'), 'kind': 'image', 'bytes': size, 'variants': {}, 'srcset': {}}
+
+    im = None
+    with Image.open(src) as probe:
+        width, height = probe.size
+    jobs = [(None, rel, fmt)]
+    if fmt != 'WEBP':
+        jobs.append((None, stem + '.webp', 'WEBP'))
+    for w in sorted(widths):
+        if w < width:
+            jobs.append((w, '%s-%dw%s' % (stem, w, ext), fmt))
+            if fmt != 'WEBP':
+                jobs.append((w, '%s-%dw.webp' % (stem, w), 'WEBP'))
+
+    for w, name, out_fmt in jobs:
+        dest = os.path.join(out_dir, name)
+        if not _fresh(dest, src, rebuild):
+            if im is None:
+                with Image.open(src) as raw:
+                    im = ImageOps.exif_transpose(raw)
+                    alpha = 'A' in im.getbands() or 'transparency' in im.info
+                    if im.mode not in ('RGB', 'RGBA'):
+                        im = im.convert('RGBA' if alpha else 'RGB')
+                    im.load()
+            scaled = im if w is None else im.resize((w, round(height * w / width)), Image.LANCZOS)
+            quality = webp_quality if out_fmt == 'WEBP' else jpeg_quality
+            data = _encode(scaled, out_fmt, quality)
+            if w is None and out_fmt == fmt and len(data) >= size:
+                with open(src, 'rb') as f:                       # re-encode lost: keep the original
+                    data = f.read()
+            _put(dest, data)
+        key = name.replace(os.sep, '/')
+        row['variants'][key] = os.path.getsize(dest)
+        if w is None:
+            row['best'] = min(row.get('best', size), row['variants'][key])
+        row['srcset'].setdefault(out_fmt.lower(), []).append((w or width, key))
+    row['srcset'] = {k: ', '.join('%s %dw' % (quote(key), w) for w, key in sorted(v))
+                     for k, v in row['srcset'].items()}
+    return row
+
+
+# ---------------------------------------------------------------------------
+
+def _job(args):
+    kind, src, rel, out_dir, opts = args
+    try:
+        if kind == 'text':
+            return compress_text(src, rel, out_dir, opts['min_saving'], opts['rebuild_text'])
+        return compress_image(src, rel, out_dir, opts['widths'], opts['jpeg_quality'], opts['webp_quality'],
+                              opts['rebuild_images'])
+    except (OSError, ValueError) as e:
+        return {'file': rel.replace(os.sep, '/'), 'kind': kind, 'error': str(e)}
+
+
+def build(text_sources, image_sources, out_dir, workers=None, widths=WIDTHS,
+          jpeg_quality=82, webp_quality=80, min_saving=0.05):
+    options = {'text': {'min_saving': min_saving, 'brotli': brotli is not None},
+               'image': {'widths': sorted(widths), 'jpeg_quality': jpeg_quality, 'webp_quality': webp_quality}}
+    previous = _load_manifest(out_dir)
+    before = previous.get('options') or {}
+    opts = {'widths': widths, 'jpeg_quality': jpeg_quality, 'webp_quality': webp_quality,
+            'min_saving': min_saving,
+            'rebuild_text': before.get('text') != options['text'],
+            'rebuild_images': before.get('image') != options['image']}
+    jobs = [('text', src, rel, out_dir, opts) for src, rel in find(text_sources, TEXT_EXT)]
+    jobs += [('image', src, rel, out_dir, opts) for src, rel in find(image_sources, IMAGE_EXT)]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        rows = list(ex.map(_job, jobs, chunksize=4))
+    ok = [r for r in rows if 'error' not in r]
+    totals = {}
+    for kind in ('text', 'image'):
+        sel = [r for r in ok if r['kind'] == kind]
+        before = sum(r['bytes'] for r in sel)
+        after = sum(r['best'] for r in sel)
+        totals[kind] = {'files': len(sel), 'bytes': before, 'best': after, 'saved': before - after}
+    manifest = {'brotli': brotli is not None, 'options': options, 'totals': totals,
+                'files': sorted(ok, key=lambda r: r['file'])}
+    # Outputs of the previous build that this one no longer produces. Files that
+    # failed this time keep theirs.
+    failed = {r['file'] for r in rows if 'error' in r}
+    manifest['removed'] = sorted(_outputs(previous, failed) - _outputs(manifest))
+    for rel in manifest['removed']:
+        path = os.path.join(out_dir, *rel.split('/'))
+        if os.path.isfile(path):
+            os.remove(path)
+    os.makedirs(out_dir, exist_ok=True)
+    _put(os.path.join(out_dir, MANIFEST), json.dumps(manifest, indent=1).encode('utf-8'))
+    return manifest, [r for r in rows if 'error' in r]
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _outputs(manifest, keep=()):
+    """Every output path (relative, '/'-separated) a manifest lists, except those of `keep` files."""
+    out = set()
+    for r in manifest.get('files', []):
+        if r['file'] in keep:
+            continue
+        if r['kind'] == 'text':
+            out.add(r['file'])
+        out.update(r.get('variants', {}))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Precompress text assets and re-encode course imagery')
+    ap.add_argument('--text', nargs='*', default=[], metavar='PATH', help='files/dirs/globs to gzip + brotli')
+    ap.add_argument('--images', nargs='*', default=[], metavar='PATH', help='files/dirs/globs to re-encode')
+    ap.add_argument('--out', required=True, help='output tree (+ %s)' % MANIFEST)
+    ap.add_argument('--widths', type=int, nargs='*', default=list(WIDTHS), help='responsive breakpoints (px)')
+    ap.add_argument('--jpeg-quality', type=int, default=82)
+    ap.add_argument('--webp-quality', type=int, default=80)
+    ap.add_argument('--min-saving', type=float, default=0.05, help='drop .br/.gz variants saving less')
+    ap.add_argument('--workers', type=int, default=None)
+    args = ap.parse_args()
+    if not args.text and not args.images:
+        ap.error('nothing to do: give --text and/or --images')
+
+    if brotli is None:
+        print('   [WARN] brotli not installed (pip install brotli) - writing gzip variants only')
+    manifest, errors = build(args.text, args.images, args.out, args.workers, tuple(args.widths),
+                             args.jpeg_quality, args.webp_quality, args.min_saving)
+    for e in errors:
+        print('   [SKIP] %s: %s' % (e['file'], e['error']))
+    biggest = sorted(manifest['files'], key=lambda r: r['best'] - r['bytes'])[:8]
+    for r in biggest:
+        print('   [OK] %-60s %9.1f KB -> %8.1f KB' % (r['file'][-60:], r['bytes'] / 1024, r['best'] / 1024))
+    for kind, t in manifest['totals'].items():
+        if t['files']:
+            print('[OK] %-5s %4d files  %9.1f KB -> %9.1f KB  (saved %.1f KB, %.0f%%)'
+                  % (kind, t['files'], t['bytes'] / 1024, t['best'] / 1024, t['saved'] / 1024,
+                     100.0 * t['saved'] / t['bytes'] if t['bytes'] else 0))
+    if manifest['removed']:
+        print('   [OK] removed %d outputs the previous build made and this one does not' % len(manifest['removed']))
+    print('[OK] manifest: %s' % os.path.join(args.out, MANIFEST))
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
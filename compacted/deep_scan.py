@@ -1,193 +1,394 @@
 #!/usr/bin/env python3
 """
 Deep HTML/JavaScript Scanner - Advanced Analysis
+
+One streaming pass: every line is fed once through a small HTML/JS lexer
+(script blocks, strings, template literals, comments) and then through a
+single precompiled alternation of rule triggers; only the rules whose trigger
+occurs on the line run their (also precompiled) check. Lexer state and the
+HTML tag stack at the start of every line are kept, so after an edit
+CodeAnalyzer.rescan() re-lexes only from the first changed line until the
+state converges with the previous scan again.
+
+Usage:
+    python deep_scan.py [file] [--out fixed.html] [--report report.txt]
+    python deep_scan.py index.html --watch     # rescan changed lines on save
 """
 
+import argparse
+import os
 import re
+import time
 from collections import defaultdict
 
+import js_index
+from anchors import _regex_allowed, _skip_regex, _skip_string
+
+# ---------------------------------------------------------------------------
+# Rule registry
+# ---------------------------------------------------------------------------
+
+RULES = []
+
+# Report order of the rule groups (the order the old per-check passes ran in).
+GROUPS = ('script-tags', 'syntax', 'performance', 'security', 'html')
+
+
+class Rule:
+    def __init__(self, test, type, category, issue, fix, severity, trigger, group):
+        self.test = test
+        self.type, self.category, self.issue = type, category, issue
+        self.fix, self.severity = fix, severity
+        self.trigger = trigger
+        self.order = (GROUPS.index(group), len(RULES))
+
+    def make(self, line, **extra):
+        issue = {'type': self.type, 'category': self.category, 'issue': self.issue,
+                 'content': line.strip()[:150], 'fix': self.fix, 'severity': self.severity}
+        issue.update(extra)
+        return issue
+
+
+def rule(type, category, issue, fix, severity, trigger, group):
+    """Register a check. `trigger` is a lower-case regex that must occur on the
+    lower-cased line for the check to run; test(line, ctx) returns True, or a
+    list of issue-field overrides for rules that report several findings."""
+    def register(test):
+        RULES.append(Rule(test, type, category, issue, fix, severity, trigger, group))
+        return test
+    return register
+
+
+_TEMPLATE_SCRIPT = re.compile(r'`[^`]*</script>[^`]*`', re.I)
+_STRING_SCRIPT = re.compile(r'["\'][^"\']*</script>[^"\']*["\']', re.I)
+_TEXTCONTENT = re.compile(r'\.textcontent\s*=', re.I)
+_DOM_IN_LOOP = re.compile(r'for\s*\([^)]*\)\s*\{[^}]*document\.(querySelector|getElementById)')
+_CONCAT_IN_LOOP = re.compile(r'(for|while)\s*\([^)]*\).*\+=\s*["\']')
+_INNERHTML_TEXT = re.compile(r'\.innerHTML\s*=\s*["\'][^<>"\']*["\']')
+_EVAL = re.compile(r'\beval\s*\(')
+_OPEN_TAG = re.compile(r'<(\w+)(?:\s|>|/)')
+_CLOSE_TAG = re.compile(r'</(\w+)>')
+_VOID_TAGS = ('br', 'hr', 'img', 'input', 'meta', 'link')
+
+
+@rule('CRITICAL', '</script> in template literal',
+      '</script> tag found inside template literal - breaks HTML parsing',
+      'Replace </script> with <\\/script>', 10, trigger='<', group='script-tags')
+def _script_in_template(line, ctx):
+    # the lexer also sees templates that opened on an earlier line
+    return 'template' in ctx['closed_in'] or bool(_TEMPLATE_SCRIPT.search(line))
+
+
+@rule('CRITICAL', '</script> in string',
+      '</script> tag found inside string - breaks HTML parsing',
+      'Replace </script> with <\\/script>', 10, trigger='<', group='script-tags')
+def _script_in_string(line, ctx):
+    return 'string' in ctx['closed_in'] or bool(_STRING_SCRIPT.search(line))
+
+
+@rule('SYNTAX', 'Incorrect property name', 'textcontent should be textContent (capital C)',
+      'Change to textContent', 8, trigger='textcontent', group='syntax')
+def _textcontent_case(line, ctx):
+    return bool(_TEXTCONTENT.search(line)) and 'textContent' not in line
+
+
+@rule('SYNTAX', 'Incorrect method name', 'addEventListener has incorrect casing',
+      'Use correct casing: addEventListener', 9, trigger='addeventlistener', group='syntax')
+def _listener_case(line, ctx):
+    return 'addEventListener' not in line
+
+
+@rule('PERFORMANCE', 'DOM query in loop', 'DOM query inside loop - cache the result',
+      'Move querySelector outside loop', 6, trigger='queryselector|getelementbyid',
+      group='performance')
+def _dom_query_in_loop(line, ctx):
+    return bool(_DOM_IN_LOOP.search(line))
+
+
+@rule('PERFORMANCE', 'Uncached selector', 'querySelectorAll result not cached',
+      'Cache the NodeList', 5, trigger='queryselector|getelementbyid', group='performance')
+def _uncached_selector(line, ctx):
+    return '.querySelectorAll' in line and '.forEach' in line
+
+
+@rule('PERFORMANCE', 'String concatenation in loop',
+      'String concatenation in loop - use array.join()',
+      'Use array push and join instead', 6, trigger=r'\+=', group='performance')
+def _concat_in_loop(line, ctx):
+    return bool(_CONCAT_IN_LOOP.search(line))
+
+
+@rule('SECURITY', 'innerHTML misuse', 'innerHTML used for plain text - potential XSS risk',
+      'Use textContent instead of innerHTML', 7, trigger=r'\.innerhtml', group='security')
+def _innerhtml_text(line, ctx):
+    # Plain text assignment - should use textContent
+    return ('.innerHTML' in line and '=' in line and bool(_INNERHTML_TEXT.search(line))
+            and ('<' not in line or '`' in line))
+
+
+@rule('SECURITY', 'eval() usage', 'eval() is a security risk',
+      'Avoid eval(), use safer alternatives', 9, trigger='eval', group='security')
+def _eval_call(line, ctx):
+    return bool(_EVAL.search(line))
+
+
+@rule('HTML', 'Mismatched tag', None, 'Verify tag matching', 8, trigger='<', group='html')
+def _mismatched_tag(line, ctx):
+    """Naive line-based tag stack, carried in ctx['tags'] as (tag, parent) cells."""
+    tags, found = ctx['tags'], []
+    for tag in _OPEN_TAG.findall(line):
+        if tag.lower() not in _VOID_TAGS:
+            # Check if it's self-closing
+            if not re.search(r'<' + tag + r'[^>]*/>', line):
+                tags = (tag, tags)
+    for tag in _CLOSE_TAG.findall(line):
+        if tags and tags[0] == tag:
+            tags = tags[1]
+        elif tags:
+            found.append({'issue': f'Closing tag </{tag}> doesn\'t match opening tag <{tags[0]}>'})
+    ctx['tags'] = tags
+    return found
+
+
+def _compile_triggers(rules):
+    """One plain alternation over the distinct triggers (named groups would defeat
+    the regex engine's prefix scan and run ~8x slower). Triggers are lower case
+    and matched against the lower-cased line."""
+    triggers = list(dict.fromkeys(r.trigger for r in rules))
+    return re.compile('|'.join('(?:%s)' % t for t in triggers))
+
+
+# ---------------------------------------------------------------------------
+# Line lexer: HTML / <script> / strings / templates / comments
+# ---------------------------------------------------------------------------
+
+_JS_NEXT = re.compile(r'["\'`/]')        # outside ${...}: braces don't matter
+_JS_NEXT_TPL = re.compile(r'[{}"\'`/]')  # inside ${...}: track brace depth
+_TPL_NEXT = re.compile(r'\\|`|\$\{')
+_SCRIPT_OPEN = re.compile(r'<script\b', re.I)
+
+# state: (mode, tpl, depth). mode is 'html', 'html-comment', 'js', 'template' or
+# 'comment'; tpl holds the brace depths at which open ${ ... } expressions close.
+START = ('html', (), 0)
+
+
+def lex_line(line, state):
+    """Advance the lexer over one line. Returns (state at the next line, list of
+    contexts in which a </script closed the block: 'code', 'string', 'template',
+    'comment')."""
+    mode, tpl, depth = state
+    closed, i, n = [], 0, len(line)
+    low = None
+    while i < n:
+        if mode == 'html':
+            m = _SCRIPT_OPEN.search(line, i)
+            c = line.find('<!--', i)
+            if c != -1 and (m is None or c < m.start()):
+                e = line.find('-->', c + 4)
+                if e == -1:
+                    mode = 'html-comment'
+                    break
+                i = e + 3
+                continue
+            if m is None:
+                break
+            gt = line.find('>', m.end())
+            if gt == -1:
+                break
+            mode, tpl, depth, i = 'js', (), 0, gt + 1
+            continue
+        if mode == 'html-comment':
+            e = line.find('-->', i)
+            if e == -1:
+                break
+            mode, i = 'html', e + 3
+            continue
+
+        if low is None:
+            low = line.lower()
+        close = low.find('</script', i)
+        limit = n if close == -1 else close
+        where = None
+        if mode == 'comment':
+            e = line.find('*/', i, limit)
+            if e != -1:
+                mode, i = 'js', e + 2
+                continue
+            where = 'comment'
+        elif mode == 'template':
+            m = _TPL_NEXT.search(line, i, limit)
+            if m is None:
+                where = 'template'
+            elif m.group() == '\\':
+                i = m.end() + 1
+                continue
+            elif m.group() == '`':
+                mode, i = 'js', m.end()
+                continue
+            else:
+                tpl, depth, mode, i = tpl + (depth + 1,), depth + 1, 'js', m.end()
+                continue
+        else:
+            m = (_JS_NEXT_TPL if tpl else _JS_NEXT).search(line, i, limit)
+            if m is not None:
+                p, ch = m.start(), m.group()
+                if ch == '{':
+                    depth, i = depth + 1, p + 1
+                elif ch == '}':
+                    if depth == tpl[-1]:
+                        tpl, mode = tpl[:-1], 'template'
+                    depth, i = depth - 1, p + 1
+                elif ch == '`':
+                    mode, i = 'template', p + 1
+                elif ch != '/':
+                    e = _skip_string(line, p, ch)
+                    if e <= limit:
+                        i = e
+                        continue
+                    where = 'string'
+                elif line.startswith('//', p):
+                    where = 'comment'
+                elif line.startswith('/*', p):
+                    mode, i = 'comment', p + 2
+                elif _regex_allowed(line, p):
+                    i = min(_skip_regex(line, p), limit)
+                else:
+                    i = p + 1
+                if where is None:
+                    continue
+            else:
+                where = 'code'
+        # reached the end of the line, or a </script inside `where`
+        if close == -1:
+            break
+        closed.append(where)
+        gt = line.find('>', close)
+        mode, tpl, depth = 'html', (), 0
+        i = n if gt == -1 else gt + 1
+    if mode == 'js' and not tpl:
+        depth = 0
+    return (mode, tpl, depth), closed
+
+
+def _same_tags(a, b):
+    """Equal tag stacks? Cells shared with the previous scan compare by identity."""
+    while a is not b:
+        if a is None or b is None or a[0] != b[0]:
+            return False
+        a, b = a[1], b[1]
+    return True
+
+
 class CodeAnalyzer:
-    def __init__(self):
+    def __init__(self, rules=RULES):
+        self.rules = rules
+        self.triggers = _compile_triggers(rules)
+        self.by_text = {}                # matched trigger text -> rules it fires
         self.issues = []
         self.fixes_applied = 0
+        self.path = None
+        self.lines = []
+        self.states = [(START, None)]    # (lexer state, tag stack) at each line start
+        self.found = []                  # per line: [(rule, issue), ...]
+        self.text = None                 # text self.index was built from
+        self.index = None
 
     def analyze_file(self, file_path):
+        """Stream the file through the scanner once."""
+        self.path = file_path
+        self.lines, self.states, self.found = [], [(START, None)], []
         with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            lines = content.split('\n')
-
-        self.check_script_tags_in_strings(lines)
-        self.check_syntax_errors(lines, content)
-        self.check_performance_issues(lines)
-        self.check_security_issues(lines)
-        self.check_html_structure(lines)
-
-        return self.issues, lines, content
-
-    def check_script_tags_in_strings(self, lines):
-        """Check for </script> tags inside template literals or strings"""
-        for i, line in enumerate(lines, 1):
-            # Look for </script> in template literals (between backticks)
-            if re.search(r'`[^`]*</script>[^`]*`', line, re.IGNORECASE):
-                self.issues.append({
-                    'line': i,
-                    'type': 'CRITICAL',
-                    'category': '</script> in template literal',
-                    'issue': '</script> tag found inside template literal - breaks HTML parsing',
-                    'content': line.strip()[:150],
-                    'fix': 'Replace </script> with <\\/script>',
-                    'severity': 10
-                })
-
-            # Look for </script> in strings
-            if re.search(r'["\'][^"\']*</script>[^"\']*["\']', line, re.IGNORECASE):
-                self.issues.append({
-                    'line': i,
-                    'type': 'CRITICAL',
-                    'category': '</script> in string',
-                    'issue': '</script> tag found inside string - breaks HTML parsing',
-                    'content': line.strip()[:150],
-                    'fix': 'Replace </script> with <\\/script>',
-                    'severity': 10
-                })
-
-    def check_syntax_errors(self, lines, content):
-        """Check for real syntax errors"""
-        for i, line in enumerate(lines, 1):
-            stripped = line.strip()
-
-            # Check for unterminated template literals (very basic)
-            backtick_count = line.count('`')
-            if backtick_count == 1 and not stripped.endswith(',') and not stripped.endswith('+'):
-                # Could be start or end of multi-line template literal
-                # More sophisticated check needed
-                pass
-
-            # Check for common typos
-            if re.search(r'\.textcontent\s*=', line, re.IGNORECASE):
-                if 'textContent' not in line:
-                    self.issues.append({
-                        'line': i,
-                        'type': 'SYNTAX',
-                        'category': 'Incorrect property name',
-                        'issue': 'textcontent should be textContent (capital C)',
-                        'content': line.strip()[:150],
-                        'fix': 'Change to textContent',
-                        'severity': 8
-                    })
-
-            # Check for addEventListener typos
-            if re.search(r'addeventlistener', line, re.IGNORECASE):
-                if 'addEventListener' not in line:
-                    self.issues.append({
-                        'line': i,
-                        'type': 'SYNTAX',
-                        'category': 'Incorrect method name',
-                        'issue': 'addEventListener has incorrect casing',
-                        'content': line.strip()[:150],
-                        'fix': 'Use correct casing: addEventListener',
-                        'severity': 9
-                    })
-
-    def check_performance_issues(self, lines):
-        """Check for performance bottlenecks"""
-        for i, line in enumerate(lines, 1):
-            # DOM queries in loops
-            if re.search(r'for\s*\([^)]*\)\s*\{[^}]*document\.(querySelector|getElementById)', line):
-                self.issues.append({
-                    'line': i,
-                    'type': 'PERFORMANCE',
-                    'category': 'DOM query in loop',
-                    'issue': 'DOM query inside loop - cache the result',
-                    'content': line.strip()[:150],
-                    'fix': 'Move querySelector outside loop',
-                    'severity': 6
-                })
-
-            # Multiple querySelectorAll on same selector
-            if '.querySelectorAll' in line and '.forEach' in line:
-                self.issues.append({
-                    'line': i,
-                    'type': 'PERFORMANCE',
-                    'category': 'Uncached selector',
-                    'issue': 'querySelectorAll result not cached',
-                    'content': line.strip()[:150],
-                    'fix': 'Cache the NodeList',
-                    'severity': 5
-                })
-
-            # Inefficient string concatenation in loops
-            if re.search(r'(for|while)\s*\([^)]*\).*\+=\s*["\']', line):
-                self.issues.append({
-                    'line': i,
-                    'type': 'PERFORMANCE',
-                    'category': 'String concatenation in loop',
-                    'issue': 'String concatenation in loop - use array.join()',
-                    'content': line.strip()[:150],
-                    'fix': 'Use array push and join instead',
-                    'severity': 6
-                })
-
-    def check_security_issues(self, lines):
-        """Check for security issues"""
-        for i, line in enumerate(lines, 1):
-            # innerHTML with user input
-            if '.innerHTML' in line and '=' in line:
-                # Check if it's a simple string assignment
-                if re.search(r'\.innerHTML\s*=\s*["\'][^<>"\']*["\']', line):
-                    # Plain text - should use textContent
-                    if '<' not in line or '`' in line:
-                        self.issues.append({
-                            'line': i,
-                            'type': 'SECURITY',
-                            'category': 'innerHTML misuse',
-                            'issue': 'innerHTML used for plain text - potential XSS risk',
-                            'content': line.strip()[:150],
-                            'fix': 'Use textContent instead of innerHTML',
-                            'severity': 7
-                        })
-
-            # eval usage
-            if re.search(r'\beval\s*\(', line):
-                self.issues.append({
-                    'line': i,
-                    'type': 'SECURITY',
-                    'category': 'eval() usage',
-                    'issue': 'eval() is a security risk',
-                    'content': line.strip()[:150],
-                    'fix': 'Avoid eval(), use safer alternatives',
-                    'severity': 9
-                })
-
-    def check_html_structure(self, lines):
-        """Check HTML structure issues"""
-        tag_stack = []
-        for i, line in enumerate(lines, 1):
-            # Find opening tags
-            opening_tags = re.findall(r'<(\w+)(?:\s|>|/)', line)
-            # Find closing tags
-            closing_tags = re.findall(r'</(\w+)>', line)
-
-            for tag in opening_tags:
-                if tag.lower() not in ['br', 'hr', 'img', 'input', 'meta', 'link']:
-                    # Check if it's self-closing
-                    if not re.search(r'<' + tag + r'[^>]*/>', line):
-                        tag_stack.append((tag, i))
-
-            for tag in closing_tags:
-                if tag_stack and tag_stack[-1][0] == tag:
-                    tag_stack.pop()
-                elif tag_stack:
-                    # Mismatched tag
-                    self.issues.append({
-                        'line': i,
-                        'type': 'HTML',
-                        'category': 'Mismatched tag',
-                        'issue': f'Closing tag </{tag}> doesn\'t match opening tag <{tag_stack[-1][0]}>',
-                        'content': line.strip()[:150],
-                        'fix': f'Verify tag matching',
-                        'severity': 8
-                    })
+            line = ''
+            for line in f:
+                self._scan(line[:-1] if line.endswith('\n') else line)
+            if line.endswith('\n') or not self.lines:
+                self._scan('')
+        content = '\n'.join(self.lines)
+        self.text, self.index = content, js_index.load(file_path)     # text == file on disk: cached by hash
+        self._collect()
+        return self.issues, self.lines, content
+
+    def _check(self, line, state):
+        """Lex + run triggered rules on one line -> (state after it, [(rule, issue)])."""
+        lex, tags = state
+        lex, closed = lex_line(line, lex)
+        found = []
+        hits = set(self.triggers.findall(line.lower()))
+        if hits:
+            ctx = {'closed_in': closed, 'tags': tags}
+            for r in sorted({r for t in hits for r in self._fired_by(t)}, key=lambda r: r.order):
+                hit = r.test(line, ctx)
+                if hit is True:
+                    found.append((r, r.make(line)))
+                elif hit:
+                    found.extend((r, r.make(line, **extra)) for extra in hit)
+            tags = ctx['tags']
+        return (lex, tags), found
+
+    def _fired_by(self, text):
+        rules = self.by_text.get(text)
+        if rules is None:
+            rules = self.by_text[text] = [r for r in self.rules if re.fullmatch(r.trigger, text)]
+        return rules
+
+    def _scan(self, line):
+        state, found = self._check(line, self.states[-1])
+        self.lines.append(line)
+        self.found.append(found)
+        self.states.append(state)
+
+    def rescan(self, content):
+        """Update the scan for a new version of the text. Only lines from the first
+        change up to where the lexer/tag state matches the previous scan again are
+        re-checked. Returns (issues, (first, last) 1-based range re-checked)."""
+        new = content.split('\n')
+        old = self.lines
+        lo, hi_old, hi_new = 0, len(old), len(new)
+        common = min(hi_old, hi_new)
+        while lo < common and old[lo] == new[lo]:
+            lo += 1
+        while hi_old > lo and hi_new > lo and old[hi_old - 1] == new[hi_new - 1]:
+            hi_old -= 1
+            hi_new -= 1
+        if lo == hi_old == hi_new == len(new):
+            return self.issues, (0, 0)
+        states, found = self.states[:lo + 1], self.found[:lo]
+        k = lo
+        while k < len(new):
+            if k >= hi_new:
+                j = k - hi_new + hi_old       # same line in the old scan
+                (lex, tags), (olex, otags) = states[k], self.states[j]
+                if lex == olex and _same_tags(tags, otags):
+                    found.extend(self.found[j:])
+                    states.extend(self.states[j + 1:])
+                    break
+            s, f = self._check(new[k], states[k])
+            states.append(s)
+            found.append(f)
+            k += 1
+        self.lines, self.states, self.found = new, states, found
+        if self.index is not None:
+            # The text it was given, which need not be what is on disk yet; only the
+            # script blocks that overlap the edit are lexed again.
+            self.index = js_index.update(self.index, self.text, content)
+            self.text = content
+        self._collect()
+        return self.issues, (lo + 1, k)
+
+    def _collect(self):
+        rows = [(r.order, n, i, issue) for n, f in enumerate(self.found, 1)
+                for i, (r, issue) in enumerate(f)]
+        rows.sort(key=lambda x: (x[0][0], x[1], x[0][1], x[2]))
+        self.issues = [dict({'line': n}, **issue) for _, n, _, issue in rows]
+        if self.path and self.issues:
+            # Name the class/method/function each issue sits in.
+            if self.index is None:
+                self.text = '\n'.join(self.lines)
+                self.index = js_index.build(self.text)
+            for issue in self.issues:
+                issue['scope'] = self.index.at_line(issue['line'])
+        return self.issues
+
 
 def apply_critical_fixes(lines, issues):
     """Apply fixes for critical issues"""
@@ -240,6 +441,8 @@ def generate_detailed_report(issues):
 
             for issue in by_type[issue_type]:
                 report.append(f"\n  Line {issue['line']} [Severity: {issue['severity']}/10]")
+                if issue.get('scope'):
+                    report.append(f"  In: {issue['scope']}")
                 report.append(f"  Category: {issue['category']}")
                 report.append(f"  Issue: {issue['issue']}")
                 report.append(f"  Content: {issue['content']}")
@@ -248,10 +451,45 @@ def generate_detailed_report(issues):
 
     return "\n".join(report)
 
+def watch(file_path, interval=1.0):
+    """Rescan on every save; only the changed lines (plus lexer spill-over) are re-checked."""
+    analyzer = CodeAnalyzer()
+    t0 = time.perf_counter()
+    issues, _, _ = analyzer.analyze_file(file_path)
+    print(f"{file_path}: {len(issues)} issues ({(time.perf_counter() - t0) * 1000:.0f} ms full scan)")
+    mtime = os.path.getmtime(file_path)
+    while True:
+        time.sleep(interval)
+        m = os.path.getmtime(file_path)
+        if m == mtime:
+            continue
+        mtime = m
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        t0 = time.perf_counter()
+        before = len(analyzer.issues)
+        issues, (first, last) = analyzer.rescan(content)
+        if not first:
+            continue
+        print(f"lines {first}-{last} rescanned in {(time.perf_counter() - t0) * 1000:.0f} ms: "
+              f"{len(issues)} issues ({len(issues) - before:+d})")
+        for issue in issues:
+            if first <= issue['line'] <= last:
+                print(f"  Line {issue['line']} [{issue['type']}] {issue['category']}: {issue['content'][:80]}")
+
+
 def main():
-    file_path = "C:/Users/pete/Documents/MciPro/index.html"
-    output_path = "C:/Users/pete/Documents/MciPro/index-fixed.html"
-    report_path = "C:/Users/pete/Documents/MciPro/detailed-scan-report.txt"
+    ap = argparse.ArgumentParser(description='Deep HTML/JavaScript scanner')
+    ap.add_argument('file', nargs='?', default="C:/Users/pete/Documents/MciPro/index.html")
+    ap.add_argument('--out', default="C:/Users/pete/Documents/MciPro/index-fixed.html")
+    ap.add_argument('--report', default="C:/Users/pete/Documents/MciPro/detailed-scan-report.txt")
+    ap.add_argument('--watch', action='store_true', help='keep running and rescan on save')
+    args = ap.parse_args()
+    file_path, output_path, report_path = args.file, args.out, args.report
+
+    if args.watch:
+        watch(file_path)
+        return
 
     print("Starting deep analysis...")
     analyzer = CodeAnalyzer()
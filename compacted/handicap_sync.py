@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+HANDICAP SYNC: push only what changed between TRGG handicap-list snapshots
+==========================================================================
+
+golfers.json and trgghcpjanuary/TRGG_Handicap_List.json are full snapshots of
+the 1,100+ player list. load_trgg_players.py re-reads and re-sends every player;
+this command sends the difference:
+
+  1. the new snapshot is hashed (an unchanged file is a no-op) and indexed by
+     normalized name - accents folded, case and punctuation dropped, surname
+     and given names kept in order ("Komatsu, Takashi" and "Takashi, Komatsu"
+     are different list entries);
+  2. the baseline is the previous snapshot this command pushed (state file,
+     which also remembers every player's golfer_id - including players who
+     have since dropped off the list) or, with --against db or on first run,
+     the society's members joined to their user_profiles - LINE accounts as
+     well as TRGG-GUEST profiles, re-keyed to the list spelling through
+     name_match ("Luke Abbey" is "Abbey, Luke");
+  3. the delta is four sets:
+        insert     - new names, matched against every user_profiles name first
+                     (name_match): a golfer who already has a profile is linked
+                     under that id, ambiguous names are reported and skipped,
+                     the rest get a TRGG-GUEST profile and a society_members
+                     row, numbered after the highest existing id / member number;
+        reactivate - names back on the list after dropping off: their old
+                     golfer_id and membership are reused (status 'active'),
+                     never a second profile;
+        update     - handicap (or spelling) changed: only those profiles are
+                     read back and re-written with golfInfo.handicap replaced;
+        delete     - names gone from the list: their membership is set
+                     'inactive' (profiles are never deleted; --keep-missing
+                     skips) and their golfer_id is kept in the state;
+  4. the delta goes through bulk_import (chunked, checkpointed upserts), and the
+     state file is replaced only after everything landed.
+
+Usage:
+    python handicap_sync.py --json TRGGplayers/trgghcpjanuary/TRGG_Handicap_List.json [--dry-run]
+    python handicap_sync.py --json ... --against db
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from bulk_import import (CHECKPOINTS, SUPABASE_KEY, SUPABASE_URL, BulkImportError, Checkpoint, PostgREST,
+                         PostgRESTError, bulk_upsert, file_key, next_member_number)
+from load_trgg_players import SOCIETY_NAME, SOCIETY_PREFIX, load_golfers, member_record, profile_record
+from name_match import THRESHOLD, NameIndex, normalize_name
+
+STATE = os.path.join(CHECKPOINTS, 'handicap-sync-state.json')
+GUEST = '%s-GUEST-' % SOCIETY_PREFIX
+ID_BATCH = 100                                        # ids per in.(...) filter
+
+
+def parse_handicap(value):
+    """11 / '11.0' / '+1.2' (plus handicap) -> float; None if unparseable."""
+    try:
+        if isinstance(value, str) and value.strip().startswith('+'):
+            return -float(value.strip()[1:])
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def index_players(rows, name_key='name', handicap=lambda r: r.get('handicap')):
+    """{normalized name: {'name', 'handicap', ...}}. Repeated names get ' #2', ' #3'."""
+    out = {}
+    for r in rows:
+        key = normalize_name(r.get(name_key) or '')
+        if not key:
+            continue
+        n, base = 2, key
+        while key in out:
+            key, n = '%s #%d' % (base, n), n + 1
+        out[key] = dict(r, name=r.get(name_key), handicap=parse_handicap(handicap(r)))
+    return out
+
+
+def load_snapshot(path):
+    return {'sha': file_key(path), 'source': path, 'players': index_players(load_golfers(path))}
+
+
+def db_baseline(api, society_id):
+    """Baseline from the society's members and their profiles; inactive members
+    go to 'gone' so a returning player gets the old golfer_id back."""
+    members = api.select('society_members', 'golfer_id,status', society_id='eq.%s' % society_id)
+    inactive = {m['golfer_id'] for m in members if m.get('status') == 'inactive'}
+    ids = sorted({m['golfer_id'] for m in members if m.get('golfer_id')})
+    rows = []
+    for i in range(0, len(ids), ID_BATCH):
+        rows += api.select('user_profiles', 'line_user_id,name,profile_data',
+                           line_user_id='in.(%s)' % ','.join(ids[i:i + ID_BATCH]))
+    rows.sort(key=lambda r: r['line_user_id'])
+    out = {'sha': None, 'source': 'db'}
+    for part, sel in (('players', [r for r in rows if r['line_user_id'] not in inactive]),
+                      ('gone', [r for r in rows if r['line_user_id'] in inactive])):
+        out[part] = index_players(sel, handicap=lambda r: ((r.get('profile_data') or {}).get('golfInfo') or {})
+                                  .get('handicap'))
+        for p in out[part].values():
+            p['golfer_id'] = p.pop('line_user_id')
+            p.pop('profile_data', None)
+    return out
+
+
+def align_baseline(old, new, threshold=THRESHOLD):
+    """Re-key baseline players whose profile name is spelled differently from
+    the list ("Luke Abbey" vs "Abbey, Luke"), so they diff as the same player."""
+    parts = [part for part in ('players', 'gone') if old.get(part)]
+    spare = [(part, k, p) for part in parts for k, p in old[part].items() if k not in new]
+    names = [k for k in new if not any(k in old.get(part, {}) for part in parts)]
+    if not spare or not names:
+        return 0
+    index = NameIndex(spare, key=lambda r: r[2]['name'])
+    moved = 0
+    for k, (_, hit) in zip(names, index.match_all([new[k]['name'] for k in names], threshold)):
+        if hit['status'] == 'match':
+            part, was, p = hit['record']
+            old[part][k] = old[part].pop(was)
+            moved += 1
+    return moved
+
+
+def _changed(a, b):
+    """`a` (list entry) differs from `b` (baseline player). A LINE user's profile
+    keeps their own spelling, so for non-guest ids only the handicap counts."""
+    renamed = a['name'] != b['name'] and (b.get('golfer_id') or GUEST).startswith(GUEST)
+    return (renamed or (a['handicap'] is None) != (b['handicap'] is None) or
+            (a['handicap'] is not None and abs(a['handicap'] - b['handicap']) > 0.049))
+
+
+def diff(old, new, gone=None):
+    """Minimal change set between two name-indexed player maps; `gone` holds
+    players of earlier lists that are no longer on `old`."""
+    gone = gone or {}
+    insert = sorted(k for k in new if k not in old and k not in gone)
+    reactivate = sorted(k for k in new if k not in old and k in gone)
+    delete = sorted(k for k in old if k not in new)
+    update = sorted(k for k in new if k in old and _changed(new[k], old[k]))
+    return {'insert': insert, 'reactivate': reactivate, 'update': update, 'delete': delete}
+
+
+def next_gone(old, new, delta):
+    """Players off the list after this sync, with their golfer_ids."""
+    gone = {k: p for k, p in (old.get('gone') or {}).items() if k not in new['players']}
+    gone.update((k, old['players'][k]) for k in delta['delete'])
+    return gone
+
+
+def _next_guest_id(ids):
+    """1 + highest TRGG-GUEST-NNNN among `ids`."""
+    nums = [int(i[len(GUEST):]) for i in ids if i and i.startswith(GUEST) and i[len(GUEST):].isdigit()]
+    return max(nums, default=0) + 1
+
+
+def plan_delta(api, delta, old, new, society_id, keep_missing=False, gone=None, threshold=THRESHOLD):
+    """Rows to write for a delta; fills golfer_id into `new` for every player.
+
+    Inserted names are matched against every user_profiles name first: a match
+    reuses that profile (adding or reactivating the membership), an ambiguous
+    name is dropped from `new` and listed under 'ambiguous' for a human.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    gone = gone or {}
+    for k in new:
+        if k in old:
+            new[k]['golfer_id'] = old[k]['golfer_id']
+        elif k in gone:
+            new[k]['golfer_id'] = gone[k]['golfer_id']
+    plan = {'user_profiles': [], 'society_members': [], 'updates': [], 'deactivate': [],
+            'reactivate': sorted(new[k]['golfer_id'] for k in delta['reactivate']), 'ambiguous': []}
+    refresh = delta['update'] + [k for k in delta['reactivate'] if _changed(new[k], gone[k])]
+
+    if delta['insert']:
+        members = {m['golfer_id']: m for m in api.select('society_members', 'golfer_id,member_number,status',
+                                                         society_id='eq.%s' % society_id)}
+        number = next_member_number(list(members.values()), SOCIETY_PREFIX)
+        known = api.select('user_profiles', 'line_user_id,name')
+        gid = _next_guest_id([r['line_user_id'] for r in known] + [p['golfer_id'] for p in old.values()] +
+                             [p['golfer_id'] for p in gone.values()])
+        hits = NameIndex(known).match_all([new[k]['name'] for k in delta['insert']], threshold)
+        for k, (_, hit) in zip(delta['insert'], hits):
+            p = new[k]
+            if hit['status'] == 'ambiguous':
+                plan['ambiguous'].append({'name': p['name'], 'candidates': [
+                    '%s (%s) %.2f' % (r.get('name'), r['line_user_id'], sc) for sc, r in hit['candidates']]})
+                del new[k]
+                continue
+            if hit['status'] == 'match':
+                p['golfer_id'] = hit['record']['line_user_id']
+                refresh.append(k)
+                member = members.get(p['golfer_id'])
+                if member is not None:
+                    if member.get('status') == 'inactive':
+                        plan['reactivate'].append(p['golfer_id'])
+                    continue
+            else:
+                p['golfer_id'] = '%s%04d' % (GUEST, gid)
+                gid += 1
+                plan['user_profiles'].append(profile_record(p['golfer_id'], p['name'], _fmt(p['handicap']), now))
+            plan['society_members'].append(member_record(
+                society_id, p['golfer_id'], '%s-%03d' % (SOCIETY_PREFIX, number),
+                'Imported from TRGG handicap sync - Original: %s, Handicap: %s' % (p['name'], _fmt(p['handicap']))))
+            members[p['golfer_id']] = {'status': 'active'}
+            number += 1
+
+    refresh = sorted(refresh)
+    ids = [new[k]['golfer_id'] for k in refresh]
+    current = {}
+    for i in range(0, len(ids), ID_BATCH):
+        for r in api.select('user_profiles', 'line_user_id,name,profile_data',
+                            line_user_id='in.(%s)' % ','.join(ids[i:i + ID_BATCH])):
+            current[r['line_user_id']] = r
+    for k in refresh:
+        p = new[k]
+        row = current.get(p['golfer_id'])
+        if row is None:                                        # profile vanished from the DB: recreate it
+            plan['user_profiles'].append(profile_record(p['golfer_id'], p['name'], _fmt(p['handicap']), now))
+            continue
+        data = dict(row.get('profile_data') or {})
+        data['golfInfo'] = dict(data.get('golfInfo') or {}, handicap=_fmt(p['handicap']))
+        plan['updates'].append({'line_user_id': p['golfer_id'],      # a LINE user keeps their own spelling
+                                'name': p['name'] if p['golfer_id'].startswith(GUEST) else row.get('name'),
+                                'profile_data': data, 'updated_at': now})
+
+    if not keep_missing:
+        listed = {p.get('golfer_id') for p in new.values()}
+        plan['deactivate'] = sorted(old[k]['golfer_id'] for k in delta['delete']
+                                    if old[k]['golfer_id'] not in listed)
+    return plan
+
+
+def _fmt(h):
+    return '36' if h is None else ('%g' % h if h >= 0 else '+%g' % -h)
+
+
+def push(api, plan, society_id, checkpoint, workers):
+    stats = {}
+    if plan['user_profiles']:
+        stats['inserted'] = bulk_upsert(api, 'user_profiles', plan['user_profiles'], 'line_user_id',
+                                        checkpoint, 'insert', workers)['rows']
+    if plan['society_members']:
+        bulk_upsert(api, 'society_members', plan['society_members'], 'society_id,golfer_id',
+                    checkpoint, 'members', workers)
+    if plan['updates']:
+        stats['updated'] = bulk_upsert(api, 'user_profiles', plan['updates'], 'line_user_id',
+                                       checkpoint, 'update', workers)['rows']
+    for step, status in (('deactivate', 'inactive'), ('reactivate', 'active')):
+        done = checkpoint.done(step)
+        ids = plan.get(step, [])
+        for n, i in enumerate(range(0, len(ids), ID_BATCH)):
+            if n not in done:
+                api.update('society_members', {'status': status}, society_id='eq.%s' % society_id,
+                           golfer_id='in.(%s)' % ','.join(ids[i:i + ID_BATCH]))
+                checkpoint.mark(step, n)
+        stats[step + 'd'] = len(ids)
+    return stats
+
+
+def _save_state(path, snapshot):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(snapshot, ensure_ascii=False))
+    os.replace(tmp, path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Incremental TRGG handicap-list sync')
+    ap.add_argument('--json', default='TRGGplayers/trgghcpjanuary/TRGG_Handicap_List.json')
+    ap.add_argument('--against', choices=['auto', 'snapshot', 'db'], default='auto',
+                    help='baseline: last pushed snapshot (auto falls back to db on first run)')
+    ap.add_argument('--state', default=STATE)
+    ap.add_argument('--keep-missing', action='store_true', help="don't deactivate players gone from the list")
+    ap.add_argument('--dry-run', action='store_true', help='print the delta, write nothing')
+    ap.add_argument('--workers', type=int, default=4)
+    args = ap.parse_args()
+
+    new = load_snapshot(args.json)
+    old = None
+    if args.against != 'db' and os.path.exists(args.state):
+        with open(args.state, 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        if old['sha'] == new['sha'] and not old.get('skipped'):
+            print('[OK] %s unchanged since the last sync (%d players) - nothing to do'
+                  % (args.json, len(new['players'])))
+            return
+    elif args.against == 'snapshot':
+        print('[ERROR] no previous snapshot at %s (run with --against db first)' % args.state)
+        sys.exit(1)
+
+    api = PostgREST(SUPABASE_URL, SUPABASE_KEY, pool_size=args.workers)
+    try:
+        society = api.select('society_profiles', 'id', society_name='eq.%s' % SOCIETY_NAME)
+        if not society:
+            print(f"[ERROR] Society '{SOCIETY_NAME}' not found in database")
+            sys.exit(1)
+        society_id = society[0]['id']
+        if old is None:
+            print('[INFO] Baseline: %s members in the database' % SOCIETY_PREFIX)
+            old = db_baseline(api, society_id)
+            print('[INFO] %d members listed under another spelling' % align_baseline(old, new['players']))
+        else:
+            print('[INFO] Baseline: snapshot %s (%s)' % (old['sha'], old['source']))
+
+        gone = old.get('gone') or {}
+        delta = diff(old['players'], new['players'], gone)
+        print('[INFO] %d players: %d new, %d back, %d changed, %d gone, %d unchanged'
+              % (len(new['players']), len(delta['insert']), len(delta['reactivate']), len(delta['update']),
+                 len(delta['delete']), len(new['players']) - len(delta['insert']) - len(delta['reactivate'])
+                 - len(delta['update'])))
+        for kind in ('insert', 'reactivate', 'update', 'delete'):
+            for k in delta[kind][:10]:
+                src = new['players'].get(k) or old['players'][k]
+                was = old['players'].get(k, {}).get('handicap')
+                print('   [%s] %-32s %s' % (kind.upper(), src['name'], '%s -> %s' % (_fmt(was), _fmt(src['handicap']))
+                                            if kind == 'update' else _fmt(src['handicap'])))
+            if len(delta[kind]) > 10:
+                print('   ... %d more' % (len(delta[kind]) - 10))
+        if args.dry_run:
+            return
+        if not any(delta.values()):
+            for k, p in new['players'].items():
+                p['golfer_id'] = old['players'][k]['golfer_id']
+            _save_state(args.state, dict(new, gone=next_gone(old, new, delta)))
+            return
+
+        checkpoint = Checkpoint('handicap_sync', file_key(new['sha'], old['sha'], society_id, SUPABASE_URL))
+        state = checkpoint.plan(lambda: {'rows': plan_delta(api, delta, old['players'], new['players'],
+                                                           society_id, args.keep_missing, gone),
+                                         'players': new['players'], 'gone': next_gone(old, new, delta)})
+        for a in state['rows'].get('ambiguous', []):
+            print('   [AMBIGUOUS] %-29s %s' % (a['name'], ' | '.join(a['candidates'])))
+        stats = push(api, state['rows'], society_id, checkpoint, args.workers)
+    except BulkImportError as e:
+        print('[ERROR] %s' % e)
+        sys.exit(1)
+    except (PostgRESTError, OSError) as e:
+        print('[ERROR] %s' % e)
+        sys.exit(1)
+    finally:
+        api.close()
+
+    _save_state(args.state, dict(new, players=state['players'], gone=state['gone'],
+                                 skipped=[a['name'] for a in state['rows'].get('ambiguous', [])]))
+    checkpoint.clear()
+    print('[SUCCESS] %d inserted, %d reactivated, %d updated, %d deactivated - rows written: %d (of %d players)'
+          % (stats.get('inserted', 0), stats['reactivated'], stats.get('updated', 0), stats['deactivated'],
+             sum(len(v) for n, v in state['rows'].items() if n != 'ambiguous'), len(new['players'])))
+    if state['rows'].get('ambiguous'):
+        print('[WARN] %d ambiguous names skipped - they are matched again on the next run'
+              % len(state['rows']['ambiguous']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+HASH ASSETS: content-hash cache busting + service-worker precache manifest
+==========================================================================
+
+Replaces update_page_version.py. Instead of bumping a PAGE VERSION string by hand
+(which busts nothing) and the sw.js SW_VERSION (which throws every cached file
+away), this build step:
+
+  1. hashes every local asset index.html references - <script src>, <link href>,
+     <img src>, and ES module imports - and rewrites each reference to
+     `path?v=<sha256[:10]>` (an existing ?v= is replaced, other params are kept);
+  2. does the same for the icons in manifest.json, then versions the manifest link;
+  3. writes the PRECACHE_MANIFEST block of sw.js: one {url, revision} entry per
+     precached file. The worker keeps a single precache and on install only
+     fetches entries whose revision changed, so a returning user downloads just
+     the assets that changed instead of the whole shell. SW_VERSION becomes a
+     hash of the manifest, so sw.js changes exactly when some asset did;
+  4. stamps the console PAGE VERSION banner with the same build id.
+
+References that cannot be resolved (template literals, missing files) are left
+as they are and reported. Running it twice on an unchanged tree changes nothing.
+
+The page must be the one served from --root: its references are hashed from
+the files under root, so a page kept elsewhere (www/ has its own copies of
+supabase-config.js and golf-buddies-system.js) would get other files' hashes.
+
+The worker serves precached files cache-first - by path, so references the
+page loads without ?v= (the PRECACHE list below) come from the precache too -
+and a deploy without this step would pin returning users to the old code:
+deploy-vercel.sh/.bat run it before committing (`npm run hash:assets`), and
+`npm test` fails while any reference is stale (`npm run check:assets`, the
+--dry-run below).
+
+Usage:
+    python hash_assets.py ../public/index.html --sw ../public/sw.js
+    python hash_assets.py ../public/index.html --sw ../public/sw.js --dry-run
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+from urllib.parse import parse_qsl, urlencode
+
+ASSET_EXT = ('.js', '.mjs', '.css', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico',
+             '.woff', '.woff2', '.ttf', '.json', '.webmanifest')
+
+# Files the worker precaches besides what index.html references directly
+# (loaded later by script tags the app injects itself).
+PRECACHE = [
+    '/index.html',
+    '/manifest.json',
+    '/mcipro.png',
+    '/tailwind.css',
+    '/professional-analytics.css',
+    '/js/scorecardProfileLoader.js',
+    '/js/cheechan-yardage-book.js',
+    '/supabaseClient.js',
+    '/supabase-config.js',
+    '/auth-bridge.js',
+    '/caddie_data.js',
+    '/society-golf-system.js',
+    '/society-golf-combined.js',
+    '/society-dashboard-enhanced.js',
+    '/course-data-manager.js',
+    '/staff-management.js',
+    '/staff-management-compact.js',
+    '/reports-system.js',
+    '/analytics-drilldown.js',
+    '/tournament-series-manager.js',
+    '/global-player-directory.js',
+    '/golf-buddies-v2.js',
+    '/maintenance-management.js',
+    '/unified-player-service.js',
+    '/analytics-export.js',
+    '/time-windowed-leaderboards.js',
+    '/live-scorecard-enhancements.js',
+    '/weather-integration.js',
+    '/gm-analytics-engine.js',
+    '/financial-drilldown-system.js',
+    '/society-organizer-manager.js',
+    '/cross-device-sync.js',
+    '/native-push.js',
+    '/staff-security.js',
+    '/supabase-security.js',
+    '/traffic-monitor-complete.js',
+]
+
+ATTR_REF = re.compile(r'''(\b(?:src|href)\s*=\s*)(["'])([^"'<>`\s]+)\2''')
+IMPORT_REF = re.compile(r'''(\bfrom\s*|\bimport\s*\(\s*|\bimport\s+)(["'])([^"'<>`\s]+)\2''')
+MANIFEST_SRC = re.compile(r'''("src"\s*:\s*)(")([^"]+)"''')
+PAGE_VERSION = re.compile(r"(PAGE VERSION: )[^'\"]*")
+SW_BLOCK = re.compile(r'// --- precache manifest: generated by compacted/hash_assets\.py ---\n.*?'
+                      r'// --- end precache manifest ---\n', re.S)
+SW_VERSION = re.compile(r"const SW_VERSION = '[^']*';")
+
+
+def _split(url):
+    """'a/b.js?v=1#x' -> ('a/b.js', 'v=1', '#x')"""
+    frag = ''
+    if '#' in url:
+        url, frag = url.split('#', 1)
+        frag = '#' + frag
+    path, _, query = url.partition('?')
+    return path, query, frag
+
+
+def is_local(url):
+    if '${' in url or url.startswith(('#', '//', 'data:', 'blob:', 'mailto:', 'tel:', 'javascript:')):
+        return False
+    if re.match(r'^[a-zA-Z][\w+.-]*:', url):
+        return False
+    return _split(url)[0].lower().endswith(ASSET_EXT)
+
+
+def site_path(url):
+    """Reference -> path on the site; the page is served from the root."""
+    path = _split(url)[0]
+    return posixpath.normpath(path if path.startswith('/') else '/' + path)
+
+
+class Hasher:
+    """sha256[:10] of files under root, by site path ('/chat/x.js')."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.revs = {}
+
+    def revision(self, site):
+        if site not in self.revs:
+            path = os.path.join(self.root, site.lstrip('/'))
+            if not os.path.abspath(path).startswith(self.root + os.sep) or not os.path.isfile(path):
+                self.revs[site] = None
+            else:
+                with open(path, 'rb') as f:
+                    self.revs[site] = hashlib.sha256(f.read()).hexdigest()[:10]
+        return self.revs[site]
+
+    def set(self, site, data):
+        self.revs[site] = hashlib.sha256(data).hexdigest()[:10]
+
+
+def versioned(url, rev):
+    path, query, frag = _split(url)
+    params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k != 'v']
+    return '%s?%s%s' % (path, urlencode(params + [('v', rev)]), frag)
+
+
+def rewrite(text, patterns, hasher, refs):
+    """Version every resolvable local reference matched by `patterns`."""
+    for pat in patterns:
+        def sub(m):
+            url = m.group(3)
+            if not is_local(url):
+                return m.group(0)
+            site = site_path(url)
+            rev = hasher.revision(site)
+            refs.setdefault(site, rev)
+            if rev is None:
+                return m.group(0)
+            return '%s%s%s%s' % (m.group(1), m.group(2), versioned(url, rev), m.group(2))
+        text = pat.sub(sub, text)
+    return text
+
+
+def precache_block(entries):
+    lines = ['// --- precache manifest: generated by compacted/hash_assets.py ---',
+             'const PRECACHE_MANIFEST = [']
+    lines += ["    { url: '%s', revision: '%s' }," % (url, rev) for url, rev in entries]
+    lines += ['];', '// --- end precache manifest ---', '']
+    return '\n'.join(lines)
+
+
+def _write(path, text, dry_run):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if f.read() == text:
+            return False
+    if not dry_run:
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        os.replace(tmp, path)
+    return True
+
+
+def build(html_path, root, sw_path, manifest_path=None, dry_run=False):
+    """Returns {'refs': {site: rev|None}, 'precache': [(url, rev)], 'build': id, 'changed': [paths]}"""
+    hasher = Hasher(root)
+    if not os.path.abspath(html_path).startswith(hasher.root + os.sep):
+        raise ValueError('%s is not served from %s; its ?v= would hash other files' % (html_path, root))
+    manifest_path = manifest_path or os.path.join(root, 'manifest.json')
+    changed, refs = [], {}
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8', newline='') as f:
+            manifest = rewrite(f.read(), [MANIFEST_SRC], hasher, refs)
+        json.loads(manifest)                                   # never ship a broken manifest
+        hasher.set('/manifest.json', manifest.encode('utf-8'))
+        if _write(manifest_path, manifest, dry_run):
+            changed.append(manifest_path)
+
+    with open(html_path, 'r', encoding='utf-8', newline='') as f:
+        html = f.read()
+    html = rewrite(html, [ATTR_REF, IMPORT_REF], hasher, refs)
+
+    entries = []
+    for site in sorted(set(PRECACHE) | {s for s, r in refs.items() if r}):
+        if site == '/index.html':
+            continue
+        rev = hasher.revision(site)
+        if rev:
+            entries.append((site, rev))
+    build_id = hashlib.sha256(repr(entries).encode('utf-8')).hexdigest()[:10]
+    html = PAGE_VERSION.sub(lambda m: m.group(1) + 'build-' + build_id, html)
+    if _write(html_path, html, dry_run):
+        changed.append(html_path)
+    entries.append(('/index.html', hashlib.sha256(html.encode('utf-8')).hexdigest()[:10]))
+    entries.sort()
+
+    with open(sw_path, 'r', encoding='utf-8', newline='') as f:
+        sw = f.read()
+    if not SW_BLOCK.search(sw) or not SW_VERSION.search(sw):
+        raise ValueError('%s has no PRECACHE_MANIFEST block / SW_VERSION to update' % sw_path)
+    sw = SW_BLOCK.sub(lambda m: precache_block(entries), sw, count=1)
+    sw = SW_VERSION.sub("const SW_VERSION = 'mcipro-%s';" % build_id, sw, count=1)
+    if _write(sw_path, sw, dry_run):
+        changed.append(sw_path)
+
+    return {'refs': refs, 'precache': entries, 'build': build_id, 'changed': changed}
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Content-hash asset references and the sw.js precache manifest')
+    ap.add_argument('html', nargs='?', default='index.html')
+    ap.add_argument('--root', help='directory the site is served from (default: the page\'s directory)')
+    ap.add_argument('--sw', help='service worker to update (default: <root>/sw.js)')
+    ap.add_argument('--manifest', help='web app manifest (default: <root>/manifest.json)')
+    ap.add_argument('--dry-run', action='store_true', help='report only; exit 1 if anything is out of date')
+    args = ap.parse_args()
+
+    root = args.root or os.path.dirname(os.path.abspath(args.html))
+    try:
+        result = build(args.html, root, args.sw or os.path.join(root, 'sw.js'), args.manifest, args.dry_run)
+    except (ValueError, OSError) as e:
+        print('[ERROR] %s - nothing written' % e)
+        sys.exit(1)
+
+    for site, rev in sorted(result['refs'].items()):
+        if rev is None:
+            print('   [MISS] %s (not under %s, left unversioned)' % (site, root))
+    print('   [OK] %d references versioned, %d files in the precache manifest'
+          % (sum(1 for r in result['refs'].values() if r), len(result['precache'])))
+    for path in result['changed']:
+        print('   [%s] %s' % ('STALE' if args.dry_run else 'WROTE', path))
+    print('[OK] build %s%s' % (result['build'], '' if result['changed'] else ' (already up to date)'))
+    if args.dry_run and result['changed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+JS INDEX: one-pass structural index of the inline <script> blocks in index.html
+===============================================================================
+
+Every patch script finds its target (`async getGroupLeaderboard()`,
+`renderConfirmedPlayers(registrations)`, `function detectCurrentHole()`) by a
+fresh string search over the 3.4 MB file. This walks each inline script block
+once with the same string/template/comment/regex-aware lexer as anchors.py,
+keeps a scope stack, and records every
+
+    class        'LiveScorecardSystem'
+    method       'LiveScorecardSystem.getGroupLeaderboard'
+    function     'detectCurrentHole'   (declarations, `x = function`, `x = () =>`)
+
+with its character range (what Python slices use), byte range (UTF-8, what
+editors and `dd` use) and 1-based line. Ranges follow anchors.py: start at the
+line indent of the declaration, end just past the closing brace.
+
+The index is cached as JSON under $JS_INDEX_CACHE (default
+~/.cache/mcipro-jsindex) keyed by the file's sha256, so any edit to the file
+invalidates it and an unchanged file loads in milliseconds. Only the KEEP most
+recently used indexes are kept, so a day of edits does not pile up ~110 KB each.
+An in-memory index can also follow an edit without the cache: update() keeps
+the symbols of the blocks the edit does not touch and lexes only the rest.
+
+Usage:
+    python js_index.py index.html --find leaderboard detectCurrentHole
+    python js_index.py index.html --list [--kind class]
+    python js_index.py index.html --check         # every CATALOGUE anchor resolves
+
+    from js_index import load
+    idx = load('index.html')
+    start, end = idx.region('LiveScorecardSystem.getGroupLeaderboard')
+    idx.at_line(40920)   # -> 'LiveScorecardSystem.getGroupLeaderboard'
+    idx = update(idx, old_text, new_text)
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from anchors import (CATALOGUE, AnchorError, _NEXT, _regex_allowed, _skip_regex,
+                     _skip_string, _skip_template)
+
+VERSION = 1
+CACHE = os.environ.get('JS_INDEX_CACHE', os.path.expanduser('~/.cache/mcipro-jsindex'))
+KEEP = 8                                              # cached indexes kept, most recently used first
+
+_SCRIPT = re.compile(r'<script\b([^>]*)>', re.I)
+_JS_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+_NOT_NAMES = {'if', 'for', 'while', 'switch', 'catch', 'with', 'return', 'function',
+              'typeof', 'await', 'new', 'delete', 'void', 'in', 'of', 'do', 'else'}
+_MODIFIERS = {'static', 'async', 'get', 'set', 'export', 'default'}
+
+
+def _ident(c):
+    return c.isalnum() or c in '_$'
+
+
+def _back_ws(text, j, lo):
+    while j >= lo and text[j] in ' \t\r\n':
+        j -= 1
+    return j
+
+
+def _word_back(text, j, lo, dots=False):
+    """Identifier ending at text[j] -> (word, start) or (None, j + 1)."""
+    k = j
+    while k >= lo and (_ident(text[k]) or (dots and text[k] == '.')):
+        k -= 1
+    return (text[k+1:j+1] or None), k + 1
+
+
+def _paren_back(text, j, lo):
+    """text[j] == ')' -> index of its '(' (plain counting; parameter lists)."""
+    depth = 0
+    while j >= lo:
+        c = text[j]
+        if c == ')':
+            depth += 1
+        elif c == '(':
+            depth -= 1
+            if depth == 0:
+                return j
+        j -= 1
+    return None
+
+
+def _decl_start(text, s, lo, words=_MODIFIERS):
+    """Back over leading modifiers (async, static, export, const ...) and a
+    generator '*'; then snap to the line start if only indent precedes."""
+    while True:
+        j = _back_ws(text, s - 1, lo)
+        if j >= lo and text[j] == '*':
+            s = j
+            continue
+        w, ws = _word_back(text, j, lo)
+        if w in words:
+            s = ws
+            continue
+        break
+    ls = text.rfind('\n', lo, s) + 1
+    return ls if not text[max(ls, lo):s].strip() else s
+
+
+def _assigned(text, s, lo):
+    """`name = <s>` / `name: <s>` before position s -> (name, name_start) or None."""
+    j = _back_ws(text, s - 1, lo)
+    w, ws = _word_back(text, j, lo)
+    if w == 'async':
+        j = _back_ws(text, ws - 1, lo)
+    if j < lo or text[j] != '=' or text[j-1] in '=!<>':
+        return None
+    name, ns = _word_back(text, _back_ws(text, j - 1, lo), lo)
+    return (name, ns) if name else None
+
+
+def _opener(text, i, lo, stack):
+    """What the '{' at text[i] opens: (kind, name, start) or None for a plain block."""
+    top = stack[-1] if stack else None
+    in_class = top is not None and top[0] == 'class'
+    j = _back_ws(text, i - 1, lo)
+    if j < lo:
+        return None
+    if text[j] == ')':
+        k = _paren_back(text, j, lo)
+        if k is None:
+            return None
+        e = _back_ws(text, k - 1, lo)
+        if e >= lo and text[e] == '*':
+            e = _back_ws(text, e - 1, lo)
+        name, s = _word_back(text, e, lo)
+        if name is None:
+            return None
+        if name == 'function':
+            a = _assigned(text, s, lo)
+            return ('function', a[0], _decl_start(text, a[1], lo, {'const', 'let', 'var'})) if a else None
+        prev, ps = _word_back(text, _back_ws(text, s - 1, lo), lo)
+        if prev is None:
+            pj = _back_ws(text, s - 1, lo)
+            if pj >= lo and text[pj] == '*':
+                prev, ps = _word_back(text, _back_ws(text, pj - 1, lo), lo)
+        if prev == 'function' and '\n' not in text[ps:s]:     # not '// ... function\n name('
+            return ('function', name, _decl_start(text, ps, lo))
+        if in_class and name not in _NOT_NAMES:
+            return ('method', '%s.%s' % (top[1], name), _decl_start(text, s, lo))
+        return None
+    if text[j] == '>' and text[j-1:j+1] == '=>':
+        e = _back_ws(text, j - 2, lo)
+        if e >= lo and text[e] == ')':
+            k = _paren_back(text, e, lo)
+            if k is None:
+                return None
+            s = k
+        else:
+            s = _word_back(text, e, lo)[1]
+        a = _assigned(text, s, lo)
+        if not a:
+            return None
+        if in_class:
+            return ('method', '%s.%s' % (top[1], a[0]), _decl_start(text, a[1], lo))
+        return ('function', a[0], _decl_start(text, a[1], lo, {'const', 'let', 'var'}))
+    w1, s1 = _word_back(text, j, lo, dots=True)
+    if w1 is None:
+        return None
+    w2, s2 = _word_back(text, _back_ws(text, s1 - 1, lo), lo)
+    if w2 == 'extends':
+        w1, s1 = _word_back(text, _back_ws(text, s2 - 1, lo), lo)
+        w2, s2 = _word_back(text, _back_ws(text, s1 - 1, lo), lo)
+    if w2 == 'class' and w1 and '.' not in w1 and '\n' not in text[s2:s1]:
+        return ('class', w1, _decl_start(text, s2, lo))
+    return None
+
+
+def _scan_block(text, lo, hi):
+    """Lex text[lo:hi] once; return [(kind, name, start, end)] for every named scope."""
+    out, stack, tpl = [], [], []
+    i = lo
+    while i < hi:
+        m = _NEXT.search(text, i, hi)
+        if not m:
+            break
+        i, c = m.start(), m.group()
+        if c == '{':
+            if tpl and tpl[-1] == len(stack) + 1 and text[i-1] == '$':
+                stack.append(None)
+            else:
+                stack.append(_opener(text, i, lo, stack))
+            i += 1
+        elif c == '}':
+            if tpl and len(stack) == tpl[-1]:
+                tpl.pop()
+                stack.pop()
+                i = _skip_template(text, i + 1, tpl, len(stack))
+                continue
+            if stack:
+                e = stack.pop()
+                if e:
+                    out.append((e[0], e[1], e[2], i + 1))
+            i += 1
+        elif c in '"\'':
+            i = _skip_string(text, i, c)
+        elif c == '`':
+            i = _skip_template(text, i + 1, tpl, len(stack))
+        elif text.startswith('//', i):
+            j = text.find('\n', i, hi)
+            i = hi if j == -1 else j
+        elif text.startswith('/*', i):
+            j = text.find('*/', i + 2, hi)
+            i = hi if j == -1 else j + 2
+        elif _regex_allowed(text, i):
+            i = _skip_regex(text, i)
+        else:
+            i += 1
+    return out
+
+
+def code_only(text, lo, hi):
+    """text[lo:hi] with string, comment, regex and template-literal text blanked
+    to spaces (newlines and ${...} expressions kept), so offsets still line up."""
+    out, tpl, depth, pos = [], [], 0, lo
+    i = lo
+
+    def blank(a, b):
+        out.append(text[pos:a])
+        out.append(re.sub(r'[^\n]', ' ', text[a:b]))
+        return b
+    while i < hi:
+        m = _NEXT.search(text, i, hi)
+        if not m:
+            break
+        i, c = m.start(), m.group()
+        if c == '{':
+            depth += 1
+            i += 1
+        elif c == '}':
+            if tpl and depth == tpl[-1]:
+                tpl.pop()
+                depth -= 1
+                j = min(_skip_template(text, i + 1, tpl, depth), hi)
+                pos = blank(i + 1, j)
+                i = j
+                continue
+            depth -= 1
+            i += 1
+        elif c in '"\'':
+            j = min(_skip_string(text, i, c), hi)
+            pos = blank(i, j)
+            i = j
+        elif c == '`':
+            j = min(_skip_template(text, i + 1, tpl, depth), hi)
+            pos = blank(i, j)
+            i = j
+        elif text.startswith('//', i):
+            j = text.find('\n', i, hi)
+            i = pos = blank(i, hi if j == -1 else j)
+        elif text.startswith('/*', i):
+            j = text.find('*/', i + 2, hi)
+            i = pos = blank(i, hi if j == -1 else j + 2)
+        elif _regex_allowed(text, i):
+            j = min(_skip_regex(text, i), hi)
+            pos = blank(i, j)
+            i = j
+        else:
+            i += 1
+    out.append(text[pos:hi])
+    return ''.join(out)
+
+
+_GLOBAL = re.compile(r'[{}()\[\]]|\b(?:function(?:\s*\*\s*|\s+)|(?:class|var|let|const)\s+)([A-Za-z_$][\w$]*)'
+                     r'|\bwindow\.([A-Za-z_$][\w$]*)\s*=(?!=)')
+_OPEN, _SHUT = set('{(['), set('})]')
+
+
+def globals_defined(text, lo, hi):
+    """Names a script block puts in the page's global scope: its top-level
+    function / class / var / let / const declarations and every `window.X =`."""
+    names, depth = set(), 0
+    for m in _GLOBAL.finditer(code_only(text, lo, hi)):
+        c = m.group()
+        if c in _OPEN:
+            depth += 1
+        elif c in _SHUT:
+            depth -= 1
+        elif m.group(2):
+            names.add(m.group(2))
+        elif depth == 0:
+            names.add(m.group(1))
+    return names
+
+
+def script_blocks(text):
+    """[(start, end, attrs)] of inline JavaScript <script> bodies. Like the HTML
+    tokenizer, a body ends at the first '</script' whatever the JS around it."""
+    blocks, i = [], 0
+    while True:
+        m = _SCRIPT.search(text, i)
+        if not m:
+            return blocks
+        end = _close(text, m.end())
+        attrs = m.group(1)
+        t = re.search(r'\btype\s*=\s*["\']?([^"\'\s>]+)', attrs, re.I)
+        if 'src' not in re.findall(r'\b(src)\s*=', attrs, re.I) and \
+                (t.group(1).lower() if t else '') in _JS_TYPES:
+            blocks.append((m.end(), end, attrs.strip()))
+        i = end
+
+
+_CLOSE = re.compile(r'</script', re.I)
+
+
+def _close(text, i):
+    m = _CLOSE.search(text, i)
+    return m.start() if m else len(text)
+
+
+class JsIndex:
+    """Symbol table for one version of a file. Entries are dicts with kind,
+    name, start/end (chars), bstart/bend (UTF-8 bytes), line, block."""
+
+    def __init__(self, sha, blocks, symbols):
+        self.sha = sha
+        self.blocks = blocks
+        self.symbols = symbols
+        self.by_name = {}
+        for e in symbols:
+            self.by_name.setdefault(e['name'], []).append(e)
+        self._lines = [e['line'] for e in symbols]
+
+    def lookup(self, name):
+        """All entries for a name or CATALOGUE alias, in document order."""
+        return self.by_name.get(CATALOGUE.get(name, name), [])
+
+    def find(self, name):
+        """First entry for a name; AnchorError if there is none."""
+        hits = self.lookup(name)
+        if not hits:
+            raise AnchorError('anchor not found: %s' % name)
+        return hits[0]
+
+    def region(self, name):
+        e = self.find(name)
+        return e['start'], e['end']
+
+    def at_line(self, line):
+        """Innermost named scope containing a 1-based line, or None."""
+        for e in reversed(self.symbols[:bisect.bisect_right(self._lines, line)]):
+            if line <= e['end_line']:
+                return e['name']
+        return None
+
+    def to_json(self):
+        return {'version': VERSION, 'sha256': self.sha, 'blocks': self.blocks,
+                'symbols': self.symbols}
+
+
+def _positions(text, offsets):
+    """{char offset: (byte offset, line)} for the given offsets, one forward walk."""
+    out, b, line, prev = {}, 0, 1, 0
+    for o in sorted(set(offsets)):
+        chunk = text[prev:o]
+        b += len(chunk.encode('utf-8'))
+        line += chunk.count('\n')
+        out[o] = (b, line)
+        prev = o
+    return out
+
+
+def build(text, sha=None):
+    """Index a document's text (no cache)."""
+    if sha is None:
+        sha = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    raw, blocks = [], script_blocks(text)
+    for n, (lo, hi, _) in enumerate(blocks):
+        raw.extend((n,) + s for s in _scan_block(text, lo, hi))
+    raw.sort(key=lambda r: (r[3], -r[4]))
+    pos = _positions(text, [o for b in blocks for o in b[:2]] + [o for r in raw for o in r[3:5]])
+    blocks = [{'start': lo, 'end': hi, 'bstart': pos[lo][0], 'bend': pos[hi][0],
+               'line': pos[lo][1], 'attrs': attrs} for lo, hi, attrs in blocks]
+    symbols = [{'kind': kind, 'name': name, 'start': a, 'end': z,
+                'bstart': pos[a][0], 'bend': pos[z][0],
+                'line': pos[a][1], 'end_line': pos[z][1], 'block': n}
+               for n, kind, name, a, z in raw]
+    return JsIndex(sha, blocks, symbols)
+
+
+def _common(a, b, rev=False, step=1 << 16):
+    """Length of the common prefix (suffix if rev) of two strings: whole chunks
+    compared at C speed, then a bisect inside the first chunk that differs."""
+    if rev:
+        a, b = a[::-1], b[::-1]
+    n, lo = min(len(a), len(b)), 0
+    while lo + step <= n and a[lo:lo + step] == b[lo:lo + step]:
+        lo += step
+    hi = min(lo + step, n)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def update(index, old, text, sha=None):
+    """Index of `text` from `index`, the index of `old`: blocks before the edit
+    keep their symbols, blocks after it are shifted, and only the blocks that
+    overlap the edited range are lexed again. Same result as build(text)."""
+    if index.sha != hashlib.sha256(old.encode('utf-8')).hexdigest():
+        return build(text, sha)
+    if sha is None:
+        sha = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    a = _common(old, text)
+    z = min(_common(old, text, rev=True), len(old) - a, len(text) - a)
+    old_b, new_b = len(old) - z, len(text) - z                  # edit: old[a:old_b] -> text[a:new_b]
+    shift = len(text) - len(old)
+    dbytes = len(text[a:new_b].encode('utf-8')) - len(old[a:old_b].encode('utf-8'))
+    dlines = text.count('\n', a, new_b) - old.count('\n', a, old_b)
+    by_block = {}
+    for e in index.symbols:
+        by_block.setdefault(e['block'], []).append(e)
+    olds = {(b['start'], b['end'], b['attrs']): (n, b) for n, b in enumerate(index.blocks)}
+
+    blocks, symbols, raw = [], [], []
+    for n, (lo, hi, attrs) in enumerate(script_blocks(text)):
+        before, after = hi <= a, lo >= new_b
+        hit = olds.get((lo, hi, attrs) if before else (lo - shift, hi - shift, attrs)) if before or after else None
+        if hit is None:
+            blocks.append({'start': lo, 'end': hi, 'attrs': attrs})
+            raw.extend((n,) + s for s in _scan_block(text, lo, hi))
+            continue
+        m, b = hit
+        d = (0, 0, 0) if before else (shift, dbytes, dlines)
+        blocks.append({'start': lo, 'end': hi, 'bstart': b['bstart'] + d[1], 'bend': b['bend'] + d[1],
+                       'line': b['line'] + d[2], 'attrs': attrs})
+        symbols.extend(dict(e, start=e['start'] + d[0], end=e['end'] + d[0], bstart=e['bstart'] + d[1],
+                            bend=e['bend'] + d[1], line=e['line'] + d[2], end_line=e['end_line'] + d[2], block=n)
+                       for e in by_block.get(m, ()))
+    fresh = [b for b in blocks if 'line' not in b]
+    pos = _positions(text, [o for b in fresh for o in (b['start'], b['end'])] + [o for r in raw for o in r[3:5]])
+    for b in fresh:
+        b.update(bstart=pos[b['start']][0], bend=pos[b['end']][0], line=pos[b['start']][1])
+        b['attrs'] = b.pop('attrs')                             # same key order as build()
+    symbols.extend({'kind': kind, 'name': name, 'start': s, 'end': e,
+                    'bstart': pos[s][0], 'bend': pos[e][0],
+                    'line': pos[s][1], 'end_line': pos[e][1], 'block': n}
+                   for n, kind, name, s, e in raw)
+    symbols.sort(key=lambda e: (e['start'], -e['end']))
+    return JsIndex(sha, blocks, symbols)
+
+
+def load(path, text=None, cache=CACHE):
+    """Index of `path`, from the sha256-keyed cache when the file is unchanged.
+    Pass `text` if the caller already read the file (open(..., newline=''))."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    sha = hashlib.sha256(data).hexdigest()
+    p = os.path.join(cache, 'v%d-%s.json' % (VERSION, sha)) if cache else None
+    if p and os.path.exists(p):
+        with open(p, 'r', encoding='utf-8') as f:
+            doc = json.load(f)
+        os.utime(p)
+        return JsIndex(sha, doc['blocks'], doc['symbols'])
+    idx = build(text if text is not None else data.decode('utf-8'), sha)
+    if p:
+        os.makedirs(cache, exist_ok=True)
+        tmp = '%s.%d.tmp' % (p, os.getpid())
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(idx.to_json(), f, separators=(',', ':'))
+        os.replace(tmp, p)
+        _prune(cache)
+    return idx
+
+
+def _prune(cache, keep=KEEP):
+    """Drop all but the `keep` most recently used index files."""
+    entries = []
+    for name in os.listdir(cache):
+        if name.startswith('v') and name.endswith('.json'):
+            path = os.path.join(cache, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+    for _, path in sorted(entries, reverse=True)[keep:]:
+        try:
+            os.remove(path)
+        except OSError:                               # another process got there first
+            pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Structural index of index.html script blocks')
+    ap.add_argument('file', nargs='?', default='index.html')
+    ap.add_argument('--find', nargs='+', metavar='NAME', help='names or CATALOGUE aliases')
+    ap.add_argument('--list', action='store_true', help='print every indexed symbol')
+    ap.add_argument('--kind', choices=('class', 'method', 'function'))
+    ap.add_argument('--check', action='store_true', help='fail if a CATALOGUE anchor is missing')
+    ap.add_argument('--no-cache', action='store_true')
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    idx = load(args.file, cache=None if args.no_cache else CACHE)
+    ms = (time.perf_counter() - t0) * 1000
+    kinds = {}
+    for e in idx.symbols:
+        kinds[e['kind']] = kinds.get(e['kind'], 0) + 1
+    print('[OK] %s: %d script blocks, %s in %.0f ms'
+          % (args.file, len(idx.blocks),
+             ', '.join('%d %s' % (v, k) for k, v in sorted(kinds.items())), ms))
+
+    def show(e):
+        print('   %-8s %-60s line %6d-%-6d bytes %d-%d'
+              % (e['kind'], e['name'][:60], e['line'], e['end_line'], e['bstart'], e['bend']))
+
+    if args.list:
+        for e in idx.symbols:
+            if not args.kind or e['kind'] == args.kind:
+                show(e)
+    missing = 0
+    for name in args.find or []:
+        hits = idx.lookup(name)
+        if not hits:
+            print('   [MISS] %s' % name)
+            missing += 1
+        for e in hits:
+            show(e)
+    if args.check:
+        for alias, spec in sorted(CATALOGUE.items()):
+            hits = idx.lookup(spec)
+            if not hits:
+                print('   [MISS] %-22s %s' % (alias, spec))
+                missing += 1
+            elif len(hits) > 1:
+                print('   [WARN] %-22s %s defined %d times, patches use line %d'
+                      % (alias, spec, len(hits), hits[0]['line']))
+            else:
+                print('   [OK]   %-22s %s line %d' % (alias, spec, hits[0]['line']))
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == '__main__':
+    main()
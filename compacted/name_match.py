@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+NAME MATCH: blocked fuzzy matching of TRGG list names against user_profiles
+===========================================================================
+
+The handicap lists say "Surname, First"; user_profiles.name is whatever the golfer
+typed into LINE ("Luke Abbey", "luke a.", "Abbey Luke"). Exact comparison lets
+duplicates through, which is what the find_*/check_*_duplicates.ps1 scripts
+and cleanup_duplicate_scorecards.ps1 were cleaning up after. Comparing every list
+name with every profile is 1,100 x thousands of string comparisons; this index
+keeps it near-linear:
+
+  blocking   - each indexed name is filed under the Soundex code of every token
+               (surname and given names alike, so word order does not matter).
+               A query is only scored against the names sharing a bucket, and
+               of those only the SHORTLIST with the best trigram Dice (a set
+               intersection) get the full alignment; if none is good enough,
+               the names sharing the most character trigrams are tried as a
+               fallback (typos in a first letter).
+  scoring    - token alignment: equal tokens score 1, an initial against a name
+               starting with it 0.8, near-spellings by difflib ratio; averaged
+               over the longer name and blended with trigram Dice similarity
+               (initials spelled out first, so "Lee, W.G." ~ "William George
+               Lee" scores 0.90). 1.0 = same tokens in any order.
+  decisions  - match() returns the best candidate when it clears `threshold`
+               and beats the runner-up by `margin`; match_all() also makes the
+               batch one-to-one. The surname (before the comma of a list name)
+               must be matched exactly or by its initial: "Smith, John" against
+               "John Smithers" scores 0.86 but is only a near-spelling, so it is
+               ambiguous. Everything else is marked ambiguous / unmatched and
+               left for a human.
+
+    index = NameIndex(profiles, key=lambda p: p['name'])
+    for name, hit in index.match_all(list_names): ...
+
+CLI (report only):
+    python name_match.py TRGGplayers/trgghcpjanuary/TRGG_Handicap_List.json profiles.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+THRESHOLD = 0.78
+MARGIN = 0.08
+SHORTLIST = 40                         # bucket members aligned per query, best trigram Dice first
+FALLBACK = 25                          # trigram candidates tried when no bucket matches
+MAX_DF = 0.05                          # ignore trigrams shared by more than 5% of names
+
+_SOUNDEX = str.maketrans('bfpvcgjkqsxzdtlmnr', '111122222222334556')
+
+
+def normalize_name(name):
+    """'Müller,  Hans-Peter' -> 'muller, hans peter' (order kept, comma = surname split)."""
+    folded = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    parts = [' '.join(re.findall(r'[a-z0-9]+', p)) for p in folded.split(',')]
+    return ', '.join(p for p in parts if p)
+
+
+def tokens(name):
+    """Order-free name tokens: 'Lee, W.G.' -> ['lee', 'w', 'g']."""
+    return normalize_name(name).replace(',', ' ').split()
+
+
+def surname(name):
+    """Surname tokens of a 'Surname, First' name: 'Allen Davis, Terry' -> ('allen', 'davis'); () without a comma."""
+    norm = normalize_name(name)
+    return tuple(norm.split(',')[0].split()) if ',' in norm else ()
+
+
+def _initial(a, b):
+    return a != b and (len(a) == 1) != (len(b) == 1) and a[0] == b[0]
+
+
+def soundex(token):
+    if not token:
+        return ''
+    codes = token.translate(_SOUNDEX)
+    out, last = [token[0]], codes[0]
+    for t, c in zip(token[1:], codes[1:]):
+        if c.isdigit() and c != last:
+            out.append(c)
+        if t not in 'hw':
+            last = c
+    return (''.join(out) + '000')[:4]
+
+
+def trigrams(toks):
+    s = ' %s ' % ' '.join(sorted(toks))
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def dice(a, b):
+    return 2.0 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+@lru_cache(maxsize=1 << 16)
+def _token_sim(a, b):
+    if a == b:
+        return 1.0
+    if len(a) == 1 or len(b) == 1:
+        return 0.8 if a[0] == b[0] else 0.0
+    if 2.0 * min(len(a), len(b)) / (len(a) + len(b)) < 0.75:   # ratio() can't reach the cut-off
+        return 0.0
+    m = SequenceMatcher(None, a, b)
+    if m.quick_ratio() < 0.75:
+        return 0.0
+    r = m.ratio()
+    return r if r >= 0.75 else 0.0
+
+
+def score(q_toks, q_grams, c_toks, c_grams):
+    """0..1 similarity of two tokenized names."""
+    if not q_toks or not c_toks:
+        return 0.0
+    short, long_ = (q_toks, c_toks) if len(q_toks) <= len(c_toks) else (c_toks, q_toks)
+    free, total, spelled = list(long_), 0.0, {}
+    for t in short:                                        # greedy best-first alignment
+        best, at = 0.0, -1
+        for i, u in enumerate(free):
+            s = _token_sim(t, u)
+            if s > best:
+                best, at = s, i
+                if s == 1.0:
+                    break
+        if at >= 0:
+            u = free.pop(at)
+            if _initial(t, u):
+                spelled[t if len(t) == 1 else u] = u if len(t) == 1 else t
+        total += best
+    if spelled:                                            # "w g lee" vs "william george lee"
+        q_grams = trigrams([spelled.get(t, t) for t in q_toks])
+        c_grams = trigrams([spelled.get(t, t) for t in c_toks])
+    return 0.75 * total / len(long_) + 0.25 * dice(q_grams, c_grams)
+
+
+class NameIndex:
+    """Soundex-blocked, trigram-backed fuzzy index over records with a name."""
+
+    def __init__(self, records, key=lambda r: r['name']):
+        self.records = list(records)
+        self.toks, self.grams, self.surnames = [], [], []
+        self.buckets = defaultdict(list)
+        self.postings = defaultdict(list)
+        for i, r in enumerate(self.records):
+            toks = tokens(key(r) or '')
+            grams = trigrams(toks)
+            self.toks.append(toks)
+            self.grams.append(grams)
+            self.surnames.append(surname(key(r) or ''))
+            for code in {soundex(t) for t in toks if len(t) > 1}:
+                self.buckets[code].append(i)
+            for g in grams:
+                self.postings[g].append(i)
+        cap = max(50, int(MAX_DF * len(self.records)))
+        self.postings = {g: ids for g, ids in self.postings.items() if len(ids) <= cap}
+        self.compared = 0
+
+    def candidates(self, toks):
+        seen = set()
+        for code in {soundex(t) for t in toks if len(t) > 1}:
+            seen.update(self.buckets.get(code, ()))
+        return seen
+
+    def _fallback(self, grams, exclude):
+        shared = Counter()
+        for g in grams:
+            shared.update(self.postings.get(g, ()))
+        return [i for i, _ in shared.most_common(FALLBACK + len(exclude)) if i not in exclude][:FALLBACK]
+
+    def _search(self, name, limit):
+        toks = tokens(name)
+        grams = trigrams(toks)
+        cands = self.candidates(toks)
+        # Common given names make big buckets: rank them by set-intersection Dice
+        # (cheap) and only align the front of the queue (difflib, not cheap).
+        short = sorted(cands, key=lambda i: -dice(grams, self.grams[i]))[:SHORTLIST]
+        scored = [(score(toks, grams, self.toks[i], self.grams[i]), i) for i in short]
+        if not scored or max(scored)[0] < THRESHOLD:
+            scored += [(score(toks, grams, self.toks[i], self.grams[i]), i) for i in self._fallback(grams, set(short))]
+        self.compared += len(scored)
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [(round(s, 4), i) for s, i in scored[:limit]]
+
+    def search(self, name, limit=3):
+        """[(score, record)] best first."""
+        return [(s, self.records[i]) for s, i in self._search(name, limit)]
+
+    def _result(self, status, hits, at=None):
+        return {'status': status, 'score': hits[0][0] if hits else 0.0,
+                'record': self.records[at] if at is not None else None,
+                'candidates': [(s, self.records[i]) for s, i in hits]}
+
+    def _surname_ok(self, name, i):
+        """Each surname token (of either side) is matched exactly or by an initial -
+        by the other surname when both are 'Surname, First' ("Komatsu, Takashi"
+        and "Takashi, Komatsu" are two list entries), else by any token."""
+        mine, theirs = surname(name), self.surnames[i]
+        pairs = ((mine, theirs), (theirs, mine)) if mine and theirs else \
+            ((mine, self.toks[i]), (theirs, tokens(name)))
+        for sur, other in pairs:
+            if any(t not in other and not any(_initial(t, u) for u in other) for t in sur):
+                return False
+        return True
+
+    @staticmethod
+    def _clear(best, runner_up, margin):
+        # An exact token match outranks any near-spelling: "Beaupre, Brian" and
+        # "Beupre, Brian" are both on the list, 0.92 apart but different people.
+        return best - runner_up >= margin or (best == 1.0 and runner_up < 1.0)
+
+    def match(self, name, threshold=THRESHOLD, margin=MARGIN):
+        """{'status': 'match'|'ambiguous'|'none', 'score', 'record', 'candidates'}"""
+        hits = self._search(name, 3)
+        if not hits or hits[0][0] < threshold:
+            return self._result('none', hits)
+        if len(hits) > 1 and not self._clear(hits[0][0], hits[1][0], margin) \
+                or not self._surname_ok(name, hits[0][1]):
+            return self._result('ambiguous', hits)
+        return self._result('match', hits, hits[0][1])
+
+    def match_all(self, names, threshold=THRESHOLD, margin=MARGIN):
+        """[(name, match dict)] in input order, reconciled one-to-one.
+
+        Besides beating its own runner-up, a match must beat every other name
+        in the batch that wants the same record by `margin`: "Bishop, Brian" and
+        "Beaupre, Brian" both score 0.8 against a profile called "Brian B.", and
+        neither gets it. A name that loses its record to a clearer claimant is
+        reported unmatched (status 'none', record taken).
+        """
+        hits = [self._search(n, 3) for n in names]
+        claims = defaultdict(list)
+        for q, h in enumerate(hits):
+            for s, i in h:
+                if s >= threshold:
+                    claims[i].append(s)
+        out = []
+        for name, h in zip(names, hits):
+            if not h or h[0][0] < threshold:
+                out.append((name, self._result('none', h)))
+                continue
+            best, at = h[0]
+            if len(h) > 1 and not self._clear(best, h[1][0], margin) or not self._surname_ok(name, at):
+                out.append((name, self._result('ambiguous', h)))
+                continue
+            rivals = sorted(claims[at], reverse=True)
+            rivals.remove(best)
+            if rivals and rivals[0] > best:
+                out.append((name, self._result('none', h)))
+            elif rivals and not self._clear(best, rivals[0], margin):
+                out.append((name, self._result('ambiguous', h)))
+            else:
+                out.append((name, self._result('match', h, at)))
+        return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Fuzzy-match a TRGG list against profile names (report only)')
+    ap.add_argument('list_json', help='golfers.json / TRGG_Handicap_List.json')
+    ap.add_argument('profiles_json', help='JSON array of {"line_user_id", "name"} rows')
+    ap.add_argument('--threshold', type=float, default=THRESHOLD)
+    ap.add_argument('--show', choices=['all', 'match', 'ambiguous', 'none'], default='ambiguous')
+    args = ap.parse_args()
+
+    with open(args.list_json, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    names = [p['name'] for p in data.get('golfers') or data.get('players') or []]
+    with open(args.profiles_json, 'r', encoding='utf-8') as f:
+        profiles = json.load(f)
+
+    t = time.perf_counter()
+    index = NameIndex(profiles)
+    results = index.match_all(names, args.threshold)
+    took = time.perf_counter() - t
+    counts = Counter(m['status'] for _, m in results)
+    for name, m in results:
+        if args.show in ('all', m['status']):
+            print('   [%s] %-30s %s' % (m['status'].upper(), name, ' | '.join(
+                '%s (%s) %.2f' % (r.get('name'), r.get('line_user_id', ''), s) for s, r in m['candidates'])))
+    print('[OK] %d names vs %d profiles: %d matched, %d ambiguous, %d unmatched - %d comparisons '
+          '(all-pairs: %d), %.2fs'
+          % (len(names), len(profiles), counts['match'], counts['ambiguous'], counts['none'],
+             index.compared, len(names) * len(profiles), took))
+    if counts['ambiguous']:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,34 +1,22 @@
 import sys
-
-# Read index.html
-with open('index.html', 'r', encoding='utf-8') as f:
-    content = f.read()
+from patch_engine import PatchError, Splice, patch_file
 
 # Read the patch
 with open('gps-sync-patch.js', 'r', encoding='utf-8') as f:
     patch = f.read()
 
-# Find the old detectCurrentHole function
-old_func_start = '        function detectCurrentHole() {'
-old_func_end = '        }\n\n        function calculateDistances()'
-
-start_idx = content.find(old_func_start)
-if start_idx == -1:
-    print('ERROR: Could not find detectCurrentHole function')
-    sys.exit(1)
-
-end_idx = content.find(old_func_end, start_idx)
-if end_idx == -1:
-    print('ERROR: Could not find end of detectCurrentHole function')
+# Replace the old detectCurrentHole function (up to calculateDistances)
+try:
+    patch_file('index.html', [
+        Splice('        function detectCurrentHole() {',
+               '        }\n\n        function calculateDistances()',
+               patch + '\n\n        function calculateDistances()',
+               name='detectCurrentHole -> GPS sync version'),
+    ])
+except PatchError as e:
+    print('ERROR: Could not find detectCurrentHole function (%s)' % e)
     sys.exit(1)
 
-# Replace the function
-new_content = content[:start_idx] + patch + '\n\n        function calculateDistances()' + content[end_idx + len(old_func_end):]
-
-# Write back
-with open('index.html', 'w', encoding='utf-8') as f:
-    f.write(new_content)
-
 print('SUCCESS: GPS sync function added to detectCurrentHole')
 print('  - updateGPSPositionsForTrafficMonitor() stores caddy position')
 print('  - Updates mcipro_gps_positions localStorage')
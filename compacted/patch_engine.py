@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+PATCH ENGINE: load index.html once, apply an ordered patch list, write once
+==========================================================================
+
+Every fix_*.py / OPTIMIZE_*.py script reads the whole 3.4 MB index.html and then
+runs 5-10 separate re.sub / str.replace passes over the full string. This module
+does the same edits with one read, one atomic write, and as few passes as the
+patch list allows:
+
+  Literal(old, new)            str.replace semantics (count=-1 -> all)
+  Regex(pattern, repl, flags)  re.sub, pattern compiled once
+  Splice(start, end, new)      find(start) ... find(end) range replace, like
+                               patch-gps-sync.py's detectCurrentHole splice
+
+Any patch can take within='<anchor>' (see anchors.py: 'LiveScorecardSystem',
+'LiveScorecardSystem.getGroupLeaderboard', catalogue aliases like
+'leaderboard'). It then runs only on that class/method/function slice, so its
+cost is proportional to the region, not to the 3.4 MB document. patch_file()
+takes the regions from the sha256-cached js_index.py symbol table, so a file
+that has not changed since the last run is never searched for them.
+
+Runs of consecutive Literal patches are merged into ONE regex-alternation pass
+whenever that provably gives the same result as applying them one by one (no
+patch's output feeds another patch, no pattern overlaps another). Otherwise
+they run sequentially — results never depend on the optimisation.
+
+A patch marked required=True (the default) that finds nothing makes
+patch_file() raise PatchError and leaves the file untouched, instead of the
+old scripts' "[WARN] not found" followed by a silent partial write.
+
+Patterns are written with '\n'; a CRLF checkout is patched on its '\n' form and
+written back with CRLF, as the old scripts' universal-newline open() did.
+
+Usage:
+    from patch_engine import Literal, Regex, Splice, patch_file
+    patch_file('index.html', [
+        Regex(r'transition:\\s*all\\s+0\\.3s', 'transition: all 0.1s', name='transitions'),
+        Literal('duration-300', 'duration-100'),
+        Splice('        function detectCurrentHole() {',
+               '        }\\n\\n        function calculateDistances()',
+               new_func + '\\n\\n        function calculateDistances()'),
+    ])
+"""
+
+import os
+import re
+import sys
+import time
+
+import js_index
+from anchors import AnchorError, Anchors
+
+
+class PatchError(Exception):
+    pass
+
+
+class Patch:
+    kind = 'patch'
+
+    def __init__(self, name=None, required=True, within=None):
+        self.name = name
+        self.required = required
+        self.within = within
+
+    def label(self):
+        label = self.name or self.describe()
+        return '%s @%s' % (label, self.within) if self.within else label
+
+    def describe(self):
+        return self.kind
+
+
+class Literal(Patch):
+    kind = 'literal'
+
+    def __init__(self, old, new, count=-1, name=None, required=True, within=None):
+        super().__init__(name, required, within)
+        if not old:
+            raise ValueError('Literal: empty search string')
+        self.old, self.new, self.count = old, new, count
+
+    def describe(self):
+        return 'literal %r' % self.old[:50]
+
+    def apply(self, text):
+        hits = text.count(self.old)
+        if self.count >= 0:
+            hits = min(hits, self.count)
+        return (text.replace(self.old, self.new, self.count) if hits else text), hits
+
+
+class Regex(Patch):
+    kind = 'regex'
+
+    def __init__(self, pattern, repl, flags=0, count=0, name=None, required=True, within=None):
+        super().__init__(name, required, within)
+        self.rx = pattern if hasattr(pattern, 'subn') else re.compile(pattern, flags)
+        self.repl, self.count = repl, count
+
+    def describe(self):
+        return 'regex /%s/' % self.rx.pattern[:50]
+
+    def apply(self, text):
+        return self.rx.subn(self.repl, text, count=self.count)
+
+
+class Splice(Patch):
+    """Replace text from the first `start` through the next `end` after it.
+    include_start/include_end=False keep that marker in the output."""
+    kind = 'splice'
+
+    def __init__(self, start, end, new, include_start=True, include_end=True,
+                 name=None, required=True, within=None):
+        super().__init__(name, required, within)
+        self.start, self.end, self.new = start, end, new
+        self.include_start, self.include_end = include_start, include_end
+
+    def describe(self):
+        return 'splice %r..%r' % (self.start[:30], self.end[:30])
+
+    def apply(self, text):
+        i = text.find(self.start)
+        if i == -1:
+            return text, 0
+        j = text.find(self.end, i + len(self.start))
+        if j == -1:
+            return text, 0
+        a = i if self.include_start else i + len(self.start)
+        b = j + len(self.end) if self.include_end else j
+        return text[:a] + self.new + text[b:], 1
+
+
+def _overlaps(a, b):
+    """True if some suffix of a is a prefix of b (so matches could overlap)."""
+    return any(b.startswith(a[k:]) for k in range(1, len(a)))
+
+
+def _mergeable(lits):
+    for x in lits:
+        if x.count >= 0:
+            return False
+        for y in lits:
+            if x is y:
+                continue
+            if (y.old in x.old or _overlaps(x.old, y.old) or
+                    y.old in x.new or x.new in y.old or
+                    _overlaps(x.new, y.old) or _overlaps(y.old, x.new)):
+                return False
+    return True
+
+
+class _LiteralGroup:
+    """Several independent Literal patches in one alternation pass."""
+
+    def __init__(self, lits):
+        self.lits = lits
+        self.by_old = {p.old: p for p in lits}
+        self.rx = re.compile('|'.join(re.escape(p.old) for p in lits))
+
+    def apply(self, text):
+        hits = dict.fromkeys(self.by_old, 0)
+
+        def sub(m):
+            hits[m.group(0)] += 1
+            return self.by_old[m.group(0)].new
+
+        return self.rx.sub(sub, text), [hits[p.old] for p in self.lits]
+
+
+def _plan(patches):
+    """Group runs of mergeable Literals; everything else is its own step."""
+    steps, run = [], []
+
+    def flush():
+        if len(run) > 1 and _mergeable(run):
+            steps.append(_LiteralGroup(list(run)))
+        else:
+            steps.extend(run)
+        run.clear()
+
+    for p in patches:
+        if isinstance(p, Literal) and not p.within:
+            run.append(p)
+        else:
+            flush()
+            steps.append(p)
+    flush()
+    return steps
+
+
+def apply_patches(text, patches, index=None):
+    """Apply patches in order. Returns (new_text, report) where report is a list of
+    {'patch', 'kind', 'hits', 'ms', 'required'} in patch order. `index` is a
+    js_index.JsIndex of `text` used for the first anchor lookups."""
+    report, anchors = {}, None
+    for step in _plan(patches):
+        t0 = time.perf_counter()
+        if isinstance(step, _LiteralGroup):
+            text, hits = step.apply(text)
+            ms = (time.perf_counter() - t0) * 1000 / len(step.lits)
+            for p, h in zip(step.lits, hits):
+                report[id(p)] = (h, ms, 'literal*')
+            if any(hits):
+                anchors = index = None
+        elif step.within:
+            if anchors is None:
+                anchors = Anchors(text, index)
+            try:
+                a, b = anchors.region(step.within)
+            except AnchorError:
+                report[id(step)] = (0, (time.perf_counter() - t0) * 1000, step.kind + ', no anchor')
+                continue
+            new, h = step.apply(text[a:b])
+            if h:
+                text = text[:a] + new + text[b:]
+                anchors.shift(a, b, len(new) - (b - a), text)
+            report[id(step)] = (h, (time.perf_counter() - t0) * 1000, step.kind)
+        else:
+            text, h = step.apply(text)
+            if h:
+                anchors = index = None
+            report[id(step)] = (h, (time.perf_counter() - t0) * 1000, step.kind)
+    rows = []
+    for p in patches:
+        h, ms, kind = report[id(p)]
+        rows.append({'patch': p.label(), 'kind': kind, 'hits': h, 'ms': round(ms, 2),
+                     'required': p.required})
+    return text, rows
+
+
+def print_report(rows, out=sys.stdout):
+    for r in rows:
+        tag = '[OK]  ' if r['hits'] else ('[MISS]' if r['required'] else '[skip]')
+        out.write('   %s %-60s %5d hit(s) %8.2f ms  (%s)\n'
+                  % (tag, r['patch'][:60], r['hits'], r['ms'], r['kind']))
+
+
+def patch_file(path, patches, dry_run=False, verbose=True):
+    """Read `path` once, apply `patches`, write back atomically (temp file +
+    os.replace) only if something changed and every required patch hit.
+    Returns the report rows; raises PatchError on a required miss."""
+    t0 = time.perf_counter()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        original = f.read()
+    # Patterns are written with '\n'. A CRLF checkout is matched on its '\n' form
+    # and written back as CRLF, so line endings survive either way.
+    crlf = original.count('\r\n') * 2 > original.count('\n')
+    source = original.replace('\r\n', '\n') if crlf else original
+    index = None
+    if any(p.within for p in patches):
+        # The on-disk cache holds offsets into the raw bytes; a normalised text gets its own index.
+        index = js_index.build(source) if crlf else js_index.load(path, original)
+    text, rows = apply_patches(source, patches, index)
+    if crlf:
+        text = text.replace('\r\n', '\n').replace('\n', '\r\n')
+    if verbose:
+        print_report(rows)
+    missing = [r['patch'] for r in rows if r['required'] and not r['hits']]
+    if missing:
+        raise PatchError('%s: required patch(es) found nothing, file NOT written: %s'
+                         % (path, '; '.join(missing)))
+    if text != original and not dry_run:
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        os.replace(tmp, path)
+    if verbose:
+        state = 'unchanged' if text == original else ('dry run' if dry_run else 'written')
+        print('   %s: %d patches, %s in %.0f ms'
+              % (path, len(patches), state, (time.perf_counter() - t0) * 1000))
+    return rows
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+POSTGREST STAND-IN: in-memory /rest/v1 for rehearsing imports offline
+=====================================================================
+
+Just enough of PostgREST for bulk_import.py and the loaders built on it:
+
+  GET  /rest/v1/<table>?select=a,b&col=eq.x&col=like.TRGG-*     (Range paging, 1000-row cap)
+  POST /rest/v1/<table>?on_conflict=a,b                          (insert / merge-duplicates upsert)
+  PATCH /rest/v1/<table>?col=in.(a,b)                            (update matching rows)
+  order=col.desc / limit=N on GET
+
+Tables live in memory, optionally seeded from a JSON file {"table": [rows...]},
+and can be dumped back out with --dump on exit. --fail-every N answers every Nth
+write with 503 and --drop-after N kills the server after N writes, so retry and
+checkpoint/resume can be exercised. Rows violating an on_conflict key without
+merge-duplicates get 409, like the real thing.
+
+Usage:
+    python postgrest_standin.py --port 54321 --seed standin.json [--dump out.json] [--fail-every 3]
+    SUPABASE_URL=http://127.0.0.1:54321 python load_trgg_players.py
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+MAX_ROWS = 1000
+
+
+def _match(row, col, expr):
+    op, _, val = expr.partition('.')
+    have = row.get(col)
+    if op == 'eq':
+        return str(have) == val if have is not None else False
+    if op == 'neq':
+        return str(have) != val
+    if op in ('like', 'ilike'):
+        pat = val.replace('%', '*')
+        if op == 'ilike':
+            return have is not None and fnmatch.fnmatchcase(str(have).lower(), pat.lower())
+        return have is not None and fnmatch.fnmatchcase(str(have), pat)
+    if op == 'in':
+        return str(have) in val.strip('()').split(',')
+    if op == 'is':
+        return have is None if val == 'null' else str(have).lower() == val
+    raise ValueError('unsupported operator %r' % op)
+
+
+def _filters(params):
+    return [(k, v) for k, v in params if k not in ('select', 'order', 'limit', 'offset', 'on_conflict')]
+
+
+class Store:
+    def __init__(self, tables=None, fail_every=0, drop_after=0):
+        self.tables = {k: list(v) for k, v in (tables or {}).items()}
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.fail_every, self.drop_after = fail_every, drop_after
+        self.requests = []
+
+    def select(self, table, params):
+        rows = self.tables.get(table, [])
+        out = [r for r in rows if all(_match(r, k, v) for k, v in _filters(params))]
+        opts = dict(params)
+        if 'order' in opts:
+            col, _, direction = opts['order'].partition('.')
+            out.sort(key=lambda r: (r.get(col) is None, r.get(col)), reverse=direction.startswith('desc'))
+        if 'limit' in opts:
+            out = out[int(opts.get('offset', 0)):int(opts.get('offset', 0)) + int(opts['limit'])]
+        cols = opts.get('select', '*')
+        if cols != '*':
+            names = [c.strip() for c in cols.split(',')]
+            out = [{c: r.get(c) for c in names} for r in out]
+        return out
+
+    def upsert(self, table, rows, on_conflict, merge):
+        keys = [k.strip() for k in on_conflict.split(',')] if on_conflict else []
+        with self.lock:
+            data = self.tables.setdefault(table, [])
+            if keys:
+                index = {tuple(r.get(k) for k in keys): r for r in data}
+                for row in rows:
+                    hit = index.get(tuple(row.get(k) for k in keys))
+                    if hit is not None and not merge:
+                        return 409
+                for row in rows:
+                    k = tuple(row.get(c) for c in keys)
+                    if k in index:
+                        index[k].update(row)
+                    else:
+                        data.append(dict(row))
+                        index[k] = data[-1]
+            else:
+                data.extend(dict(r) for r in rows)
+        return 201
+
+    def update(self, table, params, values):
+        with self.lock:
+            hits = [r for r in self.tables.get(table, []) if all(_match(r, k, v) for k, v in _filters(params))]
+            for r in hits:
+                r.update(values)
+        return 204
+
+
+def make_handler(store):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=b'', headers=None):
+            self.send_response(status)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _table(self):
+            u = urlsplit(self.path)
+            if not u.path.startswith('/rest/v1/'):
+                return None, []
+            return u.path[len('/rest/v1/'):], parse_qsl(u.query, keep_blank_values=True)
+
+        def do_GET(self):
+            table, params = self._table()
+            if table is None:
+                return self._send(404)
+            try:
+                rows = store.select(table, params)
+            except ValueError as e:
+                return self._send(400, json.dumps({'message': str(e)}).encode())
+            start, end = 0, len(rows) - 1
+            rng = self.headers.get('Range')
+            if rng:
+                a, _, b = rng.partition('-')
+                start, end = int(a), min(int(b) if b else end, end)
+            end = min(end, start + MAX_ROWS - 1)
+            page = rows[start:end + 1]
+            store.requests.append(('GET', table, len(page)))
+            self._send(200, json.dumps(page).encode(), {
+                'Content-Type': 'application/json',
+                'Content-Range': '%d-%d/%d' % (start, start + len(page) - 1, len(rows)) if page else '*/%d' % len(rows)})
+
+        def do_POST(self):
+            table, params = self._table()
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            if table is None:
+                return self._send(404)
+            with store.lock:
+                store.writes += 1
+                n = store.writes
+            if store.drop_after and n > store.drop_after:
+                os.kill(os.getpid(), signal.SIGTERM)
+                return
+            if store.fail_every and n % store.fail_every == 0:
+                store.requests.append(('POST', table, 503))
+                return self._send(503, b'{"message":"stand-in: injected failure"}')
+            rows = json.loads(body)
+            rows = rows if isinstance(rows, list) else [rows]
+            merge = 'merge-duplicates' in (self.headers.get('Prefer') or '')
+            status = store.upsert(table, rows, dict(params).get('on_conflict'), merge)
+            store.requests.append(('POST', table, status))
+            self._send(status, b'' if status < 300 else b'{"message":"duplicate key"}')
+
+        def do_PATCH(self):
+            table, params = self._table()
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            if table is None:
+                return self._send(404)
+            status = store.update(table, params, json.loads(body))
+            store.requests.append(('PATCH', table, status))
+            self._send(status)
+
+    return Handler
+
+
+def serve(tables=None, port=0, fail_every=0, drop_after=0):
+    """Start a stand-in on a background thread. Returns (server, store, url)."""
+    store = Store(tables, fail_every, drop_after)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(store))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, store, 'http://127.0.0.1:%d' % server.server_address[1]
+
+
+def main():
+    ap = argparse.ArgumentParser(description='In-memory PostgREST stand-in')
+    ap.add_argument('--port', type=int, default=54321)
+    ap.add_argument('--seed', help='JSON file {"table": [rows...]}')
+    ap.add_argument('--dump', help='write all tables here on exit')
+    ap.add_argument('--fail-every', type=int, default=0, help='answer every Nth write with 503')
+    ap.add_argument('--drop-after', type=int, default=0, help='exit after N writes (simulated crash)')
+    args = ap.parse_args()
+
+    tables = {}
+    if args.seed:
+        with open(args.seed, 'r', encoding='utf-8') as f:
+            tables = json.load(f)
+    server, store, url = serve(tables, args.port, args.fail_every, args.drop_after)
+
+    def stop(*_):
+        if args.dump:
+            with open(args.dump, 'w', encoding='utf-8') as f:
+                json.dump(store.tables, f, indent=1)
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print('[OK] PostgREST stand-in on %s/rest/v1 (%s)' % (url, ', '.join(
+        '%s: %d rows' % (t, len(r)) for t, r in store.tables.items()) or 'empty'))
+    threading.Event().wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+PRUNE CSS: used-class stylesheet pruning (+ optional critical CSS) for index.html
+=================================================================================
+
+ULTRA_OPTIMIZE.py / OPTIMIZE_EVERYTHING_NOW.py retune transition durations, but
+nothing measures or shrinks the CSS that ships. This build stage:
+
+  1. collects every class-like token of the page - markup class="..." values
+     and the words inside JS strings and template literals (the Tailwind
+     extractor rule: anything between quotes, backticks, <> and whitespace) -
+     and of every local <script src> file it loads and every file matched by
+     tailwind.config.js `content` globs (golf-buddies-system.js builds its
+     own markup);
+  2. turns template-literal classes such as `bg-${type.color}-100` into
+     patterns, and keeps only the tailwind.config.js safelist entries that one
+     of them can produce (the config safelists 22 colours x 11 shades x 18
+     prefixes "just in case");
+  3. prunes each stylesheet rule by rule: a selector survives if every class
+     it requires is used (or matches a pattern); rules, @media/@supports/@layer
+     blocks and @keyframes that end up empty or unreferenced are dropped;
+     tailwind-input.css's own rules (anything besides @tailwind) are added
+     and pruned the same way;
+  4. links the pruned sheet (assets/css/<name>.<sha256[:10]>.css); with
+     --inline-critical, the rules needed by the first --fold-kb of <body>
+     markup are inlined in <head> as a critical block and the sheet loads
+     without blocking first paint - unless that block is at least as big as
+     the pruning saved, in which case inlining only grows the page and is
+     skipped.
+
+The report ends with the net change: page plus stylesheets, before and after.
+
+tailwind.config.js is JavaScript, so it is read with node (the forms plugin
+stubbed out); without node the safelist report and content globs are skipped.
+
+While the page still loads the Play CDN (cdn.tailwindcss.com), that script
+generates its own styles at runtime: the pruned sheet is added next to it, not
+instead of it. The report says so; drop the CDN <script> to get the saving.
+
+Usage:
+    python prune_css.py ../www/index.html --css ../public/assets/tailwind.css \\
+        --out ../dist-css [--config ../tailwind.config.js] [--input ../tailwind-input.css] \\
+        [--inline-critical [--fold-kb 16]] [--prune-inline] [--safelist-out safelist.json]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+# ---------------------------------------------------------------------------
+# CSS parsing: [('rule', selector, body) | ('block', prelude, children) | ('raw', text)]
+# ---------------------------------------------------------------------------
+
+_GROUPING = ('@media', '@supports', '@layer', '@container', '@document', '@scope')
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+
+
+def _match_brace(css, i):
+    """css[i] == '{' -> index just past its '}' (strings and nested blocks aware)."""
+    depth, n = 0, len(css)
+    while i < n:
+        c = css[i]
+        if c in '"\'':
+            j = i + 1
+            while j < n and css[j] != c:
+                j += 2 if css[j] == '\\' else 1
+            i = j + 1
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def parse_css(css):
+    css = _COMMENT.sub('', css)
+    nodes, i, n = [], 0, len(css)
+    while i < n:
+        while i < n and css[i] in ' \t\r\n;':
+            i += 1
+        if i >= n:
+            break
+        j = i
+        while j < n and css[j] not in '{;':
+            if css[j] in '"\'':
+                q, j = css[j], j + 1
+                while j < n and css[j] != q:
+                    j += 2 if css[j] == '\\' else 1
+            j += 1
+        prelude = css[i:j].strip()
+        if j >= n or css[j] == ';':                   # @import / @charset / @layer a, b;
+            nodes.append(('raw', prelude + ';'))
+            i = j + 1
+            continue
+        end = _match_brace(css, j)
+        inner = css[j + 1:end - 1]
+        if prelude.startswith(_GROUPING):
+            nodes.append(('block', prelude, parse_css(inner)))
+        elif prelude.startswith('@'):
+            nodes.append(('raw', '%s{%s}' % (prelude, inner.strip())))
+        else:
+            nodes.append(('rule', prelude, inner.strip()))
+        i = end
+    return nodes
+
+
+def to_css(nodes):
+    out = []
+    for node in nodes:
+        if node[0] == 'rule':
+            out.append('%s{%s}' % (node[1], node[2]))
+        elif node[0] == 'block':
+            out.append('%s{%s}' % (node[1], to_css(node[2])))
+        else:
+            out.append(node[1])
+    return ''.join(out)
+
+
+def count_rules(nodes):
+    return sum(count_rules(n[2]) if n[0] == 'block' else n[0] == 'rule' for n in nodes)
+
+
+# ---------------------------------------------------------------------------
+# Selectors
+# ---------------------------------------------------------------------------
+
+_CLASS = re.compile(r'\.((?:\\[0-9a-fA-F]{1,6}\s?|\\.|[\w-]|[^\x00-\x7f])+)')
+_HEX_ESCAPE = re.compile(r'\\([0-9a-fA-F]{1,6})\s?')
+_FUNCTIONAL = re.compile(r':(?:not|where|is|has|matches|-webkit-any|-moz-any)\(')
+
+
+def _unescape(name):
+    name = _HEX_ESCAPE.sub(lambda m: chr(int(m.group(1), 16)), name)
+    return re.sub(r'\\(.)', r'\1', name)
+
+
+def _split_top(sel, sep=','):
+    parts, depth, cur = [], 0, []
+    for c in sel:
+        if c in '([':
+            depth += 1
+        elif c in ')]':
+            depth -= 1
+        if c == sep and depth == 0:
+            parts.append(''.join(cur))
+            cur = []
+        else:
+            cur.append(c)
+    parts.append(''.join(cur))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _strip_functional(sel):
+    """Drop :not(...)/:where(...)/:is(...) arguments: classes inside them are
+    alternatives or exclusions, not requirements."""
+    out, i = [], 0
+    for m in _FUNCTIONAL.finditer(sel):
+        if m.start() < i:
+            continue
+        out.append(sel[i:m.start()])
+        depth, j = 1, m.end()
+        while j < len(sel) and depth:
+            depth += {'(': 1, ')': -1}.get(sel[j], 0)
+            j += 1
+        i = j
+    out.append(sel[i:])
+    return ''.join(out)
+
+
+def required_classes(selector):
+    return {_unescape(c) for c in _CLASS.findall(_strip_functional(selector))}
+
+
+# ---------------------------------------------------------------------------
+# Class collection
+# ---------------------------------------------------------------------------
+
+_TOKEN = re.compile(r'[^<>"\'`\s]*[^<>"\'`\s:]')
+_SPLIT = re.compile(r'[\s,;(){}=+|&!?]+')
+_SPLIT_BANG = re.compile(r'[\s,;(){}=+|&?]+')      # keeps Tailwind's '!important' prefix: '(!container)'
+_DYNAMIC = re.compile(r'([A-Za-z][A-Za-z0-9:_/.-]*-)\$\{[^}`]*\}(-[A-Za-z0-9:_/.-]+)?')
+_SCRIPT_STYLE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.S | re.I)
+
+
+def collect(text):
+    """(tokens, patterns): every class-like word of the document, and compiled
+    regexes for classes built in template literals (`bg-${c}-100`)."""
+    tokens = set()
+    for t in _TOKEN.findall(text):
+        tokens.add(t)
+        tokens.update(_SPLIT.split(t))
+        tokens.update(_SPLIT_BANG.split(t))
+    tokens.discard('')
+    patterns = {}
+    for m in _DYNAMIC.finditer(text):
+        key = (m.group(1), m.group(2) or '')
+        if key not in patterns:
+            patterns[key] = re.compile('%s[A-Za-z0-9_./-]+%s$' % (re.escape(key[0]), re.escape(key[1])))
+    return tokens, list(patterns.values())
+
+
+_LOCAL_SRC = re.compile(r'<script\b[^>]*\bsrc\s*=\s*["\']([^"\'>]+)["\']', re.I)
+_TAILWIND_CDN = re.compile(r'<script\b[^>]*\bsrc\s*=\s*["\']?(?:https?:)?//cdn\.tailwindcss\.com', re.I)
+
+
+def page_scripts(html, base):
+    """Local files the page loads with <script src>, resolved against `base`."""
+    out = []
+    for src in _LOCAL_SRC.findall(html):
+        if re.match(r'(?:[a-z]+:)?//', src, re.I):
+            continue
+        path = os.path.normpath(os.path.join(base, src.split('?')[0].split('#')[0].lstrip('/')))
+        if os.path.isfile(path) and path not in out:
+            out.append(path)
+    return out
+
+
+def content_files(globs, root):
+    """Files matched by tailwind.config.js `content` globs (relative to the config)."""
+    out = []
+    for g in globs:
+        if not isinstance(g, str) or g.startswith('!'):
+            continue
+        for path in sorted(glob.glob(os.path.join(root, g), recursive=True)):
+            path = os.path.normpath(path)
+            if os.path.isfile(path) and 'node_modules' not in path.split(os.sep) and path not in out:
+                out.append(path)
+    return out
+
+
+class UsedClasses:
+    def __init__(self, tokens, patterns):
+        self.tokens, self.patterns = tokens, patterns
+        self.cache = {}
+
+    def __contains__(self, cls):
+        hit = self.cache.get(cls)
+        if hit is None:
+            hit = self.cache[cls] = cls in self.tokens or any(p.match(cls) for p in self.patterns)
+        return hit
+
+
+# ---------------------------------------------------------------------------
+# Pruning
+# ---------------------------------------------------------------------------
+
+_KEYFRAMES = re.compile(r'@(?:-webkit-)?keyframes\s+([\w-]+)')
+
+
+def _live(selector, used):
+    return all(c in used for c in required_classes(selector))
+
+
+def prune(nodes, used):
+    """Keep selectors whose required classes are all used; drop empty groups."""
+    out = []
+    for node in nodes:
+        if node[0] == 'rule':
+            live = [s for s in _split_top(node[1]) if _live(s, used)]
+            if live:
+                out.append(('rule', ','.join(live), node[2]))
+        elif node[0] == 'block':
+            kids = prune(node[2], used)
+            if kids:
+                out.append(('block', node[1], kids))
+        else:
+            out.append(node)
+    return _drop_unused_keyframes(out)
+
+
+def _drop_unused_keyframes(nodes):
+    body = to_css([n for n in nodes if not (n[0] == 'raw' and _KEYFRAMES.match(n[1]))])
+    out = []
+    for n in nodes:
+        m = n[0] == 'raw' and _KEYFRAMES.match(n[1])
+        if m and not re.search(r'(?<![\w-])%s(?![\w-])' % re.escape(m.group(1)), body):
+            continue
+        out.append(n)
+    return out
+
+
+def critical(nodes, fold_used):
+    """Rules the above-the-fold markup needs. Class-free rules (preflight,
+    :root variables) are included; @font-face/@keyframes are left to the full sheet."""
+    out = []
+    for node in nodes:
+        if node[0] == 'rule':
+            live = [s for s in _split_top(node[1]) if _live(s, fold_used)]
+            if live:
+                out.append(('rule', ','.join(live), node[2]))
+        elif node[0] == 'block' and not node[1].startswith('@layer properties'):
+            kids = critical(node[2], fold_used)
+            if kids:
+                out.append(('block', node[1], kids))
+        elif node[0] == 'raw' and node[1].startswith('@property'):
+            out.append(node)
+    return out
+
+
+def fold_markup(html, fold_kb):
+    """First fold_kb KB of <body> markup with script/style contents removed."""
+    i = html.lower().find('<body')
+    body = html[i if i != -1 else 0:]
+    return _SCRIPT_STYLE.sub('', body)[:int(fold_kb * 1024)]
+
+
+# ---------------------------------------------------------------------------
+# tailwind.config.js / tailwind-input.css
+# ---------------------------------------------------------------------------
+
+_NODE_READ = r'''
+const Module = require('module');
+const orig = Module.prototype.require;
+Module.prototype.require = function (m) {
+    try { return orig.apply(this, arguments); } catch (e) { return function () { return {}; }; }
+};
+const c = require(process.argv[1]);
+process.stdout.write(JSON.stringify({content: c.content || [], safelist: c.safelist || []}));
+'''
+
+
+def read_config(path):
+    """{'content': [...], 'safelist': [...]} from tailwind.config.js via node, or None."""
+    node = shutil.which('node')
+    if not node or not os.path.exists(path):
+        return None
+    try:
+        r = subprocess.run([node, '-e', _NODE_READ, os.path.abspath(path)],
+                           capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if r.returncode != 0:
+        return None
+    cfg = json.loads(r.stdout)
+    cfg['safelist'] = [s if isinstance(s, str) else s.get('pattern', '') for s in cfg['safelist']]
+    return cfg
+
+
+def input_rules(path):
+    """tailwind-input.css without its @tailwind directives (custom CSS only)."""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        css = f.read()
+    return [n for n in parse_css(css) if not (n[0] == 'raw' and n[1].startswith('@tailwind'))]
+
+
+# ---------------------------------------------------------------------------
+
+_STYLE_BLOCK = re.compile(r'(<style\b[^>]*>)(.*?)(</style\s*>)', re.S | re.I)
+
+
+def build(html, css_paths, out_dir, config=None, input_css=None, fold_kb=16,
+          prune_inline=False, prefix='assets/css/', base='.', inline_critical=False):
+    """Returns (new_html, report). Writes the pruned sheet under out_dir/prefix.
+    `base` is the page's directory, for its <script src> files."""
+    cfg = read_config(config) if config else None
+    scripts = page_scripts(html, base)
+    content = content_files(cfg['content'], os.path.dirname(os.path.abspath(config))) if cfg else []
+    tokens, patterns = collect(html)
+    for path in dict.fromkeys(scripts + content):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            t, p = collect(f.read())
+        tokens |= t
+        patterns += [x for x in p if x.pattern not in {y.pattern for y in patterns}]
+    used = UsedClasses(tokens, patterns)
+    report = {'sheets': [], 'inline': None, 'critical': None, 'safelist': None,
+              'sources': {'scripts': len(scripts), 'content': len(content)},
+              'cdn': bool(_TAILWIND_CDN.search(html))}
+
+    if cfg is not None:
+        needed = [s for s in cfg['safelist'] if s in used]
+        report['safelist'] = {'configured': len(cfg['safelist']), 'needed': len(needed),
+                              'content': cfg['content'], 'classes': needed}
+
+    nodes = input_rules(input_css)
+    for path in css_paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            css = f.read()
+        parsed = parse_css(css)
+        kept = prune(parsed, used)
+        report['sheets'].append({'file': path, 'bytes': len(css.encode('utf-8')),
+                                 'pruned_bytes': len(to_css(kept).encode('utf-8')),
+                                 'rules': count_rules(parsed), 'kept': count_rules(kept)})
+        nodes.extend(kept)
+    nodes = prune(nodes, used)
+    sheet = to_css(nodes)
+
+    if prune_inline:
+        before = after = 0
+
+        def sub(m):
+            nonlocal before, after
+            kept = to_css(prune(parse_css(m.group(2)), used))
+            before += len(m.group(2).encode('utf-8'))
+            after += len(kept.encode('utf-8'))
+            return m.group(1) + kept + m.group(3)
+
+        html = _STYLE_BLOCK.sub(sub, html)
+        report['inline'] = {'bytes': before, 'pruned_bytes': after}
+
+    data = sheet.encode('utf-8')
+    saved = sum(s['bytes'] for s in report['sheets']) - len(data)
+    if report['inline']:
+        saved += report['inline']['bytes'] - report['inline']['pruned_bytes']
+    crit = None
+    if inline_critical:
+        ftokens, _ = collect(fold_markup(html, fold_kb))
+        crit = to_css(critical(nodes, UsedClasses(ftokens, [])))
+        size = len(crit.encode('utf-8'))
+        report['critical'] = {'bytes': size, 'fold_kb': fold_kb, 'saved': saved, 'inlined': size < saved}
+        if size >= saved:
+            crit = None
+
+    name = 'styles.%s.css' % hashlib.sha256(data).hexdigest()[:10]
+    os.makedirs(os.path.join(out_dir, prefix), exist_ok=True)
+    with open(os.path.join(out_dir, prefix, name), 'wb') as f:
+        f.write(data)
+    href = prefix + name
+    report['sheet'] = {'file': href, 'bytes': len(data)}
+
+    if crit is None:
+        head = '<link rel="stylesheet" href="%s">\n' % href
+    else:
+        head = ('<style id="critical-css">%s</style>\n'
+                '    <link rel="preload" href="%s" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+                '    <noscript><link rel="stylesheet" href="%s"></noscript>\n' % (crit, href, href))
+    i = html.lower().find('</head>')
+    html = html[:i] + '    ' + head + html[i:] if i != -1 else head + html
+    return html, report
+
+
+def print_report(report, html_before, html_after):
+    for s in report['sheets']:
+        print('   [OK] %-40s %8.1f KB -> %7.1f KB  (%d/%d rules kept)'
+              % (s['file'][-40:], s['bytes'] / 1024, s['pruned_bytes'] / 1024, s['kept'], s['rules']))
+    if report['inline']:
+        i = report['inline']
+        print('   [OK] %-40s %8.1f KB -> %7.1f KB' % ('inline <style> blocks', i['bytes'] / 1024,
+                                                   i['pruned_bytes'] / 1024))
+    sl = report['safelist']
+    if sl is None:
+        print('   [WARN] tailwind.config.js not read (node missing?) - safelist not analysed')
+    else:
+        print('   [OK] safelist: %d configured, %d reachable from template literals'
+              % (sl['configured'], sl['needed']))
+    print('   [OK] classes collected from the page, %d <script src> files and %d content-glob files'
+          % (report['sources']['scripts'], report['sources']['content']))
+    if report['cdn']:
+        print('   [WARN] the page still loads cdn.tailwindcss.com, which generates styles at runtime: '
+              'the pruned sheet is added to it, not a replacement - remove that <script> to save anything')
+    c = report['critical']
+    if c and c['inlined']:
+        print('   [OK] critical CSS inlined: %.1f KB (first %g KB of <body>)' % (c['bytes'] / 1024, c['fold_kb']))
+    elif c:
+        print('   [WARN] critical CSS not inlined: %.1f KB, but pruning only saved %.1f KB'
+              % (c['bytes'] / 1024, c['saved'] / 1024))
+    sheets = sum(s['bytes'] for s in report['sheets'])
+    before, after = html_before + sheets, html_after + report['sheet']['bytes']
+    print('[OK] html %.1f KB -> %.1f KB, stylesheets %.1f KB -> %.1f KB: net %+.1f KB (%+.1f%%)'
+          % (html_before / 1024, html_after / 1024, sheets / 1024, report['sheet']['bytes'] / 1024,
+             (after - before) / 1024, 100.0 * (after - before) / before if before else 0))
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Prune CSS to the classes index.html uses; optionally inline critical CSS')
+    ap.add_argument('html', nargs='?', default='index.html')
+    ap.add_argument('--css', nargs='+', required=True, help='stylesheets to prune (e.g. a Tailwind build)')
+    ap.add_argument('--out', required=True, help='output directory (page + assets/css/)')
+    ap.add_argument('--config', default='../tailwind.config.js')
+    ap.add_argument('--input', default='../tailwind-input.css')
+    ap.add_argument('--inline-critical', action='store_true',
+                    help='inline the above-the-fold rules and load the sheet without blocking')
+    ap.add_argument('--fold-kb', type=float, default=16, help='body markup treated as above the fold')
+    ap.add_argument('--prune-inline', action='store_true', help="also prune the page's own <style> blocks")
+    ap.add_argument('--safelist-out', help='write the reachable safelist subset as JSON')
+    args = ap.parse_args()
+
+    with open(args.html, 'r', encoding='utf-8', newline='') as f:
+        html = f.read()
+    new, report = build(html, args.css, args.out, args.config, args.input, args.fold_kb, args.prune_inline,
+                        base=os.path.dirname(os.path.abspath(args.html)), inline_critical=args.inline_critical)
+    out_html = os.path.join(args.out, os.path.basename(args.html))
+    tmp = '%s.%d.tmp' % (out_html, os.getpid())
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        f.write(new)
+    os.replace(tmp, out_html)
+    if args.safelist_out:
+        if report['safelist'] is None:
+            print('[ERROR] --safelist-out needs tailwind.config.js (and node)')
+            sys.exit(1)
+        with open(args.safelist_out, 'w', encoding='utf-8') as f:
+            json.dump(report['safelist']['classes'], f, indent=1)
+    print_report(report, len(html.encode('utf-8')), len(new.encode('utf-8')))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,16 +3,150 @@
 Comprehensive HTML/JavaScript Scanner and Fixer
 Scans for:
 1. </script> in template literals/strings
-2. Syntax errors (unmatched quotes, backticks, parentheses, brackets)
+2. Syntax errors (unterminated strings/templates/comments; unmatched, mismatched
+   or unclosed parentheses, brackets and braces, with line and column)
 3. Performance bottlenecks
 4. Unterminated strings
 5. Missing closing tags
 6. Incorrect textContent vs innerHTML usage
+
+Directory mode scans every .js/.html file under the given paths in a process
+pool, caches each file's issues by content hash (~/.cache/mcipro-scan or
+$SCAN_CACHE), and writes one merged report as JSON and/or SARIF 2.1.0:
+
+    python scan_and_fix.py ../www ../public ../*.js --json scan.json --sarif scan.sarif
 """
 
-import re
+import argparse
+import bisect
+import hashlib
 import json
+import os
+import re
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import anchors
+import js_index
+from anchors import _regex_allowed
+from js_index import script_blocks
+
+_DELIM = re.compile(r'[(){}\[\]"\'`/]')
+_STRING = {q: re.compile(r'%s(?:[^%s\\\n]|\\[\s\S])*(%s?)' % (q, q, q)) for q in '"\''}
+_TEMPLATE_BODY = re.compile(r'(?:[^`\\$]|\\[\s\S]|\$(?!\{))*')
+_REGEX_LITERAL = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/')
+_CLOSER = {'(': ')', '[': ']', '{': '}', '${': '}'}
+
+
+def check_delimiters(text, lo=0, hi=None):
+    """Lex JavaScript text[lo:hi] once, carrying string / template / regex /
+    comment / nesting state across lines. Returns [(pos, issue, fix)] for every
+    unterminated literal or comment and every unmatched, mismatched or unclosed
+    bracket; '{at}' in an issue is the partner delimiter's position."""
+    hi = len(text) if hi is None else hi
+    stack, out, i = [], [], lo           # stack: (opener, pos, template start or None)
+
+    def template(i, start):
+        """In a template literal at i -> index after the closing backtick or '${'."""
+        j = _TEMPLATE_BODY.match(text, i, hi).end()
+        if j >= hi:
+            out.append((start, 'Unterminated template literal', 'Close the template literal with `', None))
+            return hi
+        if text[j] == '`':
+            return j + 1
+        stack.append(('${', j, start))
+        return j + 2
+
+    while i < hi:
+        m = _DELIM.search(text, i, hi)
+        if not m:
+            break
+        p, c = m.start(), m.group()
+        i = p + 1
+        if c in '([{':
+            stack.append((c, p, None))
+        elif c in ')]}':
+            if stack and _CLOSER[stack[-1][0]] == c:
+                opener, _, tpl = stack.pop()
+                if opener == '${':
+                    i = template(p + 1, tpl)
+                continue
+            k = len(stack) - 1
+            while k >= 0 and stack[k][0] != '${' and _CLOSER[stack[k][0]] != c:
+                k -= 1
+            if k < 0 or stack[k][0] == '${':
+                if stack:
+                    out.append((p, "Unmatched '%s': expected '%s' to close '%s' from {at}"
+                                % (c, _CLOSER[stack[-1][0]], stack[-1][0]),
+                                'Remove the stray delimiter or add its opener', stack[-1][1]))
+                else:
+                    out.append((p, "Unmatched '%s': nothing open" % c,
+                                'Remove the stray delimiter or add its opener', None))
+                continue
+            while len(stack) > k + 1:          # the closer matches further down:
+                opener, pos, _ = stack.pop()   # everything above it was never closed
+                out.append((pos, "Unclosed '%s': reached '%s' at {at}" % (opener, c),
+                            "Add the missing '%s'" % _CLOSER[opener], p))
+            stack.pop()
+        elif c in '"\'':
+            sm = _STRING[c].match(text, p, hi)
+            if not sm.group(1):
+                out.append((p, 'Unterminated string literal', 'Close the string on the same line', None))
+            i = sm.end()
+        elif c == '`':
+            i = template(p + 1, p)
+        elif text.startswith('//', p):
+            j = text.find('\n', p, hi)
+            i = hi if j == -1 else j
+        elif text.startswith('/*', p):
+            j = text.find('*/', p + 2, hi)
+            if j == -1:
+                out.append((p, 'Unterminated block comment', 'Close the comment with */', None))
+                i = hi
+            else:
+                i = j + 2
+        elif _regex_allowed(text, p):
+            rm = _REGEX_LITERAL.match(text, p, hi)
+            if rm:                              # otherwise it was a division after all
+                i = rm.end()
+    for opener, pos, _ in stack:
+        out.append((pos, "Unclosed '%s'" % opener, "Add the missing '%s'" % _CLOSER[opener], None))
+    return out
+
+
+def delimiter_issues(text, lines, file_path):
+    """check_delimiters over the script bodies of an .html file or a whole .js
+    file, as issue dicts with line and column."""
+    if file_path.lower().endswith(('.html', '.htm')):
+        ranges = [(lo, hi) for lo, hi, _ in script_blocks(text)]
+    elif file_path.lower().endswith(('.js', '.mjs')):
+        ranges = [(0, len(text))]
+    else:
+        return []
+    starts = [0]
+    for line in lines:
+        starts.append(starts[-1] + len(line))
+
+    def where(pos):
+        n = bisect.bisect_right(starts, pos)
+        return n, pos - starts[n - 1] + 1
+
+    issues = []
+    for lo, hi in ranges:
+        for pos, issue, fix, other in check_delimiters(text, lo, hi):
+            line, col = where(pos)
+            if other is not None:
+                issue = issue.replace('{at}', 'line %d col %d' % where(other))
+            issues.append({
+                'line': line,
+                'column': col,
+                'type': 'SYNTAX',
+                'issue': issue.replace(' from {at}', ''),
+                'content': lines[line - 1].strip()[:100],
+                'fix': fix
+            })
+    return issues
 
 def scan_file(file_path):
     """Scan the file for all issues"""
@@ -21,15 +155,6 @@ def scan_file(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         lines = f.readlines()
 
-    # Track state
-    in_script = False
-    in_template_literal = False
-    in_string = False
-    string_char = None
-    paren_stack = []
-    bracket_stack = []
-    brace_stack = []
-
     for line_num, line in enumerate(lines, 1):
         # Check for </script> in strings or template literals
         if '</script>' in line.lower():
@@ -45,62 +170,6 @@ def scan_file(file_path):
                         'fix': 'Replace </script> with <\\/script>'
                     })
 
-        # Check for unmatched quotes/backticks
-        stripped = line.strip()
-
-        # Count quotes (excluding escaped ones)
-        single_quotes = len(re.findall(r"(?<!\\)'", line))
-        double_quotes = len(re.findall(r'(?<!\\)"', line))
-        backticks = len(re.findall(r'(?<!\\)`', line))
-
-        # Check for odd number of quotes (potential unterminated string)
-        if single_quotes % 2 != 0 and not line.strip().endswith(',') and not line.strip().endswith(';'):
-            if "don't" not in line.lower() and "it's" not in line.lower():
-                issues.append({
-                    'line': line_num,
-                    'type': 'SYNTAX',
-                    'issue': 'Potentially unterminated single-quoted string',
-                    'content': line.strip()[:100],
-                    'fix': 'Check string termination'
-                })
-
-        # Check for unmatched parentheses in the line
-        open_paren = line.count('(')
-        close_paren = line.count(')')
-        if open_paren != close_paren:
-            # This might be multi-line, but flag it
-            issues.append({
-                'line': line_num,
-                'type': 'WARNING',
-                'issue': f'Unmatched parentheses: {open_paren} open, {close_paren} close',
-                'content': line.strip()[:100],
-                'fix': 'Verify parentheses matching'
-            })
-
-        # Check for unmatched brackets
-        open_bracket = line.count('[')
-        close_bracket = line.count(']')
-        if open_bracket != close_bracket:
-            issues.append({
-                'line': line_num,
-                'type': 'WARNING',
-                'issue': f'Unmatched brackets: {open_bracket} open, {close_bracket} close',
-                'content': line.strip()[:100],
-                'fix': 'Verify bracket matching'
-            })
-
-        # Check for unmatched braces
-        open_brace = line.count('{')
-        close_brace = line.count('}')
-        if open_brace != close_brace:
-            issues.append({
-                'line': line_num,
-                'type': 'WARNING',
-                'issue': f'Unmatched braces: {open_brace} open, {close_brace} close',
-                'content': line.strip()[:100],
-                'fix': 'Verify brace matching'
-            })
-
         # Performance checks
         if 'querySelectorAll' in line and 'forEach' in line:
             issues.append({
@@ -143,6 +212,10 @@ def scan_file(file_path):
                     'fix': 'Add semicolon'
                 })
 
+    # Quotes and brackets: one lexer pass with state carried across lines
+    issues.extend(delimiter_issues(''.join(lines), lines, file_path))
+    issues.sort(key=lambda i: i['line'])
+
     return issues, lines
 
 def fix_issues(issues, lines):
@@ -176,14 +249,183 @@ def generate_report(issues):
             report.append(f"\n{issue_type} ISSUES ({len(by_type[issue_type])})")
             report.append("-" * 80)
             for issue in by_type[issue_type]:
-                report.append(f"\nLine {issue['line']}: {issue['issue']}")
+                col = f":{issue['column']}" if 'column' in issue else ''
+                report.append(f"\nLine {issue['line']}{col}: {issue['issue']}")
                 report.append(f"  Content: {issue['content']}")
                 report.append(f"  Fix: {issue['fix']}")
 
     return "\n".join(report)
 
+
+# ---------------------------------------------------------------------------
+# Directory mode: many files, process pool, per-content-hash cache
+# ---------------------------------------------------------------------------
+
+CACHE = os.environ.get('SCAN_CACHE', os.path.expanduser('~/.cache/mcipro-scan'))
+EXTENSIONS = ('.js', '.html')
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__', '.vercel', 'dist'}
+TYPES = ['CRITICAL', 'SYNTAX', 'SECURITY', 'PERFORMANCE', 'WARNING', 'STYLE']
+SARIF_LEVEL = {'CRITICAL': 'error', 'SYNTAX': 'error', 'SECURITY': 'warning',
+               'PERFORMANCE': 'note', 'WARNING': 'warning', 'STYLE': 'note'}
+
+# Cached results are only valid for the scanner that produced them - this file and
+# the lexer / script-block code it borrows from anchors.py and js_index.py.
+_h = hashlib.sha256()
+for _m in (__file__, anchors.__file__, js_index.__file__):
+    with open(_m, 'rb') as _f:
+        _h.update(_f.read())
+SCANNER_VERSION = _h.hexdigest()[:12]
+
+
+def find_files(paths, extensions=EXTENSIONS):
+    """Files under `paths` (files or directories), sorted, skipping vendored dirs."""
+    found = []
+    for p in paths:
+        if os.path.isfile(p):
+            found.append(p)
+            continue
+        for root, dirs, files in os.walk(p):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            found.extend(os.path.join(root, f) for f in sorted(files)
+                         if f.lower().endswith(extensions))
+    return found
+
+
+def _scan_path(path):
+    issues, _ = scan_file(path)
+    return issues
+
+
+def scan_tree(paths, workers=None, cache=CACHE):
+    """Scan every file; unchanged content is answered from the cache.
+    Returns (results, stats) where results maps file -> (sha256, issues)."""
+    files = find_files(paths)
+    results, todo = {}, {}
+    for path in files:
+        with open(path, 'rb') as f:
+            sha = hashlib.sha256(f.read()).hexdigest()
+        hit = os.path.join(cache, '%s-%s.json' % (SCANNER_VERSION, sha)) if cache else None
+        if hit and os.path.exists(hit):
+            with open(hit, 'r', encoding='utf-8') as f:
+                results[path] = (sha, json.load(f))
+        else:
+            todo.setdefault(sha, []).append(path)
+
+    if todo:
+        # identical copies (www/ vs public/) are analysed once
+        jobs = {sha: paths_[0] for sha, paths_ in todo.items()}
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = {sha: ex.submit(_scan_path, p) for sha, p in jobs.items()}
+            for sha, fut in futures.items():
+                try:
+                    issues = fut.result()
+                except (UnicodeDecodeError, OSError) as e:
+                    print(f"  [skip] {jobs[sha]}: {e}")
+                    continue
+                for p in todo[sha]:
+                    results[p] = (sha, issues)
+                if cache:
+                    os.makedirs(cache, exist_ok=True)
+                    tmp = os.path.join(cache, '%s-%s.%d.tmp' % (SCANNER_VERSION, sha, os.getpid()))
+                    with open(tmp, 'w', encoding='utf-8') as f:
+                        json.dump(issues, f)
+                    os.replace(tmp, os.path.join(cache, '%s-%s.json' % (SCANNER_VERSION, sha)))
+
+    stats = {'files': len(files), 'cached': len(files) - sum(len(v) for v in todo.values()),
+             'analysed': len(todo)}
+    return results, stats
+
+
+def merge_results(results):
+    """One flat list of findings. Files with identical content (copies in www/,
+    public/, ...) are reported once with every path listed in 'also'; exact
+    repeats of the same finding on the same line are dropped."""
+    by_sha = {}
+    for path in sorted(results):
+        sha, issues = results[path]
+        by_sha.setdefault(sha, ([], issues))[0].append(path)
+    merged = []
+    for paths_, issues in by_sha.values():
+        seen = set()
+        for issue in issues:
+            key = (issue['line'], issue['type'], issue['issue'])
+            if key in seen:
+                continue
+            seen.add(key)
+            row = dict(issue, file=paths_[0])
+            if len(paths_) > 1:
+                row['also'] = paths_[1:]
+            merged.append(row)
+    merged.sort(key=lambda r: (TYPES.index(r['type']) if r['type'] in TYPES else len(TYPES),
+                               r['file'], r['line']))
+    return merged
+
+
+def rule_id(issue):
+    """Stable rule id: type plus the message up to any ':' detail (counts etc.)."""
+    return _rule_id(issue['type'], issue['issue'].split(':')[0])
+
+
+@lru_cache(maxsize=None)
+def _rule_id(type_, text):
+    return '%s/%s' % (type_.lower(), re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-'))
+
+
+def to_sarif(merged):
+    """SARIF 2.1.0 log of the merged findings."""
+    rules = {}
+    for r in merged:
+        rid = rule_id(r)
+        if rid not in rules:
+            rules[rid] = {'id': rid, 'shortDescription': {'text': r['issue'].split(':')[0]},
+                          'help': {'text': r['fix']},
+                          'defaultConfiguration': {'level': SARIF_LEVEL.get(r['type'], 'warning')}}
+    results = []
+    for r in merged:
+        locations = [{'physicalLocation': {
+            'artifactLocation': {'uri': os.path.normpath(p).replace(os.sep, '/')},
+            'region': {'startLine': r['line']}}} for p in [r['file']] + r.get('also', [])]
+        results.append({'ruleId': rule_id(r), 'level': SARIF_LEVEL.get(r['type'], 'warning'),
+                        'message': {'text': '%s: %s' % (r['issue'], r['content'])},
+                        'locations': locations})
+    return {'$schema': 'https://json.schemastore.org/sarif-2.1.0.json', 'version': '2.1.0',
+            'runs': [{'tool': {'driver': {'name': 'scan_and_fix',
+                                          'rules': list(rules.values())}},
+                      'results': results}]}
+
+
+def main_tree(args):
+    results, stats = scan_tree(args.paths, args.workers, None if args.no_cache else CACHE)
+    merged = merge_results(results)
+    print(f"Scanned {stats['files']} files: {stats['analysed']} analysed, {stats['cached']} from cache")
+    print(f"Found {len(merged)} issues")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'stats': stats, 'issues': merged}))    # C encoder: no indent
+        print(f"JSON report saved to: {args.json}")
+    if args.sarif:
+        with open(args.sarif, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(to_sarif(merged)))
+        print(f"SARIF report saved to: {args.sarif}")
+    by_type = defaultdict(int)
+    for issue in merged:
+        by_type[issue['type']] += 1
+    for issue_type in TYPES:
+        if issue_type in by_type:
+            print(f"{issue_type}: {by_type[issue_type]}")
+
 def main():
-    file_path = "C:/Users/pete/Documents/MciPro/index.html"
+    ap = argparse.ArgumentParser(description='Scan HTML/JS files for syntax and performance issues')
+    ap.add_argument('paths', nargs='*', help='files or directories (default: the index.html below)')
+    ap.add_argument('--json', help='merged JSON report (directory mode)')
+    ap.add_argument('--sarif', help='merged SARIF 2.1.0 report (directory mode)')
+    ap.add_argument('--workers', type=int, default=None)
+    ap.add_argument('--no-cache', action='store_true')
+    args = ap.parse_args()
+    if len(args.paths) > 1 or args.json or args.sarif or any(os.path.isdir(p) for p in args.paths):
+        return main_tree(args)
+
+    file_path = args.paths[0] if args.paths else "C:/Users/pete/Documents/MciPro/index.html"
     output_path = "C:/Users/pete/Documents/MciPro/index-fixed.html"
     report_path = "C:/Users/pete/Documents/MciPro/scan-report.txt"
 
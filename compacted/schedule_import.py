@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+SCHEDULE IMPORT: TRGG schedule files -> society_events, any month, one idempotent run
+====================================================================================
+
+Replaces generate_november_sql.py, generate_december_sql.py and
+generate_december_sql_from_json.py. Input is any mix of the schedule shapes
+the repo has produced:
+
+  scraped     {"date": "20", "day": "MON", "course": ..., "departure": "08.30", "first_tee": ...}
+  formatted   {"event_date": ..., "course_name": ..., "departure_time": ..., "pricing": {...}}
+  month file  {"date": 2, "day": "Tue", "courses": [...], "depart": [...], "tee_off": [...]}
+  {"events": [...]} wrapper (scrape_trgg_schedule.py output) around any of the above
+
+Multi-course days ("KHAO KHEOW (6 GROUPS) A-B\\nKHAO KHEOW (6 GROUPS) C-A") become
+one event per course; departure/tee/fee columns pair up line by line.
+
+  courses    - parse_course() reads a cell into course / groups / nines / 2-way /
+               holiday / special round; the course is matched against COURSES
+               (aliases and near-spellings such as "KHOA KHEOW" included).
+  dates      - rows carrying only a day number are laid out from a start month
+               (FILE@YYYY-MM) and roll into the next month - and year - whenever the
+               day number goes backwards. Weekdays are checked against the
+               calendar. Without @YYYY-MM a YYYY-MM in the file name
+               (trgg_schedule_2025-12.json) is the start month, and it must fit;
+               failing both, the start month is inferred from the weekdays only
+               when exactly one month near today fits. Anything else is an error,
+               not a guess. Cutoff is the day before at 18:00 Bangkok time,
+               across month and year ends.
+  ids        - the text ids the generate_*_sql.py imports already put in
+               society_events: "trgg-<date>-" + the course cell with their group /
+               2-way tags dropped, lower-cased, spaces to dashes, cut to 20
+               characters. When a day's courses came as one multi-line cell, the
+               first course takes the id of the whole cell (those imports made
+               one row per day: "trgg-2025-11-03-khao-kheow-khao-kheo"); other
+               courses their own line's. Clashes get "-<nines>" or "-2".
+               A re-run, a later file or an old import of the same event lands
+               on the same row.
+  SQL        - multi-row INSERT ... ON CONFLICT (id) DO UPDATE, BATCH rows per
+               statement, %s placeholders + parameter lists. Rows whose values did
+               not change are not rewritten (IS DISTINCT FROM guard).
+
+Usage:
+    python schedule_import.py compacted/trgg_schedule_formatted.json@2025-10 TRGGschedule/trgg_schedule_2025-12.json
+        -> sql/import-trgg-schedule-2025-10-to-2025-12.sql (paste into the Supabase SQL editor)
+    python schedule_import.py ... --dsn postgresql://...   (execute directly; needs psycopg2)
+    python schedule_import.py ... --dry-run                (list events only)
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import date, datetime, time, timedelta, timezone
+from difflib import get_close_matches
+
+ORGANIZER_ID = 'U2b6d976f19bca4b2f4374ae0e10ed873'
+ORGANIZER_NAME = 'Travellers Rest Golf Group'
+BANGKOK = timezone(timedelta(hours=7))
+CUTOFF = time(18, 0)                                  # registration closes the day before
+MAX_PARTICIPANTS = 80
+BATCH = 100                                           # rows per INSERT statement
+LEGACY_TAGS = (' (6 GROUPS) A-B', ' (6 GROUPS) C-A', ' (6 GROUPS) B-C', ' (2 WAY)', ' (TWO WAY)', ' (3 GROUPS)',
+               ' A-B')                                # dropped from ids by the generate_*_sql.py imports
+
+# Canonical course name -> aliases seen in TRGG schedules
+COURSES = {
+    'BANGPAKONG': ['BANG PAKONG'],
+    'BANGPRA': ['BANG PRA'],
+    'BURAPHA': [],
+    'EASTERN STAR': [],
+    'GREEN VALLEY': [],
+    'GREENWOOD': ['GREEN WOOD'],
+    'KHAO KHEOW': ['KHOA KHEOW', 'KHAO KHEAW'],
+    'MOUNTAIN SHADOW': [],
+    'PATTANA': [],
+    'PATTAYA C.C.': ['PATTAYA CC', 'PATTAYA COUNTRY CLUB'],
+    'PHOENIX': [],
+    'PLEASANT VALLEY': [],
+    'PLUTALUANG': ['PLUTALUANG NAVY'],
+    'ROYAL LAKESIDE': [],
+    'SILKY OAK': [],
+    'ST ANDREWS': ['ST. ANDREWS', 'ST ANDREWS 2000', 'SAINT ANDREWS'],
+    'TREASURE HILL': [],
+}
+SPECIALS = {                                          # round name -> society_events.format
+    'TWO MAN SCRAMBLE': 'scramble',
+    'MONTHLY MEDAL STROKE': 'strokeplay',
+    'FREE FOOD FRIDAY': None,
+}
+WEEKDAYS = ('MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN')
+COLUMNS = ('id', 'title', 'event_date', 'start_time', 'departure_time', 'cutoff', 'format', 'entry_fee',
+           'max_participants', 'organizer_id', 'organizer_name', 'course_name', 'description',
+           'creator_type', 'is_private')
+
+_ALIASES = {re.sub(r'[^A-Z0-9]', '', a): c for c, names in COURSES.items() for a in [c] + names}
+_PAREN = re.compile(r'\(([^)]*)\)')
+_NINES = re.compile(r'\b([A-Z])\s*-\s*([A-Z])\b')
+
+
+class ScheduleError(ValueError):
+    pass
+
+
+def _key(text):
+    return re.sub(r'[^A-Z0-9]', '', text.upper())
+
+
+def match_course(text):
+    """'Khoa Kheow' -> 'KHAO KHEOW'; unknown names come back cleaned, not dropped."""
+    k = _key(text)
+    if k in _ALIASES:
+        return _ALIASES[k]
+    close = get_close_matches(k, _ALIASES, n=1, cutoff=0.8)
+    return _ALIASES[close[0]] if close else ' '.join(text.upper().split())
+
+
+def parse_course(cell):
+    """'Treasure Hill (2-Way) (Holiday) Free Food Friday' -> dict of its parts."""
+    text = ' '.join(cell.upper().split())
+    out = {'raw': cell.strip(), 'groups': None, 'two_way': False, 'holiday': False, 'nines': None, 'special': None}
+    for inner in _PAREN.findall(text):
+        g = re.match(r'(\d+)\s*GROUPS?$', inner.strip())
+        if g:
+            out['groups'] = int(g.group(1))
+        elif _key(inner) in ('2WAY', 'TWOWAY'):
+            out['two_way'] = True
+        elif _key(inner) == 'HOLIDAY':
+            out['holiday'] = True
+    text = _PAREN.sub(' ', text)
+    for name in SPECIALS:
+        if name in text:
+            out['special'] = name
+            text = text.replace(name, ' ')
+    nines = _NINES.search(text)
+    if nines:
+        out['nines'] = '%s-%s' % nines.groups()
+        text = text[:nines.start()] + ' ' + text[nines.end():]
+    out['course'] = match_course(text)
+    return out
+
+
+def parse_time(value):
+    """'08.50' / '8:50' -> '08:50'; None for blanks."""
+    m = re.match(r'\s*(\d{1,2})[.:h](\d{2})', str(value or ''))
+    if not m:
+        return None
+    return '%02d:%s' % (int(m.group(1)), m.group(2))
+
+
+def parse_fee(value):
+    m = re.search(r'\d[\d,]*', str(value or ''))
+    return int(m.group().replace(',', '')) if m else None
+
+
+def _lines(value):
+    if isinstance(value, list):
+        return [v for v in value if str(v).strip()]
+    return [v.strip() for v in str(value).split('\n') if v.strip()] if value not in (None, '') else []
+
+
+def normalize_row(raw):
+    """Any schedule row shape -> {'date', 'day', 'courses', 'depart', 'tee_off', 'green_fee', 'caddy', 'cart',
+    'cell'}; 'cell' is the whole course cell when the courses came as one (multi-line) string."""
+    pricing = raw.get('pricing') or {}
+    courses = raw.get('courses', raw.get('course_name', raw.get('course')))
+    return {
+        'date': raw.get('event_date', raw.get('date')),
+        'day': (raw.get('event_day') or raw.get('day') or '').strip().upper()[:3] or None,
+        'courses': _lines(courses),
+        'depart': _lines(raw.get('depart', raw.get('departure_time', raw.get('departure')))),
+        'tee_off': _lines(raw.get('tee_off', raw.get('first_tee_time', raw.get('first_tee')))),
+        'green_fee': _lines(raw.get('green_fee', pricing.get('green_fee'))),
+        'caddy': _lines(raw.get('caddy', raw.get('caddy_fee', pricing.get('caddy_fee')))),
+        'cart': _lines(raw.get('cart', raw.get('cart_fee', pricing.get('cart_fee')))),
+        'cell': raw.get('cell') or (' '.join(_lines(courses)) if isinstance(courses, str) else None),
+    }
+
+
+def load_rows(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('events') or []
+    return [normalize_row(r) for r in data]
+
+
+def _add_month(year, month, n=1):
+    k = year * 12 + month - 1 + n
+    return k // 12, k % 12 + 1
+
+
+def resolve_dates(rows, start):
+    """Give every row a datetime.date. `start` = (year, month) of the first day-number row."""
+    year, month = start
+    last = 0
+    out = []
+    for r in rows:
+        d = r['date']
+        if isinstance(d, str) and re.match(r'\d{4}-\d{2}-\d{2}$', d):
+            when = date.fromisoformat(d)
+            year, month, last = when.year, when.month, when.day
+        else:
+            try:
+                n = int(str(d).strip())
+            except ValueError:
+                raise ScheduleError('bad date %r' % (d,))
+            if n < last:
+                year, month = _add_month(year, month)
+            last = n
+            try:
+                when = date(year, month, n)
+            except ValueError:
+                raise ScheduleError('%d-%02d has no day %d' % (year, month, n))
+        if r['day'] and r['day'] in WEEKDAYS and WEEKDAYS[when.weekday()] != r['day']:
+            raise ScheduleError('%s is a %s, schedule says %s' % (when, WEEKDAYS[when.weekday()], r['day']))
+        out.append(dict(r, date=when))
+    return out
+
+
+def infer_start(rows, today=None, back=2, ahead=6):
+    """The one start month, from `back` months before to `ahead` months after
+    `today`, whose calendar agrees with every weekday in the file (schedules are
+    published ahead; older files need FILE@YYYY-MM or a YYYY-MM in the name)."""
+    today = today or date.today()
+    fits = []
+    for n in range(-back, ahead + 1):
+        start = _add_month(today.year, today.month, n)
+        try:
+            resolve_dates(rows, start)
+        except ScheduleError:
+            continue
+        fits.append(start)
+    if len(fits) != 1:
+        first, last = _add_month(today.year, today.month, -back), _add_month(today.year, today.month, ahead)
+        raise ScheduleError('weekdays fit %s between %d-%02d and %d-%02d; pass FILE@YYYY-MM'
+                            % ((', '.join('%d-%02d' % f for f in fits) or 'no month',) + first + last))
+    return fits[0]
+
+
+def name_month(path):
+    """(year, month) from a YYYY-MM in the file name, else None."""
+    m = re.search(r'(?<!\d)(20\d\d)-(0[1-9]|1[0-2])(?!\d)', os.path.basename(path))
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def event_id(day, text):
+    """2025-11-04, 'PLEASANT VALLEY' -> 'trgg-2025-11-04-pleasant-valley' (the generate_*_sql.py scheme)."""
+    for tag in LEGACY_TAGS:
+        text = text.replace(tag, '')
+    return 'trgg-%s-%s' % (day.isoformat(), text.strip().lower().replace(' ', '-')[:20])
+
+
+def _pick(values, i):
+    return values[i] if i < len(values) else (values[0] if values else None)
+
+
+def expand(rows):
+    """Dated schedule rows -> one event dict per course."""
+    events, seen = [], set()
+    for r in rows:
+        for i, cell in enumerate(r['courses']):
+            c = parse_course(cell)
+            slug = event_id(r['date'], r.get('cell') if i == 0 and r.get('cell') else c['raw'])
+            if slug in seen and c['nines']:
+                slug += '-' + c['nines'].lower()
+            n, base = 2, slug
+            while slug in seen:
+                slug, n = '%s-%d' % (base, n), n + 1
+            seen.add(slug)
+            events.append(dict(c, date=r['date'], slug=slug,
+                               departure=parse_time(_pick(r['depart'], i)),
+                               tee_off=parse_time(_pick(r['tee_off'], i)),
+                               green_fee=parse_fee(_pick(r['green_fee'], i)),
+                               caddy=_pick(r['caddy'], i), cart=_pick(r['cart'], i)))
+    return events
+
+
+def event_row(ev, organizer_id=ORGANIZER_ID, organizer_name=ORGANIZER_NAME):
+    """society_events values (COLUMNS order) for one event."""
+    label = ' '.join(p for p in (ev['course'], ev['nines'], ev['special']) if p)
+    extras = []
+    if ev['groups']:
+        extras.append('%d groups' % ev['groups'])
+    if ev['two_way']:
+        extras.append('2-way')
+    if ev['holiday']:
+        extras.append('Holiday')
+    incl = [n for n, v in (('Cart', ev['cart']), ('Caddy', ev['caddy'])) if str(v or '').upper().startswith('INCL')]
+    fees = ['%s: %s' % (n, v) for n, v in (('Cart', ev['cart']), ('Caddy', ev['caddy']))
+            if v and not str(v).upper().startswith('INCL')]
+    notes = ['Departure: %s' % (ev['departure'] or '-'), 'First Tee: %s' % (ev['tee_off'] or '-')]
+    notes += [', '.join(extras)] if extras else []
+    notes += [ev['special']] if ev['special'] else []
+    notes += fees + (['%s included' % ' & '.join(incl)] if incl else [])
+    cutoff = datetime.combine(ev['date'] - timedelta(days=1), CUTOFF, BANGKOK)
+    return (ev['slug'], 'TRGG - %s' % label, ev['date'], ev['tee_off'], ev['departure'],
+            cutoff, SPECIALS.get(ev['special']) or 'stableford', ev['green_fee'] or 0, MAX_PARTICIPANTS,
+            organizer_id, organizer_name, ev['course'], ' | '.join(notes), 'organizer', False)
+
+
+def upsert_statements(rows, batch=BATCH):
+    """[(sql, params)]: multi-row INSERT ... ON CONFLICT (id) DO UPDATE, `batch` rows each."""
+    cols = ', '.join(COLUMNS)
+    updated = [c for c in COLUMNS if c != 'id']
+    tuple_ = '(%s)' % ', '.join(['%s'] * len(COLUMNS))
+    tail = ('\nON CONFLICT (id) DO UPDATE SET\n  %s,\n  updated_at = NOW()\nWHERE (%s)\n  IS DISTINCT FROM (%s)'
+            % (',\n  '.join('%s = EXCLUDED.%s' % (c, c) for c in updated),
+               ', '.join('society_events.%s' % c for c in updated),
+               ', '.join('EXCLUDED.%s' % c for c in updated)))
+    out = []
+    for i in range(0, len(rows), batch):
+        chunk = rows[i:i + batch]
+        sql = 'INSERT INTO society_events (%s) VALUES\n%s%s' % (cols, ',\n'.join([tuple_] * len(chunk)), tail)
+        out.append((sql, [v for row in chunk for v in row]))
+    return out
+
+
+def sql_literal(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    return "'%s'" % str(value).replace("'", "''")
+
+
+def render(sql, params):
+    """Inline parameters for the SQL editor (the statement text itself has no other %)."""
+    it = iter(params)
+    return re.sub(r'%s', lambda m: sql_literal(next(it)), sql)
+
+
+def execute(dsn, statements):
+    try:
+        import psycopg2
+    except ImportError:
+        raise ScheduleError('--dsn needs psycopg2 (pip install psycopg2-binary); use the SQL file instead')
+    conn = psycopg2.connect(dsn)
+    written = 0
+    try:
+        with conn, conn.cursor() as cur:                  # one transaction for the whole year
+            for sql, params in statements:
+                cur.execute(sql, params)
+                written += cur.rowcount
+    finally:
+        conn.close()
+    return written
+
+
+def _input(spec, today):
+    path, _, start = spec.partition('@')
+    rows = load_rows(path)
+    if start:
+        y, m = start.split('-')
+        start = (int(y), int(m))
+    elif any(not re.match(r'\d{4}-\d{2}-\d{2}$', str(r['date'])) for r in rows):
+        start = name_month(path)
+        if start:
+            try:
+                resolve_dates(rows, start)
+            except ScheduleError as e:
+                raise ScheduleError('file name says %d-%02d but %s; pass FILE@YYYY-MM' % (start + (e,)))
+            print('[INFO] %s: no @YYYY-MM given, start month %d-%02d from the file name' % (path, start[0], start[1]))
+        else:
+            start = infer_start(rows, today)
+            print('[INFO] %s: no @YYYY-MM given, weekdays fit %d-%02d' % (path, start[0], start[1]))
+    else:
+        start = (today.year, today.month)
+    return resolve_dates(rows, start)
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Import TRGG schedule files into society_events')
+    ap.add_argument('inputs', nargs='+', metavar='FILE[@YYYY-MM]',
+                    help='schedule JSON; @YYYY-MM = month of the first day-number row')
+    ap.add_argument('--out', help='SQL file (default sql/import-trgg-schedule-<first>-to-<last>.sql)')
+    ap.add_argument('--dsn', help='execute against this Postgres instead of writing SQL')
+    ap.add_argument('--batch', type=int, default=BATCH, help='rows per INSERT statement')
+    ap.add_argument('--organizer-id', default=ORGANIZER_ID)
+    ap.add_argument('--dry-run', action='store_true', help='list the events, write nothing')
+    args = ap.parse_args()
+
+    today = date.today()
+    events = {}
+    try:
+        for spec in args.inputs:
+            evs = expand(_input(spec, today))
+            print('[OK] %s: %d events' % (spec, len(evs)))
+            for ev in evs:
+                events[ev['slug']] = ev                   # later files win for the same event
+    except (OSError, ValueError) as e:
+        print('[ERROR] %s: %s' % (spec, e))
+        sys.exit(1)
+    if not events:
+        print('[ERROR] No events found')
+        sys.exit(1)
+    ordered = sorted(events.values(), key=lambda e: (e['date'], e['slug']))
+    for ev in ordered:
+        if ev['course'] not in COURSES:
+            print('[WARN] %s: unknown course %r (kept as is)' % (ev['date'], ev['raw']))
+    rows = [event_row(ev, args.organizer_id) for ev in ordered]
+    first, last = ordered[0]['date'], ordered[-1]['date']
+    print('[INFO] %d events, %s .. %s' % (len(rows), first, last))
+
+    if args.dry_run:
+        for r in rows:
+            print('   %s %s  %-42s %s' % (r[2], r[3] or '--:--', r[1], r[12]))
+        return
+
+    statements = upsert_statements(rows, args.batch)
+    if args.dsn:
+        try:
+            written = execute(args.dsn, statements)
+        except Exception as e:
+            print('[ERROR] %s' % e)
+            sys.exit(1)
+        print('[SUCCESS] %d statements, %d rows inserted/changed (%d unchanged)'
+              % (len(statements), written, len(rows) - written))
+        return
+
+    out = args.out or os.path.join('sql', 'import-trgg-schedule-%s-to-%s.sql'
+                                   % (first.strftime('%Y-%m'), last.strftime('%Y-%m')))
+    body = ';\n\n'.join(render(sql, params) for sql, params in statements)
+    text = ('-- =====================================================\n'
+            '-- IMPORT TRGG PATTAYA SCHEDULE %s .. %s\n'
+            '-- =====================================================\n'
+            '-- Generated by compacted/schedule_import.py from: %s\n'
+            '-- %d events, %d statements; safe to re-run (ON CONFLICT (id) DO UPDATE)\n'
+            '-- =====================================================\n\n'
+            'BEGIN;\n\n%s;\n\nCOMMIT;\n\n'
+            '-- VERIFICATION\n'
+            'SELECT date_trunc(\'month\', event_date)::date AS month, COUNT(*) AS events\n'
+            'FROM society_events\n'
+            'WHERE organizer_id = %s\n'
+            '  AND event_date BETWEEN %s AND %s\n'
+            'GROUP BY 1 ORDER BY 1;\n'
+            % (first, last, ', '.join(args.inputs), len(rows), len(statements), body,
+               sql_literal(args.organizer_id), sql_literal(first), sql_literal(last)))
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    tmp = '%s.%d.tmp' % (out, os.getpid())
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, out)
+    print('[SUCCESS] %s (%d statements)' % (out, len(statements)))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,195 +1,283 @@
 """
 TRGG Pattaya Schedule Scraper
 Scrapes golf schedule from trggpattaya.com and formats for society organizer import
+
+Polls cheaply: the last response is cached with its ETag / Last-Modified, the next
+fetch is a conditional GET, and a 304 (or an identical body) leaves the output
+alone - most nights cost one request and no parsing. The output records the
+sha256 of the page it was parsed from; when that is not the cached page (a parse
+that failed, an output deleted or edited), the cached page is parsed again.
+
+Pages are parsed with lxml when it is installed (its tree is replayed into the
+same extractor) or else streamed through html.parser; both read table rows
+(<br> = several courses that day) and "20 MON PATTAYA C.C. 08.30 09.20 1950
+INCL INCL" text lines, and date rows from the "NOVEMBER 2025" headings above
+them.
+
+Output is {"events": [...]} in schedule_import.py's row shape, so:
+    python scrape_trgg_schedule.py                      -> trgg_schedule.json (if changed)
+    python schedule_import.py trgg_schedule.json        -> sql/import-trgg-schedule-*.sql
+    python scrape_trgg_schedule.py --html TRGGschedule/fixtures/schedule_table.html   (offline)
 """
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import gzip
+import hashlib
 import json
-from datetime import datetime
-
-def scrape_trgg_schedule():
-    """Scrape TRGG Pattaya schedule for October 20-31 and November 1-29, 2025"""
-
-    url = "https://www.trggpattaya.com/schedule/"
-
-    print(f"Fetching schedule from {url}...")
-
+import os
+import re
+import sys
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+
+from schedule_import import normalize_row
+
+try:
+    import lxml.html
+except ImportError:                                   # optional: C parser, ~10x faster
+    lxml = None
+
+URL = 'https://www.trggpattaya.com/schedule/'
+CACHE = os.path.expanduser(os.environ.get('TRGG_SCHEDULE_CACHE', '~/.cache/mcipro-schedule'))
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+MONTHS = ('JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE', 'JULY', 'AUGUST', 'SEPTEMBER',
+          'OCTOBER', 'NOVEMBER', 'DECEMBER')
+
+_MONTH = re.compile(r'\b(%s)\s+(20\d\d)\b' % '|'.join(MONTHS))
+_TIME = r'\d{1,2}[.:]\d{2}'
+_LINE = re.compile(r'^(?:(\d{1,2})\s+([A-Z]{3,4})\s+)?(.+?)\s+(%s)\s+(%s)\s+(\d[\d,]*)\s+(\S+)\s+(\S+)$' % (_TIME, _TIME))
+_BLOCK = {'p', 'div', 'li', 'br', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'table', 'pre'}
+
+
+def urllib_transport(url, headers, timeout=20):
+    """(status, headers, body) - 304 comes back as a status, not an exception."""
+    req = urllib.request.Request(url, headers=headers)
     try:
-        # Fetch the page
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        print("Page fetched successfully!")
-
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Find the schedule table
-        # This will need to be adjusted based on the actual HTML structure
-        schedule_data = []
-
-        # Look for table or schedule container
-        # Common patterns: <table>, <div class="schedule">, etc.
-        tables = soup.find_all('table')
-
-        if not tables:
-            print("No tables found. Looking for other schedule containers...")
-            # Try finding divs with schedule-related classes
-            schedule_divs = soup.find_all('div', class_=lambda x: x and 'schedule' in x.lower())
-            print(f"Found {len(schedule_divs)} schedule containers")
-
-        print(f"Found {len(tables)} tables on the page")
-
-        # Process the first table (or adjust based on inspection)
-        for table in tables:
-            rows = table.find_all('tr')
-            print(f"Processing table with {len(rows)} rows")
-
-            # Skip header row
-            for row in rows[1:]:
-                cols = row.find_all(['td', 'th'])
-
-                if len(cols) >= 8:  # Date, Day, Course, Departure, First Tee, G fee, Caddy, Cart
-                    try:
-                        date_text = cols[0].text.strip()
-                        day_text = cols[1].text.strip()
-                        course = cols[2].text.strip()
-                        departure = cols[3].text.strip()
-                        first_tee = cols[4].text.strip()
-                        green_fee = cols[5].text.strip()
-                        caddy_fee = cols[6].text.strip()
-                        cart_fee = cols[7].text.strip()
-
-                        # Parse date (adjust format based on website)
-                        # Common formats: "20/10/2025", "2025-10-20", "Oct 20, 2025"
-                        # We'll try to parse it flexibly
-
-                        entry = {
-                            "date": date_text,
-                            "day": day_text,
-                            "course": course,
-                            "departure": departure,
-                            "first_tee": first_tee,
-                            "green_fee": green_fee,
-                            "caddy_fee": caddy_fee,
-                            "cart_fee": cart_fee
-                        }
-
-                        schedule_data.append(entry)
-                        print(f"Extracted: {date_text} - {course}")
-
-                    except Exception as e:
-                        print(f"Error processing row: {e}")
-                        continue
-
-        if not schedule_data:
-            print("\nNo schedule data extracted. The page structure may be different.")
-            print("Saving raw HTML for inspection...")
-            with open('trgg_schedule_raw.html', 'w', encoding='utf-8') as f:
-                f.write(response.text)
-            print("Raw HTML saved to: trgg_schedule_raw.html")
-            print("Please inspect the HTML to determine the correct selectors.")
-            return None
-
-        # Filter for October 20-31 and November 1-29, 2025
-        filtered_data = []
-        for entry in schedule_data:
-            # Add date filtering logic based on actual date format
-            # For now, include all entries
-            filtered_data.append(entry)
-
-        print(f"\nExtracted {len(filtered_data)} schedule entries")
-
-        # Save to JSON
-        output_file = 'trgg_schedule.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(filtered_data, f, indent=2, ensure_ascii=False)
-
-        print(f"Schedule saved to: {output_file}")
-
-        return filtered_data
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching page: {e}")
-        return None
-    except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            body = r.read()
+            if r.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            return r.status, dict(r.headers), body
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, dict(e.headers), b''
+        raise
+
+
+def fetch(url=URL, cache=CACHE, transport=None, force=False):
+    """(html, status, meta): status 200 (new body), 304 (server said unchanged) or
+    'same' (200 with a byte-identical body - for servers without validators)."""
+    transport = transport or urllib_transport
+    os.makedirs(cache, exist_ok=True)
+    key = hashlib.sha1(url.encode()).hexdigest()[:16]
+    body_path, meta_path = os.path.join(cache, key + '.html'), os.path.join(cache, key + '.json')
+    meta = {}
+    if os.path.exists(meta_path) and os.path.exists(body_path) and not force:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+    headers = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip'}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    status, resp_headers, body = transport(url, headers)
+    resp_headers = {k.lower(): v for k, v in resp_headers.items()}
+    now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+    if status == 304:
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        meta['checked'] = now
+    else:
+        sha = hashlib.sha256(body).hexdigest()
+        fetched = now
+        if sha == meta.get('sha256'):
+            status, fetched = 'same', meta.get('fetched', now)
+        meta = {'url': url, 'etag': resp_headers.get('etag'), 'last_modified': resp_headers.get('last-modified'),
+                'sha256': sha, 'fetched': fetched, 'checked': now}
+        tmp = '%s.%d.tmp' % (body_path, os.getpid())
+        with open(tmp, 'wb') as f:
+            f.write(body)
+        os.replace(tmp, body_path)
+    tmp = '%s.%d.tmp' % (meta_path, os.getpid())
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, meta_path)
+    return body.decode('utf-8', 'replace'), status, meta
+
+
+class _Extractor(HTMLParser):
+    """Streams a page into ('row', [cells]) and ('text', line) items, in document order."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items, self.row, self.cell, self.text = [], None, None, []
+
+    def _flush_text(self):
+        line = ' '.join(''.join(self.text).split())
+        if line:
+            self.items.append(('text', line))
+        self.text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self._flush_text()
+            self.row = []
+        elif tag in ('td', 'th') and self.row is not None:
+            self.cell = []
+        elif tag == 'br' and self.cell is not None:
+            self.cell.append('\n')
+        elif tag in _BLOCK and self.row is None:
+            self._flush_text()
+
+    def handle_endtag(self, tag):
+        if tag in ('td', 'th') and self.cell is not None:
+            self.row.append('\n'.join(' '.join(l.split()) for l in ''.join(self.cell).split('\n')).strip())
+            self.cell = None
+        elif tag == 'tr' and self.row is not None:
+            self.items.append(('row', self.row))
+            self.row = None
+        elif tag in _BLOCK and self.row is None:
+            self._flush_text()
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+        elif self.row is None:
+            self.text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+
+def _lxml_items(html):
+    """lxml builds the tree (C parser, forgiving with broken markup) and the tree is
+    replayed into _Extractor, so both backends yield the same items."""
+    p = _Extractor()
+
+    def replay(el):
+        if isinstance(el.tag, str):                   # comments / processing instructions: tail only
+            p.handle_starttag(el.tag, list(el.attrib.items()))
+            if el.text:
+                p.handle_data(el.text)
+            for child in el:
+                replay(child)
+            p.handle_endtag(el.tag)
+        if el.tail:
+            p.handle_data(el.tail)
+
+    replay(lxml.html.document_fromstring(html))
+    p.close()
+    return p.items
+
+
+def page_items(html):
+    if lxml is not None:
+        return _lxml_items(html)
+    p = _Extractor()
+    p.feed(html)
+    p.close()
+    return p.items
+
+
+def parse_schedule(html):
+    """Schedule rows (schedule_import row shape), in page order, rest days dropped."""
+    rows, month = [], None
+    for kind, value in page_items(html):
+        text = ' '.join(value).upper() if kind == 'row' else value.upper()
+        m = _MONTH.search(text)
+        if m and (kind == 'text' or len([c for c in value if c]) <= 1):
+            month = (int(m.group(2)), MONTHS.index(m.group(1)) + 1)
+            continue
+        if kind == 'row':
+            if len(value) < 8 or not value[0].strip().isdigit():
+                continue                              # header / spacer rows
+            raw = dict(zip(('date', 'day', 'course', 'departure', 'first_tee', 'green_fee', 'caddy_fee', 'cart_fee'),
+                           value[:8]))
+        else:
+            line = _LINE.match(value.upper())
+            if not line:
+                continue
+            d, day, course, dep, tee, fee, caddy, cart = line.groups()
+            if d is None:                             # second course on the previous day
+                if rows:
+                    prev = rows[-1]
+                    for k, v in (('courses', course), ('depart', dep), ('tee_off', tee), ('green_fee', fee),
+                                 ('caddy', caddy), ('cart', cart)):
+                        prev[k].append(v)
+                continue
+            raw = {'date': d, 'day': day, 'course': course, 'departure': dep, 'first_tee': tee,
+                   'green_fee': fee, 'caddy_fee': caddy, 'cart_fee': cart}
+        row = normalize_row(raw)
+        if not row['courses']:
+            continue
+        if month:
+            row['date'] = '%d-%02d-%02d' % (month[0], month[1], int(row['date']))
+        rows.append(row)
+    return rows
+
+
+def built_from(out):
+    """sha256 of the page an existing output was parsed from (None if unknown)."""
+    try:
+        with open(out, 'r', encoding='utf-8') as f:
+            return json.load(f).get('sha256')
+    except (OSError, ValueError, AttributeError):
         return None
 
 
-def format_for_society_organizer(schedule_data):
-    """Convert TRGG schedule to Society Organizer event format"""
-
-    if not schedule_data:
-        print("No schedule data to format")
-        return None
+def main():
+    ap = argparse.ArgumentParser(description='Scrape the TRGG Pattaya schedule (conditional GET, cached)')
+    ap.add_argument('--url', default=URL)
+    ap.add_argument('--html', help='parse a saved page instead of fetching')
+    ap.add_argument('--out', default='trgg_schedule.json')
+    ap.add_argument('--cache', default=CACHE)
+    ap.add_argument('--force', action='store_true', help='ignore the cache validators and re-parse')
+    args = ap.parse_args()
 
-    # Format for your society organizer system
-    # Adjust fields based on your database schema
-    events = []
-
-    for entry in schedule_data:
-        event = {
-            "event_date": entry.get("date"),
-            "event_day": entry.get("day"),
-            "course_name": entry.get("course"),
-            "departure_time": entry.get("departure"),
-            "first_tee_time": entry.get("first_tee"),
-            "pricing": {
-                "green_fee": entry.get("green_fee"),
-                "caddy_fee": entry.get("caddy_fee"),
-                "cart_fee": entry.get("cart_fee")
-            },
-            "event_type": "society_round",
-            "status": "scheduled"
-        }
-        events.append(event)
-
-    # Save formatted data
-    output_file = 'trgg_schedule_formatted.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(events, f, indent=2, ensure_ascii=False)
-
-    print(f"Formatted schedule saved to: {output_file}")
-    print(f"Total events: {len(events)}")
-
-    return events
+    if args.html:
+        with open(args.html, 'r', encoding='utf-8') as f:
+            html = f.read()
+        status, meta = 'file', {'url': os.path.abspath(args.html)}
+    else:
+        print(f"Fetching schedule from {args.url}...")
+        try:
+            html, status, meta = fetch(args.url, args.cache, force=args.force)
+        except (urllib.error.URLError, OSError) as e:
+            print(f"[ERROR] Error fetching page: {e}")
+            sys.exit(1)
+        if status in (304, 'same') and not args.force:
+            if built_from(args.out) == meta.get('sha256'):
+                print(f"[OK] Not modified since {meta.get('fetched')} ({status}); {args.out} left as is")
+                return
+            print(f"[INFO] Not modified ({status}), but {args.out} was not built from it; parsing the cached page")
+
+    events = parse_schedule(html)
+    print(f"[INFO] Parsed with {'lxml' if lxml is not None else 'html.parser'}: {len(events)} schedule days, "
+          f"{sum(len(e['courses']) for e in events)} events")
+    if not events:
+        print("[ERROR] No schedule rows found. The page structure may be different.")
+        if not args.html:
+            print(f"[INFO] Raw HTML kept in {args.cache} for inspection")
+        sys.exit(1)
+    undated = sum(1 for e in events if not re.match(r'\d{4}-', str(e['date'])))
+    if undated:
+        print(f"[WARN] {undated} rows have no month heading; import with {args.out}@YYYY-MM")
+
+    doc = {'source': meta.get('url'), 'fetched': meta.get('fetched'), 'etag': meta.get('etag'),
+           'sha256': meta.get('sha256'), 'events': events}
+    tmp = '%s.%d.tmp' % (args.out, os.getpid())
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp, args.out)
+    print(f"[SUCCESS] Schedule saved to: {args.out}")
+    print(f"[INFO] Next: python schedule_import.py {args.out}")
 
 
 if __name__ == "__main__":
-    print("=" * 60)
-    print("TRGG Pattaya Schedule Scraper")
-    print("=" * 60)
-    print()
-
-    # Scrape the schedule
-    schedule = scrape_trgg_schedule()
-
-    if schedule:
-        print("\n" + "=" * 60)
-        print("Formatting for Society Organizer...")
-        print("=" * 60)
-        print()
-
-        # Format for import
-        formatted = format_for_society_organizer(schedule)
-
-        print("\n" + "=" * 60)
-        print("DONE!")
-        print("=" * 60)
-        print()
-        print("Files created:")
-        print("  - trgg_schedule.json (raw scraped data)")
-        print("  - trgg_schedule_formatted.json (ready for import)")
-        print()
-        print("Next steps:")
-        print("  1. Review the JSON files")
-        print("  2. Import into your society organizer database")
-    else:
-        print("\nFailed to scrape schedule. Check the errors above.")
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+SPLIT BUNDLE: move index.html's inline systems into hashed, lazily loaded files
+===============================================================================
+
+Patch scripts have inlined whole systems into www/index.html; a LINE in-app
+browser has to download and parse all 3.4 MB before first paint. This build
+step writes a split copy of the page:
+
+  * each inline <script> block that holds a system (found by anchor via the
+    js_index.py symbol table, the same names the patchers use) or is larger
+    than --min-kb becomes assets/js/<name>.<sha256[:10]>.js — cacheable
+    forever, and only re-downloaded when its content changes;
+  * eager chunks keep their place and order as <script src>, so execution
+    order is exactly what the inline page had;
+  * lazy chunks are removed from the parse path. A small inline loader fetches
+    them at idle time after the window 'load' event (or on __mcLazy.load(name)),
+    always in their original relative order.
+
+A chunk is only lazy if nothing outside it can reach it before it loads. Its
+exports are read from the block itself (js_index.globals_defined: top-level
+function / class / var / let / const and every `window.X =`) and looked for
+in the code of the rest of the page - the js_index.code_only view of the
+other script blocks and local <script src> files, so comments and strings
+do not count, plus on*= handlers in the markup and in markup built in
+template strings. Guarded uses are lazy-safe: `typeof X`, a `window.X` that
+is only tested (`window.X &&`, `window.X ?`, `!window.X`, `window.X?.`), and
+anything in the if() body or statement after such a guard. A page markup
+handler that only calls into the chunk is rewritten to
+`return __mcLazy.when(chunk, () => { ... })`, which runs it at once if the
+chunk has loaded and otherwise loads it first; handlers that return a value
+or stop the event keep the chunk eager. Any other use keeps it eager too, and
+the report says which names and lines held it back. There are no stubs: a
+stub cannot answer property reads, synchronous calls or `new` correctly.
+
+Splitting is per script block, never inside one: top-level statements of a block
+can depend on hoisting within it. TrafficMonitor lives at top level of the core
+block and initialises itself on DOMContentLoaded, so it ships in the (cached)
+core chunk rather than lazily.
+
+Usage:
+    python split_bundle.py ../www/index.html --out ../dist-split
+    python split_bundle.py ../www/index.html --out ../dist-split --eager live-scorecard
+"""
+
+import argparse
+import bisect
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+
+import js_index
+from anchors import AnchorError
+
+# chunk name -> anchor (class / CATALOGUE alias) that identifies its script block,
+# and whether it may load lazily (only if none of its globals is used elsewhere).
+MODULES = [
+    ('core',              'ScreenManager',     False),
+    ('society-db',        'society-db',        False),
+    ('live-scorecard',    'live-scorecard',    True),
+    ('society-organizer', 'society-organizer', True),
+]
+
+_LOCAL_SRC = re.compile(r'<script\b[^>]*\bsrc\s*=\s*["\']([^"\'>]+)["\']', re.I)
+_HANDLER = re.compile(r'\bon[a-z]+\s*=\s*(\\?["\'])(.*?)\1', re.I | re.S)
+_COMMENT = re.compile(r'<!--.*?-->', re.S)
+_UNWRAPPABLE = re.compile(r'\b(?:return|preventDefault|stopPropagation|stopImmediatePropagation|currentTarget)\b')
+
+LOADER = '''
+window.__mcLazy = window.__mcLazy || (function () {
+    var mods = {}, order = [];
+    function load(name) {
+        var m = mods[name];
+        if (!m.promise) {
+            for (var i = 0; i < order.indexOf(name); i++) load(order[i]);   // keep original order
+            m.promise = new Promise(function (resolve, reject) {
+                var s = document.createElement('script');
+                s.src = m.src;
+                s.async = false;
+                s.onload = function () { m.done = true; resolve(); };
+                s.onerror = function () { reject(new Error('[lazy] failed to load ' + m.src)); };
+                document.head.appendChild(s);
+            });
+        }
+        return m.promise;
+    }
+    window.addEventListener('load', function () {
+        var idle = window.requestIdleCallback || function (f) { setTimeout(f, 1500); };
+        idle(function () { order.forEach(load); }, {timeout: 4000});
+    });
+    return {
+        define: function (name, src) {
+            mods[name] = {src: src};
+            order.push(name);
+        },
+        load: load,
+        when: function (name, fn) {     // markup handlers: run now if loaded, else once it is
+            if (mods[name].done) return fn();
+            load(name).then(fn);
+        }
+    };
+})();
+'''
+
+
+def _tag_bounds(text, lo, hi):
+    """Script body [lo, hi) -> (start of '<script', end of '</script>')."""
+    return text.rfind('<script', 0, lo), text.index('>', hi) + 1
+
+
+def local_scripts(text, base):
+    """{src: text} of the page's <script src> files that exist under `base`."""
+    out = {}
+    for src in _LOCAL_SRC.findall(text):
+        if re.match(r'(?:[a-z]+:)?//', src, re.I):
+            continue
+        path = os.path.join(base, src.split('?')[0].split('#')[0].lstrip('/'))
+        if os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                out[src] = f.read()
+    return out
+
+
+def _blank(s):
+    return re.sub(r'[^\n]', ' ', s)
+
+
+def _with_handlers(view, raw, lo=0, wrappable=None):
+    """`view` with the on*= handler values found in `raw` copied back in. Page
+    markup handlers that split() may wrap are added to `wrappable` as absolute
+    (start, end) spans."""
+    parts, pos = [], 0
+    for m in _HANDLER.finditer(raw):
+        a, b = m.span(2)
+        if a >= pos:
+            parts += [view[pos:a], raw[a:b]]
+            pos = b
+            if wrappable is not None and m.group(1) in '"\'' and not _UNWRAPPABLE.search(m.group(2)):
+                wrappable.append((lo + a, lo + b))
+    parts.append(view[pos:])
+    return ''.join(parts)
+
+
+def code_views(text, blocks, scripts=None):
+    """([(src, view)], wrappable) - where names can be used: the page with every
+    inline script block reduced to js_index.code_only and the markup between
+    them reduced to its on*= handlers (HTML comments dropped), then each local
+    script file's code_only view. Handlers inside JS strings - markup built in
+    template strings - are kept. Offsets and newlines line up with the
+    originals. `wrappable` are the markup handler spans split() can defer."""
+    parts, wrappable, pos = [], [], 0
+
+    def markup(lo, hi):
+        seg = text[lo:hi]
+        return _with_handlers(_blank(seg), _COMMENT.sub(lambda m: _blank(m.group()), seg), lo, wrappable)
+    for b in blocks:
+        parts += [markup(pos, b['start']),
+                  _with_handlers(js_index.code_only(text, b['start'], b['end']), text[b['start']:b['end']])]
+        pos = b['end']
+    parts.append(markup(pos, len(text)))
+    views = [(None, ''.join(parts))]
+    for src, body in (scripts or {}).items():
+        views.append((src, _with_handlers(js_index.code_only(body, 0, len(body)), body)))
+    return views, wrappable
+
+
+def _guard_end(view, i):
+    """End of what a guard at `i` protects: the braced body of the if() it sits
+    in, else the rest of its statement (or its line)."""
+    depth, n = 0, len(view)
+    while i < n:
+        c = view[i]
+        if c in '([{':
+            depth += 1
+        elif c in ')]}':
+            depth -= 1
+            if depth < 0 and c == ')':
+                m = re.compile(r'\s*\{').match(view, i + 1)
+                if not m:
+                    depth = 0
+                else:
+                    i, depth = m.end(), 1
+                    while i < n and depth:
+                        depth += {'{': 1, '}': -1}.get(view[i], 0)
+                        i += 1
+                    return i
+            elif depth < 0:
+                return i
+        elif c in ';\n' and depth <= 0:
+            return i
+        i += 1
+    return n
+
+
+def _guarded(view, s, e):
+    """True for `typeof X`, `typeof window.X` and a `window.X` that is only
+    tested (`window.X &&`, `window.X ? ...`, `!window.X`, `?.`)."""
+    windowed = view.endswith('window.', 0, s)
+    head = s - len('window.') if windowed else s
+    if re.search(r'\btypeof\s*\(?\s*$', view[max(0, head - 20):head]):
+        return True
+    return windowed and bool(re.match(r'\s*(?:&&|\|\||\?|\)|[!=]==?)', view[e:e + 8])
+                             or view[:head].rstrip().endswith('!'))
+
+
+def outside_uses(views, block, names, wrappable=()):
+    """({name: 'line N' / 'file.js:N'}, wrap) - the first unguarded use of each
+    name outside `block`, and the `wrappable` handler spans that use one. A use
+    is lazy-safe when it is guarded (see _guarded) or sits in the if() body /
+    statement after such a guard of the same name."""
+    if not names:
+        return {}, set()
+    alt = '|'.join(sorted(map(re.escape, names), key=len, reverse=True))
+    use = re.compile(r'(?:(?<![\w$.])|(?<=\bwindow\.))(%s)(?![\w$])' % alt)
+    found, wrap = {}, set()
+    starts = [a for a, _ in wrappable]
+    for src, view in views:
+        spans = ((0, block['start']), (block['end'], len(view))) if src is None else ((0, len(view)),)
+        safe = {}
+        for lo, hi in spans:
+            for m in use.finditer(view, lo, hi):
+                name, s = m.group(1), m.start()
+                if _guarded(view, s, m.end()):
+                    safe.setdefault(name, []).append((s, _guard_end(view, m.end())))
+                    continue
+                if any(a <= s < b for a, b in safe.get(name, ())):
+                    continue
+                i = bisect.bisect_right(starts, s) - 1
+                if src is None and i >= 0 and s < wrappable[i][1]:
+                    wrap.add(wrappable[i])
+                elif name not in found:
+                    line = view.count('\n', 0, s) + 1
+                    found[name] = 'line %d' % line if src is None else '%s:%d' % (src, line)
+    return found, wrap
+
+
+def plan(text, modules=MODULES, eager=(), min_kb=8, scripts=None):
+    """[(block, name, lazy, held, wrap)] for every block that leaves the page;
+    `held` is {name: where} for a lazy module kept eager because its globals
+    are used outside it, `wrap` the markup handler spans a lazy chunk needs
+    routed through the loader. Raises AnchorError if a module's anchor is
+    missing."""
+    idx = js_index.build(text)
+    views = wrappable = None
+    chosen = {}
+    for name, anchor, lazy in modules:
+        n = idx.find(anchor)['block']
+        if n in chosen:
+            raise AnchorError('%s and %s resolve to the same script block' % (chosen[n][0], name))
+        held, wrap = {}, set()
+        if lazy and name not in eager:
+            b = idx.blocks[n]
+            if views is None:
+                views, wrappable = code_views(text, idx.blocks, scripts)
+            held, wrap = outside_uses(views, b, js_index.globals_defined(text, b['start'], b['end']), wrappable)
+        lazy = lazy and name not in eager and not held
+        chosen[n] = (name, lazy, held, wrap if lazy else set())
+    for n, b in enumerate(idx.blocks):
+        if n not in chosen and b['end'] - b['start'] >= min_kb * 1024:
+            chosen[n] = ('inline-%d' % n, False, {}, set())
+    return [(idx.blocks[n],) + chosen[n] for n in sorted(chosen)]
+
+
+def _wrap_handlers(text, lo, hi, wraps):
+    """text[lo:hi] with each handler in `wraps` ({span: chunk}) deferred until
+    its chunk has run: `return __mcLazy.when(chunk, () => { ... })`."""
+    parts, pos = [], lo
+    for a, b in sorted(w for w in wraps if lo <= w[0] < hi):
+        name = json.dumps(wraps[a, b]) if text[a - 1] == "'" else "'%s'" % wraps[a, b]
+        parts += [text[pos:a], 'return __mcLazy.when(%s, () => { %s\n})' % (name, text[a:b])]
+        pos = b
+    parts.append(text[pos:hi])
+    return ''.join(parts)
+
+
+def split(text, out_dir, prefix='assets/js/', modules=MODULES, eager=(), min_kb=8, scripts=None):
+    """Write the chunks under out_dir/prefix and return (new_html, rows)."""
+    chunk_dir = os.path.join(out_dir, prefix)
+    os.makedirs(chunk_dir, exist_ok=True)
+    parts, rows, pos, loader_done = [], [], 0, False
+    chunks = plan(text, modules, eager, min_kb, scripts)
+    wraps = {w: name for _, name, lazy, _, wrap in chunks for w in wrap}   # later chunk wins: it loads last
+    for block, name, lazy, held, wrap in chunks:
+        body = text[block['start']:block['end']]
+        data = body.encode('utf-8')
+        fname = '%s.%s.js' % (name, hashlib.sha256(data).hexdigest()[:10])
+        path = os.path.join(chunk_dir, fname)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+        for old in glob.glob(os.path.join(chunk_dir, name + '.*.js')):
+            if os.path.basename(old) != fname:
+                os.remove(old)
+        src = prefix + fname
+        a, b = _tag_bounds(text, block['start'], block['end'])
+        parts.append(_wrap_handlers(text, pos, a, wraps))
+        if lazy:
+            js = '' if loader_done else LOADER
+            loader_done = True
+            js += '__mcLazy.define(%s, %s);\n' % (json.dumps(name), json.dumps(src))
+            parts.append('<script>%s</script>' % js)
+        else:
+            attrs = (' ' + block['attrs']) if block['attrs'] else ''
+            parts.append('<script%s src="%s"></script>' % (attrs, src))
+        pos = b
+        warn = lazy and 'DOMContentLoaded' in body and 'readyState' not in body
+        rows.append({'chunk': name, 'lazy': lazy, 'bytes': len(data), 'file': src, 'line': block['line'],
+                     'held': held, 'wrapped': len(wrap),
+                     'warn': 'registers DOMContentLoaded without a readyState check' if warn else None})
+    parts.append(_wrap_handlers(text, pos, len(text), wraps))
+    return ''.join(parts), rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Split index.html inline scripts into hashed chunks')
+    ap.add_argument('html', nargs='?', default='index.html')
+    ap.add_argument('--out', required=True, help='output directory (index.html + chunks)')
+    ap.add_argument('--prefix', default='assets/js/', help='chunk URL prefix relative to the page')
+    ap.add_argument('--eager', nargs='*', default=[], metavar='CHUNK', help='load these lazy chunks eagerly')
+    ap.add_argument('--min-kb', type=float, default=8, help='other inline blocks this large get a chunk too')
+    args = ap.parse_args()
+
+    with open(args.html, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    scripts = local_scripts(text, os.path.dirname(os.path.abspath(args.html)))
+    try:
+        html, rows = split(text, args.out, args.prefix, eager=args.eager, min_kb=args.min_kb, scripts=scripts)
+    except AnchorError as e:
+        print('[ERROR] %s - nothing written' % e)
+        sys.exit(1)
+    out_html = os.path.join(args.out, os.path.basename(args.html))
+    tmp = '%s.%d.tmp' % (out_html, os.getpid())
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        f.write(html)
+    os.replace(tmp, out_html)
+
+    eager_kb = sum(r['bytes'] for r in rows if not r['lazy']) / 1024
+    lazy_kb = sum(r['bytes'] for r in rows if r['lazy']) / 1024
+    for r in rows:
+        print('   [%s] %-18s %8.1f KB  line %-6d -> %s'
+              % ('lazy ' if r['lazy'] else 'eager', r['chunk'], r['bytes'] / 1024, r['line'], r['file']))
+        if r['held']:
+            uses = sorted(r['held'].items())
+            print('   [WARN] %s kept eager, %d of its globals are used outside it: %s%s'
+                  % (r['chunk'], len(uses), ', '.join('%s (%s)' % u for u in uses[:8]),
+                     ', ...' if len(uses) > 8 else ''))
+        if r['wrapped']:
+            print('   [INFO] %s: %d on*= handlers wait for it through __mcLazy.when' % (r['chunk'], r['wrapped']))
+        if r['warn']:
+            print('   [WARN] %s %s' % (r['chunk'], r['warn']))
+    print('[OK] %s: %.0f KB -> %.0f KB html, %.0f KB eager JS (cacheable), %.0f KB deferred until used/idle'
+          % (out_html, len(text.encode('utf-8')) / 1024, len(html.encode('utf-8')) / 1024, eager_kb, lazy_kb))
+
+
+if __name__ == '__main__':
+    main()
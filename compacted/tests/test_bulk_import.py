@@ -0,0 +1,148 @@
+"""
+bulk_import.py + load_trgg_players.py against postgrest_standin.py
+
+Chunking, 503 retry, crash (--drop-after) and resume without renumbering, and
+a second run being a no-op. The loader runs as a subprocess, exactly as from the
+command line; the stand-in runs in-process where its request log is needed and
+as a subprocess where it has to die.
+
+    python -m pytest compacted/tests -q
+"""
+
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COMPACTED = os.path.dirname(HERE)
+sys.path.insert(0, COMPACTED)
+
+from bulk_import import PostgREST, bulk_upsert, chunked          # noqa: E402
+from postgrest_standin import serve                              # noqa: E402
+
+PLAYERS = os.path.join(COMPACTED, '..', 'TRGGplayers', 'trgghcpjanuary', 'TRGG_Handicap_List.json')
+SOCIETY = {'id': 'soc-trgg', 'organizer_id': 'U-organizer', 'society_name': 'Travellers Rest Golf Group'}
+
+
+def _players():
+    with open(PLAYERS, 'r', encoding='utf-8') as f:
+        return json.load(f)['players']
+
+
+class ChunkingAndRetry(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [{'line_user_id': 'TRGG-GUEST-%04d' % i, 'name': p['name']}
+                        for i, p in enumerate(_players(), 1)]
+
+    def test_chunks_are_bounded_by_rows_and_bytes(self):
+        by_rows = list(chunked(self.records, max_rows=100))
+        self.assertEqual(len(by_rows), math.ceil(len(self.records) / 100))
+        self.assertTrue(all(len(rows) <= 100 for rows, _ in by_rows))
+        by_bytes = list(chunked(self.records, max_rows=10000, max_bytes=8 * 1024))
+        self.assertTrue(all(len(body) <= 8 * 1024 for _, body in by_bytes))
+        for chunks in (by_rows, by_bytes):
+            self.assertEqual([r for rows, _ in chunks for r in rows], self.records)
+            self.assertEqual([r for _, body in chunks for r in json.loads(body)], self.records)
+
+    def test_upsert_sends_one_request_per_chunk(self):
+        server, store, url = serve()
+        try:
+            api = PostgREST(url + '/rest/v1', 'key')
+            stats = bulk_upsert(api, 'user_profiles', self.records, 'line_user_id', max_rows=100, log=lambda m: None)
+            api.close()
+        finally:
+            server.shutdown()
+        posts = [r for r in store.requests if r[0] == 'POST']
+        self.assertEqual(stats['chunks'], 12)
+        self.assertEqual(len(posts), 12)
+        self.assertEqual(len(store.tables['user_profiles']), len(self.records))
+
+    def test_503_is_retried(self):
+        server, store, url = serve(fail_every=3)
+        try:
+            api = PostgREST(url + '/rest/v1', 'key', backoff=0.01)
+            stats = bulk_upsert(api, 'user_profiles', self.records, 'line_user_id', max_rows=100, log=lambda m: None)
+            api.close()
+        finally:
+            server.shutdown()
+        statuses = [r[2] for r in store.requests if r[0] == 'POST']
+        self.assertIn(503, statuses)
+        self.assertEqual(statuses.count(201), 12)
+        self.assertEqual(stats['rows'], len(self.records))
+        self.assertEqual(len(store.tables['user_profiles']), len(self.records))
+
+
+class LoaderRuns(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='bulk-import-test-')
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def _load(self, url, *args):
+        env = dict(os.environ, SUPABASE_URL=url + '/rest/v1', SUPABASE_ANON_KEY='key',
+                   BULK_IMPORT_STATE=os.path.join(self.tmp, 'state'))
+        return subprocess.run([sys.executable, 'load_trgg_players.py', '--json', PLAYERS, '--workers', '1',
+                               '--chunk-rows', '400'] + list(args),
+                              cwd=COMPACTED, env=env, capture_output=True, text=True, timeout=300)
+
+    def _standin(self, port, seed, dump, *args):
+        p = subprocess.Popen([sys.executable, 'postgrest_standin.py', '--port', str(port), '--seed', seed,
+                              '--dump', dump] + list(args),
+                             cwd=COMPACTED, stdout=subprocess.PIPE, text=True)
+        self.addCleanup(p.kill)
+        line = p.stdout.readline()                    # "[OK] PostgREST stand-in on http://127.0.0.1:N/rest/v1 ..."
+        return p, line.split(' on ')[1].split('/rest/v1')[0]
+
+    def test_crash_resume_keeps_numbers_and_second_run_is_a_noop(self):
+        seed = os.path.join(self.tmp, 'seed.json')
+        with open(seed, 'w', encoding='utf-8') as f:
+            json.dump({'society_profiles': [SOCIETY], 'user_profiles': [], 'society_members': []}, f)
+
+        # 1. the stand-in dies on its 2nd write, mid user_profiles
+        crashed = os.path.join(self.tmp, 'crashed.json')
+        server, url = self._standin(0, seed, crashed, '--drop-after', '1')
+        port = int(url.rsplit(':', 1)[1])
+        first = self._load(url)
+        server.wait(timeout=30)
+        self.assertEqual(first.returncode, 1, first.stdout)
+        with open(os.path.join(self.tmp, 'state', 'load_trgg_players.json'), 'r', encoding='utf-8') as f:
+            plan = json.load(f)['plan']
+        with open(crashed, 'r', encoding='utf-8') as f:
+            partial = json.load(f)
+        self.assertEqual(len(partial['user_profiles']), 400)
+        self.assertEqual(partial['society_members'], [])
+
+        # 2. same URL, restarted from what had landed: resumes, nothing renumbered
+        final = os.path.join(self.tmp, 'final.json')
+        server, url = self._standin(port, crashed, final)
+        second = self._load(url)
+        self.assertEqual(second.returncode, 0, second.stdout)
+        self.assertIn('Resuming from checkpoint', second.stdout)
+        self.assertIn('(1 chunks already done)', second.stdout)
+
+        # 3. a third run finds everybody and writes nothing
+        third = self._load(url)
+        self.assertEqual(third.returncode, 0, third.stdout)
+        self.assertIn('All golfers already imported', third.stdout)
+        server.terminate()
+        server.wait(timeout=30)
+        with open(final, 'r', encoding='utf-8') as f:
+            tables = json.load(f)
+
+        planned = {m['golfer_id']: m['member_number'] for m in plan['society_members']}
+        landed = {m['golfer_id']: m['member_number'] for m in tables['society_members']}
+        self.assertEqual(landed, planned)
+        self.assertEqual(len(tables['society_members']), len(plan['society_members']))
+        self.assertEqual(sorted(p['line_user_id'] for p in tables['user_profiles']),
+                         sorted(p['line_user_id'] for p in plan['user_profiles']))
+        self.assertEqual(len(set(landed.values())), len(landed))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+js_index.update: an index patched after an edit is the index build() makes of
+the edited text
+
+    python -m pytest compacted/tests -q
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COMPACTED = os.path.dirname(HERE)
+sys.path.insert(0, COMPACTED)
+
+import js_index                                                  # noqa: E402
+
+PAGE = ('<html><body>\n<p>héllo</p>\n<script>\nclass A {\n    m() { return "</p>"; }\n}\n</script>\n'
+        '<div onclick="A.m()">é</div>\n<script>\nfunction b() {\n    const c = () => 1;\n}\n</script>\n'
+        '<script type="application/json">{"d": 1}</script>\n<script>\nclass E { f() {} }\n</script>\n'
+        '</body></html>\n')
+
+
+class Update(unittest.TestCase):
+
+    def _edit(self, old, new):
+        patched = js_index.update(js_index.build(old), old, new)
+        self.assertEqual(patched.to_json(), js_index.build(new).to_json())
+
+    def test_edits_match_a_full_build(self):
+        edits = [
+            ('<p>héllo</p>', '<p>héllo wörld</p>\n<p>two</p>'),          # markup before every block
+            ('m() {', 'm() {\n        const x = 1;'),                     # inside the first block
+            ('function b() {', 'function bb(q) {'),                        # a symbol renamed
+            ('class E { f() {} }', 'class E { f() {} g() {} }'),           # the last block
+            ('</script>\n<div', '\n<div'),                                 # two blocks run together
+            ('<div onclick', '<script>\nfunction z() {}\n</script>\n<div onclick'),   # a new block
+            ('"</p>"', '"`'),                                              # lexer state changes
+        ]
+        for a, b in edits:
+            with self.subTest(a):
+                self._edit(PAGE, PAGE.replace(a, b, 1))
+
+    def test_blocks_after_the_edit_are_shifted_not_lexed(self):
+        new, idx = PAGE.replace('<p>héllo</p>', '<p>é</p>\n\n'), js_index.build(PAGE)
+        with mock.patch.object(js_index, '_scan_block', wraps=js_index._scan_block) as scan:
+            patched = js_index.update(idx, PAGE, new)
+        self.assertFalse(scan.called)
+        self.assertEqual(patched.to_json(), js_index.build(new).to_json())
+        self.assertEqual([e['name'] for e in patched.symbols], ['A', 'A.m', 'b', 'E', 'E.f'])
+
+        with mock.patch.object(js_index, '_scan_block', wraps=js_index._scan_block) as scan:
+            js_index.update(idx, PAGE, PAGE.replace('const c', 'let c'))
+        self.assertEqual(scan.call_count, 1)
+
+    def test_index_of_other_text_is_rebuilt(self):
+        idx = js_index.update(js_index.build(PAGE), PAGE + ' ', PAGE)
+        self.assertEqual(idx.to_json(), js_index.build(PAGE).to_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
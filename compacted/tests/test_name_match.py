@@ -0,0 +1,48 @@
+"""
+name_match.py decisions on the cases that went wrong before
+
+    python -m pytest compacted/tests -q
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_match import THRESHOLD, NameIndex, surname      # noqa: E402
+
+
+def _status(name, profile):
+    index = NameIndex([{'name': profile}])
+    return index.match(name)['status'], index.match_all([name])[0][1]['status']
+
+
+class SurnameRule(unittest.TestCase):
+
+    def test_surname_split(self):
+        self.assertEqual(surname('Allen Davis, Terry'), ('allen', 'davis'))
+        self.assertEqual(surname('Luke Abbey'), ())
+
+    def test_same_tokens_in_any_order_match(self):
+        self.assertEqual(_status('Abbey, Luke', 'Luke Abbey'), ('match', 'match'))
+
+    def test_initials_match(self):
+        index = NameIndex([{'name': 'William George Lee'}])
+        self.assertGreaterEqual(index.search('Lee, W.G.')[0][0], THRESHOLD)
+        self.assertEqual(_status('Lee, W.G.', 'William George Lee'), ('match', 'match'))
+
+    def test_surname_near_spelling_is_ambiguous(self):
+        index = NameIndex([{'name': 'John Smithers'}])
+        self.assertGreaterEqual(index.search('Smith, John')[0][0], THRESHOLD)
+        self.assertEqual(_status('Smith, John', 'John Smithers'), ('ambiguous', 'ambiguous'))
+        self.assertEqual(_status('Beupre, Brian', 'Brian Beaupre'), ('ambiguous', 'ambiguous'))
+
+    def test_swapped_list_names_are_not_the_same_player(self):
+        self.assertEqual(_status('Takashi, Komatsu', 'Komatsu, Takashi'), ('ambiguous', 'ambiguous'))
+        self.assertEqual(_status('Komatsu, Takashi', 'Komatsu, Takashi'), ('match', 'match'))
+        self.assertEqual(_status('Komatsu, T.', 'Komatsu, Takashi'), ('match', 'match'))
+
+
+if __name__ == '__main__':
+    unittest.main()
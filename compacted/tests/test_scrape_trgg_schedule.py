@@ -0,0 +1,150 @@
+"""
+scrape_trgg_schedule.py: parsing the saved pages, conditional GETs against a
+fake transport, and a failed parse not leaving the output stale
+
+    python -m pytest compacted/tests -q
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COMPACTED = os.path.dirname(HERE)
+sys.path.insert(0, COMPACTED)
+
+import scrape_trgg_schedule as scraper                          # noqa: E402
+
+FIXTURES = os.path.join(COMPACTED, '..', 'TRGGschedule', 'fixtures')
+PAGE = b'<h2>NOVEMBER 2025</h2><p>20 THU PHOENIX 10.00 11.00 2350 INCL INCL</p>'
+URL = 'https://example.invalid/schedule/'
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class ParseSchedule(unittest.TestCase):
+
+    def test_table_page(self):
+        rows = scraper.parse_schedule(_fixture('schedule_table.html'))
+        self.assertEqual(len(rows), 52)
+        self.assertEqual(sum(len(r['courses']) for r in rows), 57)
+        first = rows[0]
+        self.assertEqual((first['date'], first['day'], first['courses']), ('2025-10-01', 'WED', ['KHAO KHEOW']))
+        self.assertEqual((first['depart'], first['tee_off'], first['green_fee']), (['08.50'], ['10.05'], ['2050']))
+        self.assertEqual(rows[-1]['date'], '2025-11-29')
+        nov3 = next(r for r in rows if r['date'] == '2025-11-03')
+        self.assertEqual(nov3['courses'], ['KHAO KHEOW (6 GROUPS) A-B', 'KHAO KHEOW (6 GROUPS) C-A'])
+        self.assertEqual(rows[-1]['courses'], ['GREEN VALLEY (3 GROUPS)', 'TREASURE HILL (7 GROUPS)'])
+        self.assertEqual(rows[-1]['tee_off'], ['11.30', '12.00'])
+
+    def test_text_page(self):
+        rows = scraper.parse_schedule(_fixture('schedule_text.html'))
+        self.assertEqual([r['date'] for r in rows][:2], ['2025-10-20', '2025-10-21'])
+        self.assertEqual(len(rows), 11)
+        self.assertEqual(rows[0]['courses'], ['PATTAYA C.C.'])
+        self.assertEqual((rows[0]['depart'], rows[0]['tee_off'], rows[0]['green_fee'], rows[0]['cart']),
+                         (['08.30'], ['09.20'], ['1950'], ['INCL']))
+        self.assertEqual((rows[-1]['date'], rows[-1]['courses']), ('2025-10-31', ['BURAPHA FREE FOOD FRIDAY']))
+
+
+@unittest.skipIf(scraper.lxml is None, 'lxml is not installed')
+class BackendParity(unittest.TestCase):
+    """lxml and html.parser must read a page into the same items."""
+
+    NESTED = ('<div>NOVEMBER 2025<p>20 THU PHOENIX 10.00 11.00 2350 INCL INCL</p>'
+              '<p>21 FRI BURAPHA 09.00 10.00 2250 INCL INCL</p></div><!-- note -->')
+
+    def _both(self, html):
+        with mock.patch.object(scraper, 'lxml', None):
+            streamed = scraper.page_items(html)
+        return scraper.page_items(html), streamed
+
+    def test_fixtures(self):
+        for name in ('schedule_table.html', 'schedule_text.html'):
+            html = _fixture(name)
+            with self.subTest(name):
+                tree, streamed = self._both(html)
+                self.assertEqual(tree, streamed)
+
+    def test_heading_in_a_block_with_children(self):
+        tree, streamed = self._both(self.NESTED)
+        self.assertEqual(tree, streamed)
+        self.assertEqual([r['date'] for r in scraper.parse_schedule(self.NESTED)], ['2025-11-20', '2025-11-21'])
+
+
+class FakeTransport:
+    """Serves `body` with an ETag; answers 304 to a matching If-None-Match."""
+
+    def __init__(self, body, etag='"v1"'):
+        self.body, self.etag, self.requests = body, etag, []
+
+    def __call__(self, url, headers):
+        self.requests.append(headers)
+        if headers.get('If-None-Match') == self.etag:
+            return 304, {'ETag': self.etag}, b''
+        return 200, {'ETag': self.etag}, self.body
+
+
+class ConditionalFetch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='trgg-schedule-test-')
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.cache = os.path.join(self.tmp, 'cache')
+        self.out = os.path.join(self.tmp, 'trgg_schedule.json')
+
+    def test_second_fetch_is_conditional_and_304_serves_the_cached_page(self):
+        transport = FakeTransport(PAGE)
+        html, status, meta = scraper.fetch(URL, self.cache, transport)
+        self.assertEqual((status, meta['etag']), (200, '"v1"'))
+        html2, status2, meta2 = scraper.fetch(URL, self.cache, transport)
+        self.assertEqual(transport.requests[1]['If-None-Match'], '"v1"')
+        self.assertEqual(status2, 304)
+        self.assertEqual(html2, html)
+        self.assertEqual(meta2['sha256'], meta['sha256'])
+
+    def _main(self, transport):
+        out = io.StringIO()
+        argv = ['scrape_trgg_schedule.py', '--url', URL, '--cache', self.cache, '--out', self.out]
+        with mock.patch.object(scraper, 'urllib_transport', transport), mock.patch.object(sys, 'argv', argv), \
+                contextlib.redirect_stdout(out):
+            try:
+                scraper.main()
+                code = 0
+            except SystemExit as e:
+                code = e.code
+        return code, out.getvalue()
+
+    def test_304_leaves_an_output_built_from_the_cached_page(self):
+        transport = FakeTransport(PAGE)
+        self.assertEqual(self._main(transport)[0], 0)
+        code, log = self._main(transport)
+        self.assertEqual(code, 0)
+        self.assertIn('left as is', log)
+
+    def test_failed_parse_is_retried_after_304(self):
+        with open(self.out, 'w', encoding='utf-8') as f:
+            json.dump({'sha256': 'older page', 'events': []}, f)
+        broken = FakeTransport(b'<p>maintenance</p>', etag='"v2"')
+        self.assertEqual(self._main(broken)[0], 1)
+
+        code, log = self._main(broken)                     # 304, but the output predates the cached page
+        self.assertEqual(broken.requests[-1]['If-None-Match'], '"v2"')
+        self.assertNotIn('left as is', log)
+        self.assertIn('parsing the cached page', log)
+        self.assertEqual(code, 1)
+        with open(self.out, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['sha256'], 'older page')
+
+
+if __name__ == '__main__':
+    unittest.main()
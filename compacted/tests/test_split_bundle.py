@@ -0,0 +1,75 @@
+"""
+split_bundle.py: which chunks may load lazily, on small pages and on the real
+www/index.html
+
+    python -m pytest compacted/tests -q
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COMPACTED = os.path.dirname(HERE)
+sys.path.insert(0, COMPACTED)
+
+import split_bundle                                              # noqa: E402
+
+WWW = os.path.join(COMPACTED, '..', 'www')
+MODULES = [('lib', 'Lib', True)]
+LIB = '<script>\nclass Lib { static go() {} }\nfunction libHelper() {}\n</script>\n'
+
+
+def _page(before='', after=''):
+    return '<html><body>\n%s\n%s<script>\n%s\n</script>\n</body></html>\n' % (before, LIB, after)
+
+
+def _lazy(text):
+    (block, name, lazy, held, wrap), = split_bundle.plan(text, MODULES, min_kb=1000)
+    return lazy, held
+
+
+class LazySafety(unittest.TestCase):
+
+    def test_comments_and_strings_do_not_hold(self):
+        self.assertEqual(_lazy(_page(after='// Notify Lib to reload\nconsole.log("Lib", `Lib`);')), (True, {}))
+        self.assertEqual(_lazy(_page('<!-- <button onclick="Lib.go()"> -->')), (True, {}))
+
+    def test_guarded_uses_are_lazy_safe(self):
+        guarded = ("if (typeof Lib !== 'undefined' && Lib.go) {\n    Lib.go();\n}\n"
+                   "window.Lib && window.Lib.go();\nif (window.libHelper) window.libHelper();")
+        self.assertEqual(_lazy(_page(after=guarded)), (True, {}))
+
+    def test_unguarded_use_holds(self):
+        lazy, held = _lazy(_page(after="if (typeof Lib !== 'undefined') {}\nLib.go();"))
+        self.assertFalse(lazy)
+        self.assertEqual(held, {'Lib': 'line 9'})
+        self.assertEqual(_lazy(_page(after='var s = `<b onclick="Lib.go()">`;'))[1], {'Lib': 'line 8'})
+
+    def test_markup_handlers_wait_for_the_chunk(self):
+        text = _page('<button onclick="Lib.go(this)">go</button>')
+        self.assertEqual(_lazy(text), (True, {}))
+        out = tempfile.mkdtemp(prefix='split-bundle-test-')
+        self.addCleanup(shutil.rmtree, out, True)
+        html, rows = split_bundle.split(text, out, modules=MODULES, min_kb=1000)
+        self.assertIn('''onclick="return __mcLazy.when('lib', () => { Lib.go(this)\n})"''', html)
+        self.assertEqual(rows[0]['wrapped'], 1)
+        self.assertEqual(_lazy(_page('<a onclick="Lib.go(); return false">go</a>'))[1], {'Lib': 'line 2'})
+
+
+class RealPage(unittest.TestCase):
+
+    def test_defers_a_chunk_of_index_html(self):
+        with open(os.path.join(WWW, 'index.html'), 'r', encoding='utf-8', newline='') as f:
+            text = f.read()
+        rows = {name: (lazy, held, wrap) for _, name, lazy, held, wrap
+                in split_bundle.plan(text, scripts=split_bundle.local_scripts(text, WWW))}
+        self.assertTrue(rows['live-scorecard'][0])
+        self.assertTrue(rows['live-scorecard'][2])
+        self.assertNotIn('CourseAdminSystem', rows['society-organizer'][1])      # only named in a comment
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Course seed data (tees/par/SI per hole), parsed once into a keyed index.
+
+Reads any of the three shapes in scorecard_profiles/plutaluang_seed.*:
+  .csv   course,nine,hole,blue,white,yellow,red,par,hcp
+  .json  {"course": ..., "nines": {"East": [{"hole": 1, "blue": ..}, ..], ..}}
+  .sql   the INSERT INTO nine_hole ... (SELECT id FROM course_nine WHERE
+         course_name='..' AND nine_name='..'), hole, blue, .., hcp upserts
+
+and validates at load time — duplicate holes, missing/zero tees, par/SI/hole
+out of range (the same CHECKs the SQL schema enforces) raise SeedError here
+instead of surfacing as a blank header on a rendered card.
+
+    idx = course_seed.load("scorecard_profiles/plutaluang_seed.csv")
+    idx.get("North", 3)            # {'course': .., 'nine': 'North', 'hole': 3, 'par': 4, ..}
+
+    python3 course_seed.py scorecard_profiles/plutaluang_seed.sql   # validate + summary
+"""
+import csv, json, re, sys
+from functools import lru_cache
+
+TEES = ("blue", "white", "yellow", "red")
+FIELDS = TEES + ("par", "hcp")
+
+class SeedError(ValueError):
+    pass
+
+SQL_ROW = re.compile(
+    r"course_name\s*=\s*'((?:[^']|'')*)'\s+AND\s+nine_name\s*=\s*'((?:[^']|'')*)'\s*\)\s*,"
+    r"\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)", re.I)
+
+def _rows_csv(path):
+    with open(path, newline="") as f:
+        yield from csv.DictReader(f)
+
+def _rows_json(path):
+    d = json.load(open(path))
+    for nine, holes in d["nines"].items():
+        for h in holes:
+            yield dict(h, course=d.get("course", ""), nine=nine)
+
+def _rows_sql(path):
+    sql = open(path).read()
+    for m in SQL_ROW.finditer(sql):
+        course, nine = m.group(1).replace("''", "'"), m.group(2).replace("''", "'")
+        yield dict(zip(("course", "nine", "hole") + FIELDS, (course, nine) + m.groups()[2:]))
+
+READERS = {"csv": _rows_csv, "json": _rows_json, "sql": _rows_sql}
+
+class SeedIndex:
+    """(course, nine, hole) -> typed row. Lookups are case-insensitive on names."""
+
+    def __init__(self, rows):
+        self.rows = {}
+        for r in rows:
+            key = (r["course"].lower(), r["nine"].lower(), r["hole"])
+            if key in self.rows:
+                raise SeedError(f"duplicate hole: {r['course']} {r['nine']} #{r['hole']}")
+            self.rows[key] = r
+        self._by_nine = {}
+        for (c, n, h), r in self.rows.items():
+            self._by_nine.setdefault((n, h), []).append(r)
+
+    def get(self, nine, hole, course=None):
+        """Row for nine/hole. Without a course, the nine/hole must be unambiguous."""
+        try:
+            hole = int(hole)
+        except (TypeError, ValueError):
+            return None
+        if course:
+            return self.rows.get((course.lower(), str(nine).lower(), hole))
+        hits = self._by_nine.get((str(nine).lower(), hole), [])
+        return hits[0] if len(hits) == 1 else None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows.values())
+
+def _typed(r, where):
+    out = {"course": (r.get("course") or "").strip(), "nine": (r.get("nine") or "").strip()}
+    if not out["nine"]:
+        raise SeedError(f"{where}: missing nine")
+    for k in ("hole",) + FIELDS:
+        v = r.get(k)
+        if v in (None, "") and k in TEES:
+            raise SeedError(f"{where}: {out['nine']} #{r.get('hole')} missing {k} tee")
+        try:
+            out[k] = int(v)
+        except (TypeError, ValueError):
+            raise SeedError(f"{where}: {out['nine']} #{r.get('hole')} bad {k}={v!r}") from None
+    name = f"{where}: {out['nine']} #{out['hole']}"
+    if not 1 <= out["hole"] <= 9:
+        raise SeedError(f"{name}: hole out of range")
+    if out["par"] not in (3, 4, 5):
+        raise SeedError(f"{name}: par {out['par']}")
+    if not 1 <= out["hcp"] <= 18:
+        raise SeedError(f"{name}: SI {out['hcp']}")
+    for t in TEES:
+        if out[t] <= 0:
+            raise SeedError(f"{name}: missing {t} tee")
+    return out
+
+@lru_cache(maxsize=None)
+def load(path):
+    """Parse + validate a seed file once per path (format from the extension)."""
+    ext = path.rsplit(".", 1)[-1].lower()
+    if ext not in READERS:
+        raise SeedError(f"{path}: unsupported seed format .{ext} (csv/json/sql)")
+    rows = [_typed(r, f"{path}:{i}") for i, r in enumerate(READERS[ext](path), start=1)]
+    if not rows:
+        raise SeedError(f"{path}: no holes found")
+    return SeedIndex(rows)
+
+if __name__ == "__main__":
+    for p in sys.argv[1:]:
+        idx = load(p)
+        nines = sorted({(r["course"], r["nine"]) for r in idx})
+        print(f"✓ {p}: {len(idx)} holes · " + ", ".join(n for _, n in nines))
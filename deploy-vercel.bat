@@ -25,6 +25,15 @@ if exist sw.js (
     echo ⚠️  Warning: sw.js not found in current directory
 )
 
+REM Content-hash the assets and regenerate public/sw.js (this is what Vercel deploys).
+REM The worker serves ?v=hash URLs cache-first, so this must run on every deploy.
+echo 🔄 Hashing assets and updating the precache manifest...
+python compacted\hash_assets.py public\index.html --sw public\sw.js
+if errorlevel 1 (
+    echo ❌ hash_assets.py failed - not deploying
+    exit /b 1
+)
+
 echo.
 echo 📦 Committing changes...
 git add .
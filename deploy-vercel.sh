@@ -25,12 +25,12 @@ else
     echo "⚠️  Warning: sw.js not found in current directory"
 fi
 
-# Also update public/sw.js (this is what Vercel deploys)
-if [ -f "public/sw.js" ]; then
-    sed -i "s/const BUILD_TIMESTAMP = '.*'/const BUILD_TIMESTAMP = '$BUILD_TIMESTAMP'/" public/sw.js
-    echo "✅ Public service worker updated"
-else
-    echo "⚠️  Warning: public/sw.js not found"
+# Content-hash the assets and regenerate public/sw.js (this is what Vercel deploys).
+# The worker serves ?v=<hash> URLs cache-first, so this must run on every deploy.
+echo "🔄 Hashing assets and updating the precache manifest..."
+if ! python compacted/hash_assets.py public/index.html --sw public/sw.js; then
+    echo "❌ hash_assets.py failed - not deploying"
+    exit 1
 fi
 
 # Git operations
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Phone-sized hole layouts: LOD simplification + compact GeoJSON/TopoJSON export.
+
+segment.py traces at a 2 px tolerance and writes full-precision floats with
+indent=2 — fine for editing in geojson.io, far too big to ship for GPS overlays.
+This takes finished GeoJSON and writes one file per level of detail:
+
+  * Douglas-Peucker (skimage.measure.approximate_polygon) at true ground-metre
+    tolerances, done in Web Mercator with the 1/cos(lat) scale folded in;
+  * coordinates rounded to --precision decimals (6 ≈ 0.11 m), repeated
+    vertices dropped, minified JSON;
+  * optionally --topojson: quantized integer coordinates with delta-encoded
+    arcs (TopoJSON 1.0, readable by topojson-client). Each ring is its own
+    arc — traced surfaces rarely share exact vertices, so there is no
+    shared-edge detection.
+
+Rings that would collapse below a triangle at a coarse tolerance (tiny
+bunkers) keep their original vertices rather than vanish. Points (tees, pin)
+are only rounded.
+
+    python3 export_layout.py hole_layouts/north-03.geojson --out-dir export \
+        [--lod 1 2 4] [--precision 6] [--topojson]
+"""
+import argparse, json, math, os
+import numpy as np
+from skimage.measure import approximate_polygon
+import merc
+
+def simplify_ring(ring, tol_m):
+    """Douglas-Peucker a lon/lat ring at tol_m ground metres. Returns lon/lat list."""
+    ll = np.asarray(ring, float)[:, :2]
+    if tol_m <= 0 or len(ll) < 5:
+        return ll.tolist()
+    lat = float(ll[:, 1].mean())
+    xy = merc.lonlat_to_merc_arr(ll)
+    c = approximate_polygon(xy, tolerance=tol_m / math.cos(math.radians(lat)))
+    if len(c) < 4:
+        return ll.tolist()
+    return merc.merc_to_lonlat_arr(c).tolist()
+
+def _round_ring(ring, precision):
+    out = []
+    for lon, lat in ring:
+        p = [round(lon, precision), round(lat, precision)]
+        if not out or p != out[-1]:
+            out.append(p)
+    if out[0] != out[-1]:
+        out.append(out[0])
+    return out
+
+def lod(fc, tol_m, precision=6):
+    """New FeatureCollection with every polygon simplified at tol_m and all
+    coordinates rounded."""
+    feats = []
+    for f in fc["features"]:
+        g = f["geometry"]
+        if g["type"] == "Polygon":
+            rings = [_round_ring(simplify_ring(r, tol_m), precision) for r in g["coordinates"]]
+            rings = [r for r in rings if len(r) >= 4]
+            if not rings:
+                continue
+            g = {"type": "Polygon", "coordinates": rings}
+        elif g["type"] == "Point":
+            g = {"type": "Point", "coordinates": [round(v, precision) for v in g["coordinates"][:2]]}
+        feats.append({"type": "Feature", "properties": f.get("properties", {}), "geometry": g})
+    out = {"type": "FeatureCollection", "features": feats}
+    if fc.get("properties"):
+        out["properties"] = dict(fc["properties"], lod_m=tol_m)
+    return out
+
+def to_topojson(fc, name, q=100000):
+    """Quantized, delta-encoded TopoJSON of a (simplified) FeatureCollection."""
+    pts = [p for f in fc["features"] for p in
+           ([c for r in f["geometry"]["coordinates"] for c in r]
+            if f["geometry"]["type"] == "Polygon" else [f["geometry"]["coordinates"]])]
+    a = np.asarray(pts, float) if pts else np.zeros((1, 2))
+    x0, y0 = a.min(0)
+    sx, sy = [max(v, 1e-12) / (q-1) for v in a.max(0) - a.min(0)]
+    quant = lambda c: [int(round((c[0]-x0)/sx)), int(round((c[1]-y0)/sy))]
+    arcs, geoms = [], []
+    for f in fc["features"]:
+        g = f["geometry"]
+        if g["type"] == "Polygon":
+            idx = []
+            for r in g["coordinates"]:
+                qr = np.asarray([quant(c) for c in r])
+                qr = qr[np.r_[True, (np.diff(qr, axis=0) != 0).any(1)]]   # drop repeats after quantizing
+                arcs.append(np.vstack([qr[:1], np.diff(qr, axis=0)]).tolist())
+                idx.append([len(arcs)-1])
+            geoms.append({"type": "Polygon", "arcs": idx, "properties": f["properties"]})
+        elif g["type"] == "Point":
+            geoms.append({"type": "Point", "coordinates": quant(g["coordinates"]),
+                          "properties": f["properties"]})
+    return {"type": "Topology",
+            "transform": {"scale": [sx, sy], "translate": [float(x0), float(y0)]},
+            "objects": {name: {"type": "GeometryCollection", "geometries": geoms}},
+            "arcs": arcs}
+
+def export(path, out_dir, lods=(1.0, 2.0, 4.0), precision=6, topojson=False):
+    """Write <stem>-lod<m>m.geojson (and .topojson) per level. Returns [(path, bytes)]."""
+    fc = json.load(open(path))
+    stem = os.path.basename(path).rsplit(".", 1)[0]
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for tol in lods:
+        small = lod(fc, tol, precision)
+        tag = f"{tol:g}m"
+        outs = [(os.path.join(out_dir, f"{stem}-lod{tag}.geojson"), small)]
+        if topojson:
+            outs.append((os.path.join(out_dir, f"{stem}-lod{tag}.topojson"), to_topojson(small, stem)))
+        for p, doc in outs:
+            with open(p, "w") as f:
+                json.dump(doc, f, separators=(",", ":"))
+            written.append((p, os.path.getsize(p)))
+    return written
+
+def main():
+    a = argparse.ArgumentParser()
+    a.add_argument("geojson", nargs="+")
+    a.add_argument("--out-dir", required=True)
+    a.add_argument("--lod", type=float, nargs="+", default=[1.0, 2.0, 4.0], help="tolerances, ground metres")
+    a.add_argument("--precision", type=int, default=6, help="decimal places (6 ≈ 0.11 m)")
+    a.add_argument("--topojson", action="store_true")
+    args = a.parse_args()
+    for src in args.geojson:
+        size = os.path.getsize(src)
+        for p, n in export(src, args.out_dir, args.lod, args.precision, args.topojson):
+            print(f"✓ {p}: {n/1024:.1f} KB  ({size/max(n, 1):.1f}x smaller than {os.path.basename(src)})")
+
+if __name__ == "__main__":
+    main()
@@ -10,35 +10,103 @@ Run on a machine with open network (e.g. Hal / Claude Code):
         --width 320 --height 460 --ppm 2
 
 --ppm = pixels per ground metre (2 -> 0.5 m/px, plenty for traces).
+
+Every download lands in a content-addressed cache first (key = bbox, size, ppm),
+so re-running the pipeline makes zero network calls for tiles it already has.
+Whole course in one go, a few requests in flight at a time:
+    python3 fetch_tile.py --manifest holes.json --out hole_layouts [--workers 4]
+where holes.json is [{"name": "north-03", "lat": .., "lng": .., "width"?: 320,
+"height"?: 460, "ppm"?: 2}, ...].
 """
-import argparse, json, urllib.request
+import argparse, hashlib, json, os, shutil, time, urllib.error, urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from merc import bbox_from_center
 
 ESRI = ("https://services.arcgisonline.com/ArcGIS/rest/services/"
         "World_Imagery/MapServer/export")
+CACHE = os.environ.get("TILE_CACHE", os.path.expanduser("~/.cache/mcipro-tiles"))
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+def urllib_transport(url, timeout=60):
+    with urllib.request.urlopen(url, timeout=timeout) as r:
+        return r.read()
+
+def get_with_retry(transport, url, tries=4, backoff=1.0):
+    """transport(url) -> bytes, retried with exponential backoff. Esri answers some
+    failures with HTTP 200 + a JSON error body, so anything that isn't a PNG counts
+    as a failure too (and never reaches the cache)."""
+    for i in range(tries):
+        try:
+            body = transport(url)
+            if body[:8] == PNG_MAGIC:
+                return body
+            err = ValueError(f"not a PNG ({body[:80]!r})")
+        except (urllib.error.URLError, OSError) as e:
+            err = e
+        if i < tries-1:
+            time.sleep(backoff * 2**i)
+    raise RuntimeError(f"tile fetch failed after {tries} tries: {url}") from err
 
-def fetch(name, lon, lat, width_m, height_m, ppm, out="."):
+def cache_key(bbox, W, H, ppm):
+    return hashlib.sha256(json.dumps([[round(v, 6) for v in bbox], W, H, float(ppm)]).encode()).hexdigest()
+
+def fetch(name, lon, lat, width_m, height_m, ppm, out=".", cache=CACHE, transport=None):
+    """Write <out>/<name>.png + sidecar. Returns (png path, True if served from cache).
+    cache=None disables the cache; transport defaults to urllib."""
     bbox = bbox_from_center(lon, lat, width_m, height_m)
     W, H = int(width_m*ppm), int(height_m*ppm)
     q = (f"{ESRI}?bbox={bbox[0]},{bbox[1]},{bbox[2]},{bbox[3]}"
          f"&bboxSR=3857&imageSR=3857&size={W},{H}&format=png&f=image")
     png = f"{out}/{name}.png"
-    urllib.request.urlretrieve(q, png)
+    hit = False
+    if cache:
+        key = cache_key(bbox, W, H, ppm)
+        cpath = os.path.join(cache, key[:2], key + ".png")
+        hit = os.path.exists(cpath)
+        if not hit:
+            body = get_with_retry(transport or urllib_transport, q)
+            os.makedirs(os.path.dirname(cpath), exist_ok=True)
+            tmp = f"{cpath}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, cpath)   # atomic: concurrent runs never see half a tile
+        shutil.copyfile(cpath, png)
+    else:
+        with open(png, "wb") as f:
+            f.write(get_with_retry(transport or urllib_transport, q))
     side = {"name": name, "bbox_3857": bbox, "img_w": W, "img_h": H,
             "center": [lon, lat], "ground_m": [width_m, height_m]}
     with open(f"{out}/{name}.json", "w") as f:
         json.dump(side, f, indent=2)
-    print(f"✓ {png} ({W}x{H}px, {width_m}x{height_m} m) + sidecar")
-    return png
+    print(f"✓ {png} ({W}x{H}px, {width_m}x{height_m} m) + sidecar{'  [cached]' if hit else ''}")
+    return png, hit
+
+def fetch_many(holes, out=".", workers=4, cache=CACHE, transport=None):
+    """Fetch every hole in a manifest list with at most `workers` requests in flight.
+    Returns [(png, cached), ...] in manifest order."""
+    def one(h):
+        return fetch(h["name"], float(h["lng"]), float(h["lat"]), float(h.get("width", 320)),
+                     float(h.get("height", 460)), float(h.get("ppm", 2)), out, cache, transport)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(one, holes))
 
 if __name__ == "__main__":
     a = argparse.ArgumentParser()
-    a.add_argument("--name", required=True)
-    a.add_argument("--lat", type=float, required=True)
-    a.add_argument("--lng", type=float, required=True)
+    a.add_argument("--name")
+    a.add_argument("--lat", type=float)
+    a.add_argument("--lng", type=float)
     a.add_argument("--width", type=float, default=320)   # ground metres E-W
     a.add_argument("--height", type=float, default=460)  # ground metres N-S
     a.add_argument("--ppm", type=float, default=2)
     a.add_argument("--out", default=".")
+    a.add_argument("--manifest", help="JSON list of holes to fetch in bulk")
+    a.add_argument("--workers", type=int, default=4)
+    a.add_argument("--cache", default=CACHE, help="tile cache dir ('' to disable)")
     args = a.parse_args()
-    fetch(args.name, args.lng, args.lat, args.width, args.height, args.ppm, args.out)
+    if args.manifest:
+        res = fetch_many(json.load(open(args.manifest)), args.out, args.workers, args.cache or None)
+        print(f"✓ {len(res)} tiles, {sum(1 for _, hit in res if not hit)} downloaded")
+    elif args.name and args.lat is not None and args.lng is not None:
+        fetch(args.name, args.lng, args.lat, args.width, args.height, args.ppm, args.out, args.cache or None)
+    else:
+        a.error("--name/--lat/--lng or --manifest required")
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Spatial index over a course's traced hole features: where is this GPS point,
+how far to the hazard edge, how far to the front / centre / back of the green.
+
+Built from segment.py GeoJSON (polygons tagged t = fairway/green/water/bunker/
+rough, points t = tee_*/pin) plus the projection in merc.py. Everything is
+projected once into course-local ground metres (Web Mercator scaled by
+cos(lat) at the course centre — the error across a course is < 1 cm/km), and
+every polygon is registered in a uniform grid so a batch of points only ever
+tests the polygons in its own cell.
+
+Nine/hole come from each feature's properties, falling back to the file's first
+feature (the segment.py convention). The GPS scaffold's `tee: blue` points are
+read as `tee_blue`; points with null coordinates are skipped.
+
+    idx = CourseIndex.from_geojson(glob("hole_layouts/*.geojson"))
+    idx.locate([[lon, lat], ...])           # features containing each point
+    idx.nearest(pts, tags={"water"})        # nearest hazard + edge distance (m)
+    idx.green_fcb(pts, "North", 3)          # (N,3) front/centre/back (m)
+    idx.distance_table("North", 3)          # per-tee table for the app
+
+    python3 hole_index.py hole_layouts/*.geojson --table distances.json
+    python3 hole_index.py hole_layouts/*.geojson --at 12.7109,100.9558
+"""
+import argparse, json, math
+from collections import defaultdict
+import numpy as np
+import merc
+
+YD = 1.09361   # yards per metre, same factor as calculateDistance() in www/index.html
+HAZARDS = ("water", "bunker")
+
+def _pip(pts, edges):
+    """Even-odd point-in-polygon for every point against one polygon's edges
+    (all rings, so holes work). pts (n,2), edges (m,4) -> (n,) bool."""
+    x, y = pts[:, :1], pts[:, 1:]
+    x1, y1, x2, y2 = edges.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xint = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return (((y1 > y) != (y2 > y)) & (x < xint)).sum(1) % 2 == 1
+
+def _edge_dist(pts, edges, chunk=1 << 22):
+    """Distance from each point to the nearest of `edges`. (n,) metres."""
+    a, ab = edges[:, :2], edges[:, 2:] - edges[:, :2]
+    ab2 = np.maximum((ab * ab).sum(1), 1e-12)
+    out = np.empty(len(pts))
+    step = max(1, chunk // max(len(edges), 1))
+    for i in range(0, len(pts), step):
+        p = pts[i:i+step, None, :]
+        t = np.clip(((p - a) * ab).sum(-1) / ab2, 0, 1)
+        d = p - (a + t[..., None] * ab)
+        out[i:i+step] = np.sqrt((d * d).sum(-1)).min(1)
+    return out
+
+def _ray_hits(p, q, edges):
+    """Distances along p->q (unbounded beyond q) at which the ray crosses `edges`."""
+    d = q - p
+    a, e = edges[:, :2], edges[:, 2:] - edges[:, :2]
+    den = d[0] * e[:, 1] - d[1] * e[:, 0]
+    ok = np.abs(den) > 1e-12
+    w = a - p
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = (w[:, 0] * e[:, 1] - w[:, 1] * e[:, 0]) / den
+        u = (w[:, 0] * d[1] - w[:, 1] * d[0]) / den
+    hit = ok & (s >= 0) & (u >= 0) & (u <= 1)
+    return np.sort(s[hit]) * math.hypot(*d)
+
+def _tag(props):
+    t = props.get("t") or ""
+    if not t and props.get("tee"):
+        t = "tee_" + props["tee"]
+    return t
+
+class CourseIndex:
+    def __init__(self, features, cell_m=25.0):
+        """features: GeoJSON Feature dicts, each with nine/hole in properties."""
+        lonlat = [c for f in features if f["geometry"]["type"] == "Polygon"
+                  for r in f["geometry"]["coordinates"] for c in r]
+        lonlat += [f["geometry"]["coordinates"] for f in features if f["geometry"]["type"] == "Point"]
+        lon0, lat0 = np.asarray(lonlat, float)[:, :2].mean(0)
+        self.origin = merc.lonlat_to_merc(lon0, lat0)
+        self.k = math.cos(math.radians(lat0))   # mercator m -> ground m at the course
+        self.cell = cell_m
+        self.polys, self.edges, self.bbox = [], [], []
+        self.points = defaultdict(dict)   # (nine lower, hole) -> {t: (2,) xy}
+        self.grid = defaultdict(list)
+        for f in features:
+            g, p = f["geometry"], f.get("properties", {})
+            key = (str(p.get("nine", "")).lower(), p.get("hole"))
+            if g["type"] == "Point":
+                self.points[key][_tag(p)] = self.to_local([g["coordinates"]])[0]
+                continue
+            rings = [self.to_local(r) for r in g["coordinates"] if len(r) >= 4]
+            if not rings:
+                continue
+            e = np.vstack([np.hstack([r[:-1], r[1:]]) for r in rings])
+            lo, hi = rings[0].min(0), rings[0].max(0)
+            i = len(self.polys)
+            self.polys.append({"t": _tag(p) or "fairway", "nine": p.get("nine"), "hole": p.get("hole"),
+                               "key": key, "outer": rings[0]})
+            self.edges.append(e)
+            self.bbox.append(np.r_[lo, hi])
+            for cx in range(*self._cells(lo[0], hi[0])):
+                for cy in range(*self._cells(lo[1], hi[1])):
+                    self.grid[cx, cy].append(i)
+        self.bbox = np.asarray(self.bbox).reshape(-1, 4)
+
+    @classmethod
+    def from_geojson(cls, paths, cell_m=25.0):
+        feats = []
+        for path in paths:
+            fc = json.load(open(path))
+            fs = fc.get("features", [])
+            first = fs[0].get("properties", {}) if fs else {}
+            for f in fs:
+                g = f.get("geometry") or {}
+                if g.get("type") not in ("Polygon", "Point"):
+                    continue
+                if g["type"] == "Point" and None in g["coordinates"][:2]:
+                    continue
+                p = dict(f.get("properties") or {})
+                p.setdefault("nine", first.get("nine"))
+                p.setdefault("hole", first.get("hole"))
+                feats.append({"geometry": g, "properties": p})
+        return cls(feats, cell_m)
+
+    def _cells(self, lo, hi):
+        return int(math.floor(lo / self.cell)), int(math.floor(hi / self.cell)) + 1
+
+    def to_local(self, lonlat):
+        m = merc.lonlat_to_merc_arr(np.asarray(lonlat, float)[..., :2])
+        return (m - self.origin) * self.k
+
+    def locate(self, lonlat):
+        """[[feature index, ...], ...] — every polygon containing each point."""
+        pts = self.to_local(lonlat).reshape(-1, 2)
+        out = [[] for _ in range(len(pts))]
+        cells = np.floor(pts / self.cell).astype(np.int64)
+        uniq, inv = np.unique(cells, axis=0, return_inverse=True)
+        for u, (cx, cy) in enumerate(uniq.tolist()):
+            sel = np.flatnonzero(inv.ravel() == u)
+            for i in self.grid.get((cx, cy), ()):
+                for j in sel[_pip(pts[sel], self.edges[i])]:
+                    out[j].append(i)
+        return out
+
+    def nearest(self, lonlat, tags=None, nine=None, hole=None):
+        """(feature index, distance to its edge in m) per point; -1/inf if none.
+        Polygons are visited in bbox-distance order and skipped once their bbox
+        is farther than the best edge already found."""
+        pts = self.to_local(lonlat).reshape(-1, 2)
+        cand = [i for i, p in enumerate(self.polys)
+                if (tags is None or p["t"] in tags) and
+                   (nine is None or p["key"] == (str(nine).lower(), hole))]
+        best_i = np.full(len(pts), -1)
+        best_d = np.full(len(pts), np.inf)
+        if not cand:
+            return best_i, best_d
+        bb = self.bbox[cand]
+        dx = np.maximum(np.maximum(bb[:, 0] - pts[:, :1], pts[:, :1] - bb[:, 2]), 0)
+        dy = np.maximum(np.maximum(bb[:, 1] - pts[:, 1:], pts[:, 1:] - bb[:, 3]), 0)
+        lb = np.hypot(dx, dy)   # (n, len(cand)) lower bounds
+        for c in np.argsort(lb.min(0)):
+            sel = np.flatnonzero(lb[:, c] < best_d)
+            if not len(sel):
+                continue
+            d = _edge_dist(pts[sel], self.edges[cand[c]])
+            better = d < best_d[sel]
+            best_d[sel[better]], best_i[sel[better]] = d[better], cand[c]
+        return best_i, best_d
+
+    def _green(self, nine, hole):
+        key = (str(nine).lower(), hole)
+        gs = [i for i, p in enumerate(self.polys) if p["key"] == key and p["t"] == "green"]
+        return max(gs, key=lambda i: len(self.polys[i]["outer"])) if gs else None
+
+    def _centroid(self, i):
+        r = self.polys[i]["outer"]
+        x, y = r[:, 0], r[:, 1]
+        cr = x[:-1] * y[1:] - x[1:] * y[:-1]
+        a = cr.sum() / 2
+        if abs(a) < 1e-9:
+            return r.mean(0)
+        return np.array([((x[:-1] + x[1:]) * cr).sum(), ((y[:-1] + y[1:]) * cr).sum()]) / (6 * a)
+
+    def _fcb(self, pts, i):
+        c, e = self._centroid(i), self.edges[i]
+        inside = _pip(pts, e)
+        out = np.empty((len(pts), 3))
+        for j, p in enumerate(pts):
+            hits = _ray_hits(p, c, e)
+            centre = float(np.hypot(*(c - p)))
+            if inside[j]:
+                out[j] = (0.0, centre, hits[0] if len(hits) else centre)
+            elif len(hits):
+                out[j] = (hits[0], centre, hits[-1])
+            else:
+                out[j] = (centre, centre, centre)
+        return out
+
+    def green_fcb(self, lonlat, nine, hole):
+        """(N,3) metres to the front, centre and back of the hole's green, measured
+        along the line from each point through the green's centroid."""
+        i = self._green(nine, hole)
+        pts = self.to_local(lonlat).reshape(-1, 2)
+        if i is None:
+            return np.full((len(pts), 3), np.nan)
+        return self._fcb(pts, i)
+
+    def distance_table(self, nine, hole):
+        """Per tee: green front/centre/back plus reach/carry of every hazard the
+        tee->target line crosses (target = green centroid, else the pin)."""
+        key = (str(nine).lower(), hole)
+        g = self._green(nine, hole)
+        target = self._centroid(g) if g is not None else self.points[key].get("pin")
+        tees = {t: xy for t, xy in self.points[key].items() if t.startswith("tee_")}
+        table = {"nine": nine, "hole": hole, "tees": {}}
+        if target is None:
+            return table
+        haz = [i for i, p in enumerate(self.polys) if p["key"] == key and p["t"] in HAZARDS]
+        for t, xy in sorted(tees.items()):
+            row = {"centre_m": round(float(np.hypot(*(target - xy))), 1)}
+            if g is not None:
+                f, c, b = self._fcb(xy[None], g)[0]
+                row.update(front_m=round(f, 1), centre_m=round(c, 1), back_m=round(b, 1))
+            length = math.hypot(*(target - xy))
+            hz = []
+            for i in haz:
+                hits = _ray_hits(xy, target, self.edges[i])
+                hits = hits[hits <= length]
+                if len(hits):
+                    hz.append({"t": self.polys[i]["t"], "reach_m": round(float(hits[0]), 1),
+                               "carry_m": round(float(hits[-1]), 1)})
+            row["hazards"] = sorted(hz, key=lambda h: h["reach_m"])
+            row["yards"] = {k[:-2]: round(v * YD) for k, v in row.items() if k.endswith("_m")}
+            table["tees"][t] = row
+        return table
+
+    def holes(self):
+        keys = {(p["nine"], p["hole"]) for p in self.polys if p["hole"] is not None}
+        return sorted(keys, key=lambda k: (str(k[0]), k[1]))
+
+def main():
+    a = argparse.ArgumentParser()
+    a.add_argument("geojson", nargs="+")
+    a.add_argument("--table", help="write per-hole distance tables (JSON) here")
+    a.add_argument("--at", help="lat,lng to query")
+    args = a.parse_args()
+    idx = CourseIndex.from_geojson(args.geojson)
+    print(f"✓ {len(idx.polys)} polygons, {len(idx.grid)} grid cells, holes: "
+          + ", ".join(f"{n} #{h}" for n, h in idx.holes()))
+    if args.at:
+        lat, lng = map(float, args.at.split(","))
+        inside = [f"{idx.polys[i]['t']} ({idx.polys[i]['nine']} #{idx.polys[i]['hole']})"
+                  for i in idx.locate([[lng, lat]])[0]]
+        print(f"  in: {', '.join(inside) or 'nothing'}")
+        i, d = idx.nearest([[lng, lat]], tags=set(HAZARDS))
+        if i[0] >= 0:
+            print(f"  nearest hazard: {idx.polys[i[0]]['t']} {d[0]:.1f} m")
+    if args.table:
+        tables = [idx.distance_table(n, h) for n, h in idx.holes()]
+        json.dump(tables, open(args.table, "w"), indent=2)
+        print(f"✓ {args.table}: {len(tables)} holes")
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,21 @@ Usage:
       --seed /mnt/c/Users/pete/Downloads/plutaluang_seed.csv \
       --out hole_layouts/north-03-card.png
 
+  # every hole in a directory, one process per core, fonts/seed/styles loaded once
+  python3 holecard.py --batch hole_layouts --seed .../plutaluang_seed.csv \
+      [--out-dir cards] [--format webp] [--workers 8]
+
 Polygon features carry properties.t in {fairway, green, water, bunker, rough}.
 Point features carry t in {tee_blue, tee_white, tee_yellow, tee_red, pin}.
+
+As a library: ctx = RenderContext(seed=...); ctx.render(geojson, tile, sidecar, out)
+for as many holes as you like — nothing is reloaded between cards.
 """
-import argparse, csv, json, sys
+import argparse, json, os, sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
-import merc
+import course_seed, merc
 
 FILL = {
     "fairway": (86, 170, 78, 90),
@@ -31,6 +40,7 @@ OUTLINE = {
 TEE_COLOR = {"tee_blue": (59,130,246), "tee_white": (235,235,235),
              "tee_yellow": (250,204,21), "tee_red": (239,68,68)}
 
+@lru_cache(maxsize=None)
 def load_font(size, bold=False):
     for p in ["/usr/share/fonts/truetype/dejavu/DejaVuSans%s.ttf" % ("-Bold" if bold else ""),
               "/usr/share/fonts/truetype/liberation/LiberationSans%s.ttf" % ("-Bold" if bold else "")]:
@@ -40,92 +50,154 @@ def load_font(size, bold=False):
 
 def seed_row(seed_path, nine, hole):
     if not seed_path: return None
-    with open(seed_path) as f:
-        for r in csv.DictReader(f):
-            if r["nine"].lower()==str(nine).lower() and int(r["hole"])==int(hole):
-                return r
-    return None
+    return course_seed.load(seed_path).get(nine, hole)
+
+class RenderContext:
+    """Fonts, seed data and style tables, loaded once and shared by every card."""
+
+    def __init__(self, seed=None, fill=None, outline=None, tee_color=None,
+                 course="Plutaluang Navy GC"):
+        self.seed = seed
+        if seed:
+            course_seed.load(seed)   # parse + validate now, not mid-batch
+        self.fill = dict(FILL, **(fill or {}))
+        self.outline = dict(OUTLINE, **(outline or {}))
+        self.tee_color = dict(TEE_COLOR, **(tee_color or {}))
+        self.course = course
+        self.f_big, self.f_sm = load_font(30, bold=True), load_font(17)
+
+    def render(self, geojson, tile, sidecar, out, quality=92):
+        """Draw one card and save it; format follows out's extension (.png/.webp/.jpg)."""
+        FILL, OUTLINE, TEE_COLOR = self.fill, self.outline, self.tee_color
+        side = json.load(open(sidecar))
+        bbox = side["bbox_3857"]; W = side["img_w"]; H = side["img_h"]
+        gj = json.load(open(geojson))
+
+        base = Image.open(tile).convert("RGBA")
+        if base.size != (W, H):
+            base = base.resize((W, H))
+        overlay = Image.new("RGBA", (W, H), (0,0,0,0))
+        od = ImageDraw.Draw(overlay)
+
+        def to_px(lon, lat):
+            x, y = merc.lonlat_to_pixel(lon, lat, bbox, W, H)
+            return (x, y)
+
+        # draw polygons first (turf/sand/water), greens last so they sit on top
+        order = ["rough","water","fairway","bunker","green"]
+        feats = gj["features"]
+        for t in order:
+            for f in feats:
+                if f["geometry"]["type"] != "Polygon": continue
+                if (f["properties"].get("t") or "fairway") != t: continue
+                for ring in f["geometry"]["coordinates"]:
+                    if len(ring) >= 3:
+                        pts = [tuple(p) for p in merc.lonlat_to_pixel_arr(ring, bbox, W, H).tolist()]
+                        od.polygon(pts, fill=FILL.get(t, FILL["fairway"]),
+                                   outline=OUTLINE.get(t, OUTLINE["fairway"]))
+
+        # draw tees + pin (points)
+        pin_px = None; tee_pts = {}
+        for f in feats:
+            if f["geometry"]["type"] != "Point": continue
+            t = f["properties"].get("t","")
+            lon, lat = f["geometry"]["coordinates"]
+            px, py = to_px(lon, lat)
+            if t == "pin":
+                pin_px = (px, py)
+            elif t in TEE_COLOR:
+                tee_pts[t] = (px, py, TEE_COLOR[t])
+
+        for t,(px,py,col) in tee_pts.items():
+            r=7
+            od.ellipse([px-r,py-r,px+r,py+r], fill=col+(255,), outline=(0,0,0,255), width=2)
+        if pin_px:
+            px,py = pin_px
+            od.line([px,py,px,py-26], fill=(255,255,255,255), width=3)
+            od.polygon([(px,py-26),(px+16,py-20),(px,py-14)], fill=(220,40,40,255))
+            r=5; od.ellipse([px-r,py-r,px+r,py+r], fill=(255,255,255,255), outline=(0,0,0,255))
+
+        img = Image.alpha_composite(base, overlay)
+
+        # header band with hole info
+        row = seed_row(self.seed, gj["features"][0]["properties"].get("nine"),
+                       gj["features"][0]["properties"].get("hole")) if feats else None
+        nine = feats[0]["properties"].get("nine","?") if feats else "?"
+        hole = feats[0]["properties"].get("hole","?") if feats else "?"
+        bar_h = 76
+        card = Image.new("RGBA", (W, H+bar_h), (12,18,26,255))
+        card.paste(img, (0, bar_h))
+        cd = ImageDraw.Draw(card)
+        f_big, f_sm = self.f_big, self.f_sm
+        title = f"{nine} #{hole}"
+        cd.text((14, 10), title, font=f_big, fill=(230,237,243))
+        if row:
+            sub = f"Par {row['par']}  ·  SI {row['hcp']}"
+            yards = f"Blue {row['blue']}   White {row['white']}   Yellow {row['yellow']}   Red {row['red']}"
+            cd.text((14, 46), sub, font=f_sm, fill=(160,200,255))
+            cd.text((220, 14), self.course, font=f_sm, fill=(150,170,190))
+            cd.text((220, 46), yards, font=f_sm, fill=(190,200,210))
+
+        card.convert("RGB").save(out, quality=quality)
+        print(f"✓ {out} ({card.size[0]}x{card.size[1]})  polygons drawn; tees={len(tee_pts)} pin={'yes' if pin_px else 'no'}")
+        return out
+
+_CTX = {}
+
+def context(seed=None):
+    """Process-wide RenderContext per seed path."""
+    if seed not in _CTX:
+        _CTX[seed] = RenderContext(seed)
+    return _CTX[seed]
+
+def render(geojson, tile, sidecar, seed, out):
+    return context(seed).render(geojson, tile, sidecar, out)
+
+def card_jobs(d, out_dir=None, fmt="png"):
+    """(geojson, tile, sidecar, out) for every <name>.geojson in d that has its tile + sidecar."""
+    jobs = []
+    for n in sorted(os.listdir(d)):
+        if not n.endswith(".geojson"):
+            continue
+        stem = os.path.join(d, n[:-8])
+        if os.path.exists(stem + ".png") and os.path.exists(stem + ".json"):
+            out = os.path.join(out_dir or d, f"{n[:-8]}-card.{fmt}")
+            jobs.append((stem + ".geojson", stem + ".png", stem + ".json", out))
+    return jobs
+
+def _render_job(job, seed):
+    return context(seed).render(*job)
+
+def render_many(jobs, seed=None, workers=None):
+    """Render (geojson, tile, sidecar, out) jobs. workers=1 stays in-process; otherwise a
+    process pool, each worker building its context once. Returns outs in job order."""
+    if workers == 1 or len(jobs) <= 1:
+        ctx = context(seed)
+        return [ctx.render(*j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(_render_job, jobs, [seed]*len(jobs)))
 
 def main():
     a = argparse.ArgumentParser()
-    a.add_argument("--geojson", required=True)
-    a.add_argument("--tile", required=True)
-    a.add_argument("--sidecar", required=True)
+    a.add_argument("--geojson")
+    a.add_argument("--tile")
+    a.add_argument("--sidecar")
     a.add_argument("--seed", default=None)
-    a.add_argument("--out", required=True)
+    a.add_argument("--out")
+    a.add_argument("--batch", help="render every <name>.geojson (+ .png/.json) in this dir")
+    a.add_argument("--out-dir", default=None)
+    a.add_argument("--format", default="png", choices=["png", "webp", "jpg"])
+    a.add_argument("--workers", type=int, default=None)
     args = a.parse_args()
-
-    side = json.load(open(args.sidecar))
-    bbox = side["bbox_3857"]; W = side["img_w"]; H = side["img_h"]
-    gj = json.load(open(args.geojson))
-
-    base = Image.open(args.tile).convert("RGBA")
-    if base.size != (W, H):
-        base = base.resize((W, H))
-    overlay = Image.new("RGBA", (W, H), (0,0,0,0))
-    od = ImageDraw.Draw(overlay)
-
-    def to_px(lon, lat):
-        x, y = merc.lonlat_to_pixel(lon, lat, bbox, W, H)
-        return (x, y)
-
-    # draw polygons first (turf/sand/water), greens last so they sit on top
-    order = ["rough","water","fairway","bunker","green"]
-    feats = gj["features"]
-    for t in order:
-        for f in feats:
-            if f["geometry"]["type"] != "Polygon": continue
-            if (f["properties"].get("t") or "fairway") != t: continue
-            for ring in f["geometry"]["coordinates"]:
-                pts = [to_px(lon, lat) for lon, lat in ring]
-                if len(pts) >= 3:
-                    od.polygon(pts, fill=FILL.get(t, FILL["fairway"]),
-                               outline=OUTLINE.get(t, OUTLINE["fairway"]))
-
-    # draw tees + pin (points)
-    pin_px = None; tee_pts = {}
-    for f in feats:
-        if f["geometry"]["type"] != "Point": continue
-        t = f["properties"].get("t","")
-        lon, lat = f["geometry"]["coordinates"]
-        px, py = to_px(lon, lat)
-        if t == "pin":
-            pin_px = (px, py)
-        elif t in TEE_COLOR:
-            tee_pts[t] = (px, py, TEE_COLOR[t])
-
-    for t,(px,py,col) in tee_pts.items():
-        r=7
-        od.ellipse([px-r,py-r,px+r,py+r], fill=col+(255,), outline=(0,0,0,255), width=2)
-    if pin_px:
-        px,py = pin_px
-        od.line([px,py,px,py-26], fill=(255,255,255,255), width=3)
-        od.polygon([(px,py-26),(px+16,py-20),(px,py-14)], fill=(220,40,40,255))
-        r=5; od.ellipse([px-r,py-r,px+r,py+r], fill=(255,255,255,255), outline=(0,0,0,255))
-
-    img = Image.alpha_composite(base, overlay)
-
-    # header band with hole info
-    row = seed_row(args.seed, gj["features"][0]["properties"].get("nine"),
-                   gj["features"][0]["properties"].get("hole")) if feats else None
-    nine = feats[0]["properties"].get("nine","?") if feats else "?"
-    hole = feats[0]["properties"].get("hole","?") if feats else "?"
-    bar_h = 76
-    card = Image.new("RGBA", (W, H+bar_h), (12,18,26,255))
-    card.paste(img, (0, bar_h))
-    cd = ImageDraw.Draw(card)
-    f_big = load_font(30, bold=True); f_sm = load_font(17)
-    title = f"{nine} #{hole}"
-    cd.text((14, 10), title, font=f_big, fill=(230,237,243))
-    if row:
-        sub = f"Par {row['par']}  ·  SI {row['hcp']}"
-        yards = f"Blue {row['blue']}   White {row['white']}   Yellow {row['yellow']}   Red {row['red']}"
-        cd.text((14, 46), sub, font=f_sm, fill=(160,200,255))
-        cd.text((220, 14), "Plutaluang Navy GC", font=f_sm, fill=(150,170,190))
-        cd.text((220, 46), yards, font=f_sm, fill=(190,200,210))
-
-    card.convert("RGB").save(args.out, quality=92)
-    print(f"✓ {args.out} ({card.size[0]}x{card.size[1]})  polygons drawn; tees={len(tee_pts)} pin={'yes' if pin_px else 'no'}")
+    if args.batch:
+        if args.out_dir:
+            os.makedirs(args.out_dir, exist_ok=True)
+        outs = render_many(card_jobs(args.batch, args.out_dir, args.format), args.seed, args.workers)
+        print(f"✓ {len(outs)} cards")
+    elif args.geojson and args.tile and args.sidecar and args.out:
+        render(args.geojson, args.tile, args.sidecar, args.seed, args.out)
+    else:
+        a.error("--geojson/--tile/--sidecar/--out or --batch required")
 
 if __name__ == "__main__":
     main()
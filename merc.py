@@ -6,6 +6,7 @@ georeferenced: pixel (px,py) maps to an exact lon/lat. This module is the trust
 anchor for the whole auto-trace pipeline.
 """
 import math
+import numpy as np
 
 R = 6378137.0
 MX = math.pi * R  # 20037508.342789244
@@ -42,6 +43,40 @@ def lonlat_to_pixel(lon, lat, bbox, img_w, img_h):
     py = (ymax-my)/(ymax-ymin) * img_h
     return px, py
 
+# ---- array variants: (N,2) in -> (N,2) out, bit-identical to the scalar ones ----
+# numpy's SIMD exp/log/tan/atan can differ from libm in the last ulp, so the
+# transcendentals go through math.* via map() (C-level loop, no Python frames);
+# the affine parts are plain IEEE ops and vectorize exactly.
+
+def _libm(f, a):
+    return np.fromiter(map(f, a.ravel().tolist()), float, a.size).reshape(a.shape)
+
+def lonlat_to_merc_arr(lonlat):
+    ll = np.asarray(lonlat, dtype=float)
+    x = np.radians(ll[..., 0]) * R
+    y = _libm(math.log, _libm(math.tan, math.pi/4 + np.radians(ll[..., 1])/2)) * R
+    return np.stack((x, y), axis=-1)
+
+def merc_to_lonlat_arr(xy):
+    m = np.asarray(xy, dtype=float)
+    lon = np.degrees(m[..., 0] / R)
+    lat = np.degrees(2*_libm(math.atan, _libm(math.exp, m[..., 1] / R)) - math.pi/2)
+    return np.stack((lon, lat), axis=-1)
+
+def pixel_to_lonlat_arr(pxpy, bbox, img_w, img_h):
+    xmin, ymin, xmax, ymax = bbox
+    p = np.asarray(pxpy, dtype=float)
+    mx = xmin + (p[..., 0]/img_w) * (xmax-xmin)
+    my = ymax - (p[..., 1]/img_h) * (ymax-ymin)
+    return merc_to_lonlat_arr(np.stack((mx, my), axis=-1))
+
+def lonlat_to_pixel_arr(lonlat, bbox, img_w, img_h):
+    xmin, ymin, xmax, ymax = bbox
+    m = lonlat_to_merc_arr(lonlat)
+    px = (m[..., 0]-xmin)/(xmax-xmin) * img_w
+    py = (ymax-m[..., 1])/(ymax-ymin) * img_h
+    return np.stack((px, py), axis=-1)
+
 if __name__ == "__main__":
     # round-trip self-test at the North-nine anchor
     lon0, lat0 = 100.9557593413, 12.7109968527
@@ -58,6 +93,16 @@ if __name__ == "__main__":
         px2, py2 = lonlat_to_pixel(lon, lat, bbox, W, H)
         assert abs(px2-px) < 1e-6 and abs(py2-py) < 1e-6, f"pixel round-trip failed at {px},{py}"
 
+    # array variants must match the scalar path bit-for-bit
+    rng = np.random.default_rng(0)
+    pts = rng.uniform(0, 1, (5000, 2)) * (W, H)
+    ll = pixel_to_lonlat_arr(pts, bbox, W, H)
+    assert ll.tolist() == [list(pixel_to_lonlat(px, py, bbox, W, H)) for px, py in pts.tolist()], \
+        "pixel_to_lonlat_arr != scalar"
+    assert lonlat_to_pixel_arr(ll, bbox, W, H).tolist() == \
+        [list(lonlat_to_pixel(lon, lat, bbox, W, H)) for lon, lat in ll.tolist()], \
+        "lonlat_to_pixel_arr != scalar"
+
     # ground-size sanity: 1 px should be ~0.5 m (400 m / 800 px)
     lonA, latA = pixel_to_lonlat(W/2, H/2, bbox, W, H)
     lonB, latB = pixel_to_lonlat(W/2+1, H/2, bbox, W, H)
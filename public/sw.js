@@ -1,50 +1,90 @@
 // SERVICE WORKER - Performance Caching Version
 // Caches static assets for dramatically faster repeat visits
 
-const SW_VERSION = 'mcipro-cache-v955';
-const CACHE_NAME = `mcipro-static-${SW_VERSION}`;
+const SW_VERSION = 'mcipro-fc8f2df6f0';
 const RUNTIME_CACHE = `mcipro-runtime-${SW_VERSION}`;
 
-// Static assets to cache on install
-const STATIC_ASSETS = [
-    '/',
-    '/index.html',
-    '/manifest.json',
-    '/mcipro.png',
-    '/tailwind.css',
-    '/professional-analytics.css',
-    '/js/scorecardProfileLoader.js',
-    '/js/cheechan-yardage-book.js',
-    '/supabaseClient.js',
-    '/supabase-config.js',
-    '/auth-bridge.js',
-    '/caddie_data.js',
-    '/society-golf-system.js',
-    '/society-golf-combined.js',
-    '/society-dashboard-enhanced.js',
-    '/course-data-manager.js',
-    '/staff-management.js',
-    '/staff-management-compact.js',
-    '/reports-system.js',
-    '/analytics-drilldown.js',
-    '/tournament-series-manager.js',
-    '/global-player-directory.js',
-    '/golf-buddies-v2.js',
-    '/maintenance-management.js',
-    '/unified-player-service.js',
-    '/analytics-export.js',
-    '/time-windowed-leaderboards.js',
-    '/live-scorecard-enhancements.js',
-    '/weather-integration.js',
-    '/gm-analytics-engine.js',
-    '/financial-drilldown-system.js',
-    '/society-organizer-manager.js',
-    '/cross-device-sync.js',
-    '/native-push.js',
-    '/staff-security.js',
-    '/supabase-security.js',
-    '/traffic-monitor-complete.js'
+// Precache manifest: one entry per shell asset, revision = content hash.
+// Rewritten by compacted/hash_assets.py together with the ?v= references in index.html.
+// --- precache manifest: generated by compacted/hash_assets.py ---
+const PRECACHE_MANIFEST = [
+    { url: '/admin-pricing-control.js', revision: '1bcc66dd49' },
+    { url: '/analytics-drilldown.js', revision: 'e3c4bcb5a5' },
+    { url: '/analytics-export.js', revision: '4b7c8d3959' },
+    { url: '/auth-bridge.js', revision: 'd5f6380df2' },
+    { url: '/caddie_data.js', revision: '49abe7e465' },
+    { url: '/chat/chat-database-functions.js', revision: '78bf3ceab1' },
+    { url: '/chat/chat-system-full.js', revision: '15a3753017' },
+    { url: '/chat/chat-system-styles.css', revision: '0a8a503b77' },
+    { url: '/compacted/payment-system-integration.js', revision: '556b4e6f7c' },
+    { url: '/compacted/payment-tracking-database.js', revision: '88e5584621' },
+    { url: '/compacted/payment-tracking-manager.js', revision: 'f99e2f4f95' },
+    { url: '/course-data-manager.js', revision: 'bee35b3b49' },
+    { url: '/cross-device-sync.js', revision: '28ce9f073b' },
+    { url: '/financial-drilldown-system.js', revision: '64b358f6be' },
+    { url: '/global-player-directory.js', revision: '3850b2c6b8' },
+    { url: '/gm-analytics-engine.js', revision: '9541ad3984' },
+    { url: '/golf-buddies-system.js', revision: 'e58476f89a' },
+    { url: '/golf-buddies-v2.js', revision: '689349ec36' },
+    { url: '/hole-by-hole-leaderboard-enhancement.js', revision: '50dbfd62fb' },
+    { url: '/index.html', revision: 'cd35a7162a' },
+    { url: '/js/cheechan-yardage-book.js', revision: '89600f1524' },
+    { url: '/js/scorecardProfileLoader.js', revision: '51658aecb7' },
+    { url: '/live-scorecard-enhancements.js', revision: '403f4a9442' },
+    { url: '/maintenance-management.js', revision: '14e7dbba8f' },
+    { url: '/manifest.json', revision: 'bf20351c83' },
+    { url: '/mcipro-192.png', revision: 'bafb921d79' },
+    { url: '/mcipro-512.png', revision: '3c12083653' },
+    { url: '/mcipro.png', revision: '8cd564699b' },
+    { url: '/native-push.js', revision: 'b5e7444557' },
+    { url: '/professional-analytics.css', revision: 'e951821b79' },
+    { url: '/reports-system.js', revision: 'd0006f6c78' },
+    { url: '/society-dashboard-enhanced.js', revision: 'd5fcd814c7' },
+    { url: '/society-golf-analytics.js', revision: 'f5dbfd0ca2' },
+    { url: '/society-golf-combined.js', revision: 'a4547619a4' },
+    { url: '/society-golf-system.js', revision: '94b047dce1' },
+    { url: '/society-organizer-manager.js', revision: 'b867b2725b' },
+    { url: '/society-selector-modal.js', revision: '5455f385c9' },
+    { url: '/societylogos/JOAgolf.jpeg', revision: '63366b9d76' },
+    { url: '/societylogos/trgg.jpg', revision: '9c976ef7ff' },
+    { url: '/staff-management-compact.js', revision: '848d4f8b86' },
+    { url: '/staff-management.js', revision: '8385f7d4dd' },
+    { url: '/staff-security.js', revision: '8a91818289' },
+    { url: '/supabase-config.js', revision: '2c91831f9d' },
+    { url: '/supabase-security.js', revision: '1b5d82fbda' },
+    { url: '/supabaseClient.js', revision: '2f2fc0d0ed' },
+    { url: '/tailwind.css', revision: 'db408c3828' },
+    { url: '/time-windowed-leaderboards.js', revision: 'edb878882c' },
+    { url: '/tournament-series-manager.js', revision: '520b54f8d8' },
+    { url: '/traffic-monitor-complete.js', revision: '6b277a97f5' },
+    { url: '/unified-player-service.js', revision: 'ce4df0d194' },
+    { url: '/weather-integration.js', revision: 'b973682deb' },
 ];
+// --- end precache manifest ---
+
+// Precached files live in one long-lived cache keyed by `url?v=revision`;
+// a new worker only downloads the entries whose revision changed.
+const PRECACHE = 'mcipro-precache';
+
+function precacheKey(entry) {
+    return new URL(`${entry.url}?v=${entry.revision}`, self.location.origin).href;
+}
+
+const PRECACHE_KEYS = new Set(PRECACHE_MANIFEST.map(precacheKey));
+const PRECACHE_BY_PATH = new Map(PRECACHE_MANIFEST.map(entry => [entry.url, precacheKey(entry)]));
+
+// Precache key for a request: same-origin path in the manifest, requested
+// either without ?v= (tags the app injects itself, /tailwind.css) or with
+// the current revision. An older ?v= goes to the network.
+function precachedKey(url) {
+    const u = new URL(url);
+    const key = u.origin === self.location.origin && PRECACHE_BY_PATH.get(u.pathname);
+    if (!key) {
+        return null;
+    }
+    const v = u.searchParams.get('v');
+    return v === null || key.endsWith(`?v=${v}`) ? key : null;
+}
 
 // CDN resources to cache (external libraries)
 const CDN_PATTERNS = [
@@ -70,17 +110,19 @@ const NEVER_CACHE_PATTERNS = [
     'firebase'               // Firebase (if used for analytics)
 ];
 
-// Install event - cache static assets
+// Install event - fetch only precache entries whose revision is new
 self.addEventListener('install', event => {
     console.log('[SW] Installing cache version:', SW_VERSION);
 
     event.waitUntil(
-        caches.open(CACHE_NAME)
-            .then(cache => {
-                console.log('[SW] Caching static assets');
+        caches.open(PRECACHE)
+            .then(async cache => {
+                const have = new Set((await cache.keys()).map(request => request.url));
+                const missing = [...PRECACHE_KEYS].filter(key => !have.has(key));
+                console.log(`[SW] Precaching ${missing.length} of ${PRECACHE_KEYS.size} assets`);
                 // Cache assets one by one to avoid failing on missing files
                 return Promise.allSettled(
-                    STATIC_ASSETS.map(url =>
+                    missing.map(url =>
                         cache.add(url).catch(err => {
                             console.log('[SW] Failed to cache:', url, err.message);
                             return null;
@@ -107,7 +149,7 @@ self.addEventListener('activate', event => {
                         .filter(name => {
                             // Delete caches that don't match current version
                             return name.startsWith('mcipro-') &&
-                                   name !== CACHE_NAME &&
+                                   name !== PRECACHE &&
                                    name !== RUNTIME_CACHE;
                         })
                         .map(name => {
@@ -116,6 +158,12 @@ self.addEventListener('activate', event => {
                         })
                 );
             })
+            .then(() => caches.open(PRECACHE))
+            .then(async cache => {
+                // Drop revisions the current manifest no longer lists
+                const stale = (await cache.keys()).filter(request => !PRECACHE_KEYS.has(request.url));
+                await Promise.all(stale.map(request => cache.delete(request)));
+            })
             .then(() => {
                 console.log('[SW] Activated - claiming clients');
                 return self.clients.claim();
@@ -159,6 +207,17 @@ self.addEventListener('fetch', event => {
         return;
     }
 
+    // Content-hashed precache entries never change: cache-first
+    const precached = isHTMLRequest(event.request) ? null : precachedKey(url);
+    if (precached) {
+        event.respondWith(
+            caches.open(PRECACHE)
+                .then(cache => cache.match(precached))
+                .then(cached => cached || fetch(event.request))
+        );
+        return;
+    }
+
     // HTML requests: Network-first with cache fallback
     if (isHTMLRequest(event.request)) {
         event.respondWith(
@@ -176,7 +235,7 @@ self.addEventListener('fetch', event => {
                 .catch(() => {
                     // Fallback to cache if network fails
                     return caches.match(event.request)
-                        .then(cached => cached || caches.match('/index.html'));
+                        .then(cached => cached || caches.match('/index.html', { ignoreSearch: true }));
                 })
         );
         return;
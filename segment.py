@@ -13,13 +13,22 @@ Thresholds are tunable up top; imagery brightness varies by capture date.
 
     python3 segment.py --tile north-03.png --out north-03.geojson \
         --nine North --hole 3 [--fairway-min-m2 400] [--bunker-min-m2 25]
+
+    # whole course: every <name>.png with a sidecar, across all cores
+    python3 segment.py --batch hole_layouts --out-dir traces [--workers 8]
+
+    # whole-course tile at --ppm 4: label and trace 1024px blocks, joined at the seams
+    python3 segment.py --tile course.png --out course.geojson --block 1024
 """
-import argparse, json
+import argparse, json, os, re, time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import numpy as np
 from PIL import Image
 from skimage.color import rgb2hsv
-from skimage.measure import label, regionprops, find_contours, approximate_polygon
-from merc import pixel_to_lonlat
+from scipy.ndimage import find_objects
+from skimage.measure import label, find_contours, approximate_polygon
+from merc import pixel_to_lonlat_arr
 
 # HSV thresholds (H,S,V in 0..1). Tune to the imagery if needed.
 TURF  = dict(h=(0.18, 0.42), s=(0.18, 1.0), v=(0.18, 1.0))   # mown grass
@@ -32,71 +41,279 @@ def mask(hsv, t):
             (s >= t['s'][0]) & (s <= t['s'][1]) &
             (v >= t['v'][0]) & (v <= t['v'][1]))
 
-def polys_from_mask(m, min_px, simplify_px=2.0):
-    out = []
-    lab = label(m)
-    for r in regionprops(lab):
-        if r.area < min_px:
+# class codes in the uint8 class raster; order is also the feature output order.
+# The hue bands are disjoint, so every pixel belongs to at most one class.
+CLASSES = ((1, "water", WATER), (2, "fairway", TURF), (3, "bunker", SAND))
+
+def _classify_into(out, hsv):
+    for k, _, t in CLASSES:
+        np.copyto(out, k, where=mask(hsv, t))
+
+def classify(hsv, block_rows=256):
+    """One pass over the HSV array -> uint8 class raster (0 = unclassified).
+    Works a row block at a time so the boolean temporaries stay cache-sized."""
+    cls = np.zeros(hsv.shape[:2], np.uint8)
+    for r0 in range(0, hsv.shape[0], block_rows):
+        _classify_into(cls[r0:r0+block_rows], hsv[r0:r0+block_rows])
+    return cls
+
+def classify_rgb(rgb, block_rows=256):
+    """uint8 RGB -> class raster without ever holding a full-size float image:
+    each row block goes to float32 HSV, is classified, and is dropped."""
+    cls = np.zeros(rgb.shape[:2], np.uint8)
+    for r0 in range(0, rgb.shape[0], block_rows):
+        hsv = rgb2hsv(rgb[r0:r0+block_rows].astype(np.float32) / np.float32(255))
+        _classify_into(cls[r0:r0+block_rows], hsv)
+    return cls
+
+def _ring(sub, minr, minc, simplify_px):
+    """Outer ring of the True pixels in `sub`, a 1px-padded window whose
+    (1,1) is full-image (minr,minc). None if degenerate."""
+    cs = find_contours(sub, 0.5)
+    if not cs:
+        return None
+    c = max(cs, key=len)  # outer boundary
+    c = approximate_polygon(c, tolerance=simplify_px)
+    # contour is (row,col) in the padded window -> full-image (px=col,py=row)
+    ring = [(minc + cc - 1, minr + rr - 1) for rr, cc in c]
+    return ring if len(ring) >= 4 else None
+
+def polys_from_classes(cls, min_px, simplify_px=2.0):
+    """Rings for every class in `cls` from a single labelling sweep.
+    min_px: {class code: minimum region area in px}. Returns {code: [ring, ...]}."""
+    out = {k: [] for k in min_px}
+    lab, n = label(cls, background=0, return_num=True)
+    if not n:
+        return out
+    area = np.bincount(lab.ravel(), minlength=n+1)
+    code = np.zeros(n+1, np.uint8)
+    code[lab.ravel()] = cls.ravel()
+    # pad once so each region's contour window is a view, not a fresh sub-image
+    lab_p = np.pad(lab, 1)
+    for i, sl in enumerate(find_objects(lab), start=1):
+        k = int(code[i])
+        if sl is None or k not in min_px or area[i] < min_px[k]:
             continue
-        sub = np.zeros((r.image.shape[0]+2, r.image.shape[1]+2), bool)
-        sub[1:-1, 1:-1] = r.image
-        cs = find_contours(sub.astype(float), 0.5)
-        if not cs:
+        (minr, maxr), (minc, maxc) = (sl[0].start, sl[0].stop), (sl[1].start, sl[1].stop)
+        ring = _ring(lab_p[minr:maxr+2, minc:maxc+2] == i, minr, minc, simplify_px)
+        if ring:
+            out[k].append(ring)
+    return out
+
+# ---- windowed mode: bounded memory for very large tiles ----
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def _join_seam(parent, a, b, ca, cb):
+    """Union the 8-connected same-class pairs across one seam. a, b: global
+    labels of the pixel lines either side of it; ca, cb: their class codes."""
+    for d in (-1, 0, 1):   # straight across, and both diagonals
+        sa, sb = slice(max(-d, 0), len(a) - max(d, 0)), slice(max(d, 0), len(b) - max(-d, 0))
+        x, y = a[sa], b[sb]
+        hit = (x > 0) & (ca[sa] == cb[sb])
+        for i, j in np.unique(np.stack([x[hit], y[hit]], 1), axis=0):
+            ri, rj = _find(parent, int(i)), _find(parent, int(j))
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+def polys_windowed(cls, min_px, simplify_px=2.0, block=512):
+    """Same rings, same order as polys_from_classes(cls, ...), but labelling one
+    block at a time, each block once. A region that doesn't reach a block edge
+    is traced on the spot; the pieces that do are kept (cropped) with a global
+    id, the pixel lines either side of every seam are kept as global ids, and a
+    union-find over those seam labels joins the pieces of each region, which is
+    then traced once from its pieces. No full-size label or bitmap is held."""
+    H, W = cls.shape
+    cseam = {c: np.zeros((2, H), np.int64) for c in range(block, W, block)}   # columns c-1, c
+    rseam = {r: np.zeros((2, W), np.int64) for r in range(block, H, block)}   # rows r-1, r
+    parent, pieces, found = [0], {}, []   # found: (first pixel row, col, code, ring)
+    for R0 in range(0, H, block):
+        for C0 in range(0, W, block):
+            R1, C1 = min(R0+block, H), min(C0+block, W)
+            sub = cls[R0:R1, C0:C1]
+            lab, n = label(sub, background=0, return_num=True)
+            if not n:
+                continue
+            base = len(parent) - 1
+            parent.extend(range(base+1, base+n+1))
+            glab = lambda v: np.where(v > 0, v + base, 0)
+            if C0: cseam[C0][1, R0:R1] = glab(lab[:, 0])
+            if C1 < W: cseam[C1][0, R0:R1] = glab(lab[:, -1])
+            if R0: rseam[R0][1, C0:C1] = glab(lab[0])
+            if R1 < H: rseam[R1][0, C0:C1] = glab(lab[-1])
+            area = np.bincount(lab.ravel(), minlength=n+1)
+            for i, sl in enumerate(find_objects(lab), start=1):
+                fr = sl[0].start   # first raster pixel of this region / piece
+                fc = sl[1].start + int(np.argmax(lab[fr, sl[1]] == i))
+                k = int(sub[fr, fc])
+                if k not in min_px:
+                    continue
+                first, minr, minc = (R0+fr, C0+fc), R0+sl[0].start, C0+sl[1].start
+                comp = lab[sl] == i
+                if (R0 and sl[0].start == 0) or (R1 < H and sl[0].stop == R1-R0) or \
+                        (C0 and sl[1].start == 0) or (C1 < W and sl[1].stop == C1-C0):
+                    pieces[base+i] = (first, k, int(area[i]), minr, minc, comp)
+                elif area[i] >= min_px[k]:
+                    ring = _ring(np.pad(comp, 1), minr, minc, simplify_px)
+                    if ring:
+                        found.append(first + (k, ring))
+    for c, (a, b) in cseam.items():
+        _join_seam(parent, a, b, cls[:, c-1], cls[:, c])
+    for r, (a, b) in rseam.items():
+        _join_seam(parent, a, b, cls[r-1], cls[r])
+    groups = {}
+    for g in pieces:
+        groups.setdefault(_find(parent, g), []).append(pieces[g])
+    for ps in groups.values():
+        k = ps[0][1]
+        if sum(p[2] for p in ps) < min_px[k]:
             continue
-        c = max(cs, key=len)  # outer boundary
-        c = approximate_polygon(c, tolerance=simplify_px)
-        minr, minc, _, _ = r.bbox
-        # contour is (row,col) in padded sub-image -> full-image (px=col,py=row)
-        ring = [(minc + cc - 1, minr + rr - 1) for rr, cc in c]
-        if len(ring) >= 4:
-            out.append(ring)
+        r0, c0 = min(p[3] for p in ps), min(p[4] for p in ps)
+        r1 = max(p[3] + p[5].shape[0] for p in ps)
+        c1 = max(p[4] + p[5].shape[1] for p in ps)
+        sub = np.zeros((r1-r0+2, c1-c0+2), bool)
+        for _, _, _, pr, pc, comp in ps:
+            sub[pr-r0+1:pr-r0+1+comp.shape[0], pc-c0+1:pc-c0+1+comp.shape[1]] |= comp
+        ring = _ring(sub, r0, c0, simplify_px)
+        if ring:
+            found.append(min(p[0] for p in ps) + (k, ring))
+    out = {k: [] for k in min_px}
+    for _, _, k, ring in sorted(found, key=lambda f: f[:2]):
+        out[k].append(ring)
     return out
 
+def polys_from_mask(m, min_px, simplify_px=2.0):
+    return polys_from_classes(np.asarray(m, bool).view(np.uint8), {1: min_px}, simplify_px)[1]
+
 def to_features(rings, t, bbox, W, H):
     feats = []
+    if not rings:
+        return feats
+    # one vectorized reprojection for every vertex of every ring, then split back
+    ll = pixel_to_lonlat_arr(np.concatenate([np.asarray(r, float) for r in rings]), bbox, W, H).tolist()
+    i = 0
     for ring in rings:
-        coords = [list(pixel_to_lonlat(px, py, bbox, W, H)) for (px, py) in ring]
+        coords, i = ll[i:i+len(ring)], i+len(ring)
         if coords[0] != coords[-1]:
             coords.append(coords[0])
         feats.append({"type": "Feature", "properties": {"t": t},
                       "geometry": {"type": "Polygon", "coordinates": [coords]}})
     return feats
 
-def main():
-    a = argparse.ArgumentParser()
-    a.add_argument("--tile", required=True)
-    a.add_argument("--out", required=True)
-    a.add_argument("--nine"); a.add_argument("--hole", type=int)
-    a.add_argument("--fairway-min-m2", type=float, default=400)
-    a.add_argument("--water-min-m2", type=float, default=150)
-    a.add_argument("--bunker-min-m2", type=float, default=25)
-    args = a.parse_args()
-
-    side = json.load(open(args.tile.rsplit(".", 1)[0] + ".json"))
+def segment_tile(tile, out, nine=None, hole=None,
+                 fairway_min_m2=400, water_min_m2=150, bunker_min_m2=25, block=None):
+    """Segment one tile (sidecar alongside) into `out`. Returns {t: count}.
+    block: px; label and trace blocks of this size with the image kept
+    as uint8 (float32 per row block only) instead of whole-image float64."""
+    side = json.load(open(tile.rsplit(".", 1)[0] + ".json"))
     bbox, W, H = side["bbox_3857"], side["img_w"], side["img_h"]
     gw, gh = side["ground_m"]
     m2_per_px = (gw*gh) / (W*H)
 
-    img = np.asarray(Image.open(args.tile).convert("RGB")) / 255.0
-    hsv = rgb2hsv(img)
-
+    min_m2 = {"water": water_min_m2, "fairway": fairway_min_m2, "bunker": bunker_min_m2}
+    min_px = {k: min_m2[t]/m2_per_px for k, t, _ in CLASSES}
+    if block:
+        with Image.open(tile) as im:
+            cls = classify_rgb(np.asarray(im.convert("RGB")))
+        rings = polys_windowed(cls, min_px, block=block)
+    else:
+        img = np.asarray(Image.open(tile).convert("RGB")) / 255.0
+        rings = polys_from_classes(classify(rgb2hsv(img)), min_px)
     feats = []
-    feats += to_features(polys_from_mask(mask(hsv, WATER), args.water_min_m2/m2_per_px), "water",   bbox, W, H)
-    feats += to_features(polys_from_mask(mask(hsv, TURF),  args.fairway_min_m2/m2_per_px), "fairway", bbox, W, H)
-    feats += to_features(polys_from_mask(mask(hsv, SAND),  args.bunker_min_m2/m2_per_px),  "bunker",  bbox, W, H)
+    for k, t, _ in CLASSES:
+        feats += to_features(rings[k], t, bbox, W, H)
 
-    if feats and args.nine:
-        feats[0]["properties"]["nine"] = args.nine
-        feats[0]["properties"]["hole"] = args.hole
+    if feats and nine:
+        feats[0]["properties"]["nine"] = nine
+        feats[0]["properties"]["hole"] = hole
 
     fc = {"type": "FeatureCollection",
           "properties": {"note": "auto-traced — review tees/pin/green by hand",
                          "source": "Esri World Imagery via segment.py"},
           "features": feats}
-    json.dump(fc, open(args.out, "w"), indent=2)
+    json.dump(fc, open(out, "w"), indent=2)
     counts = {}
     for f in feats:
         counts[f["properties"]["t"]] = counts.get(f["properties"]["t"], 0) + 1
+    return counts
+
+# ---- batch mode: many tiles across a process pool ----
+
+HOLE_NAME = re.compile(r"^([a-z]+)-(\d+)$", re.I)   # north-03 -> North, 3
+
+def tile_jobs(src, out_dir):
+    """Jobs from a directory of <name>.png + <name>.json sidecars, or from a JSON
+    manifest [{"tile": ..., "nine"?: ..., "hole"?: ..., "out"?: ...}].
+    Tiles without a sidecar (rendered cards etc.) are skipped. Sorted by tile."""
+    if os.path.isdir(src):
+        rows = [{"tile": os.path.join(src, n)} for n in os.listdir(src) if n.endswith(".png")]
+    else:
+        base = os.path.dirname(src)
+        rows = [dict(r, tile=os.path.join(base, r["tile"])) for r in json.load(open(src))]
+    jobs = []
+    for r in rows:
+        stem = os.path.basename(r["tile"]).rsplit(".", 1)[0]
+        if not os.path.exists(r["tile"].rsplit(".", 1)[0] + ".json"):
+            continue
+        m = HOLE_NAME.match(stem)
+        jobs.append({"tile": r["tile"],
+                     "out": r.get("out") or os.path.join(out_dir, stem + ".geojson"),
+                     "nine": r.get("nine") or (m.group(1).capitalize() if m else None),
+                     "hole": r.get("hole") or (int(m.group(2)) if m else None)})
+    return sorted(jobs, key=lambda j: j["tile"])
+
+def _run(job, **opts):
+    t0 = time.perf_counter()
+    counts = segment_tile(job["tile"], job["out"], job["nine"], job["hole"], **opts)
+    return dict(job, counts=counts, secs=round(time.perf_counter()-t0, 3))
+
+def segment_batch(jobs, workers=None, **opts):
+    """Run jobs across a process pool. Results come back in job order, and each
+    tile's GeoJSON depends only on its own inputs, so output is deterministic."""
+    if workers == 1:
+        return [_run(j, **opts) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(partial(_run, **opts), jobs))
+
+def main():
+    a = argparse.ArgumentParser()
+    a.add_argument("--tile")
+    a.add_argument("--out")
+    a.add_argument("--batch", help="dir of tiles+sidecars, or JSON manifest")
+    a.add_argument("--out-dir", help="batch: where to write <name>.geojson + segment-summary.json")
+    a.add_argument("--workers", type=int, default=None)
+    a.add_argument("--nine"); a.add_argument("--hole", type=int)
+    a.add_argument("--fairway-min-m2", type=float, default=400)
+    a.add_argument("--water-min-m2", type=float, default=150)
+    a.add_argument("--bunker-min-m2", type=float, default=25)
+    a.add_argument("--block", type=int, default=None,
+                   help="px; block-wise bounded-memory mode for very large tiles (e.g. 1024)")
+    args = a.parse_args()
+    opts = dict(fairway_min_m2=args.fairway_min_m2, water_min_m2=args.water_min_m2,
+                bunker_min_m2=args.bunker_min_m2, block=args.block)
+
+    if args.batch:
+        if not args.out_dir:
+            a.error("--batch needs --out-dir (so hand-edited GeoJSON isn't overwritten)")
+        os.makedirs(args.out_dir, exist_ok=True)
+        t0 = time.perf_counter()
+        res = segment_batch(tile_jobs(args.batch, args.out_dir), args.workers, **opts)
+        for r in res:
+            print(f"✓ {r['out']}: " + ", ".join(f"{v} {k}" for k, v in r["counts"].items()) +
+                  f"  ({r['secs']:.2f}s)")
+        summary = {"tiles": len(res), "wall_s": round(time.perf_counter()-t0, 3),
+                   "cpu_s": round(sum(r["secs"] for r in res), 3), "holes": res}
+        json.dump(summary, open(os.path.join(args.out_dir, "segment-summary.json"), "w"), indent=2)
+        print(f"✓ {len(res)} tiles in {summary['wall_s']:.2f}s wall ({summary['cpu_s']:.2f}s cpu)")
+        return
+
+    if not (args.tile and args.out):
+        a.error("--tile and --out are required (or use --batch)")
+    counts = segment_tile(args.tile, args.out, args.nine, args.hole, **opts)
     print(f"✓ {args.out}: " + ", ".join(f"{v} {k}" for k, v in counts.items()) +
           "  (add 4 tees + pin by hand; tag the right turf blob as 'green')")
 